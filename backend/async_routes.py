@@ -0,0 +1,267 @@
+"""Async handlers for the CRUD endpoints, enabled with DB_ASYNC=1.
+
+Each handler awaits the matching handler in routes.py through
+``AsyncSession.run_sync``. The sync code runs in a greenlet whose database
+calls go through aiosqlite, so the event loop keeps serving other
+requests while SQLite works instead of tying up a threadpool worker per
+request. Query logic therefore lives in one place.
+
+``router`` contains every route of routes.router in the same order, with
+the async handler substituted wherever one is defined here.
+"""
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import routes
+from database import get_async_db
+from pagination import MAX_PAGE_SIZE, PageParams
+from schemas import (
+    Classification,
+    CohortAnalytics,
+    StudentRanking, ModuleRanking, StudentRankResponse,
+    SearchResult, SearchType,
+    ChangeFeed,
+    IdBatchRequest,
+    StudentBase, StudentResponse,
+    StudentBatchRequest, StudentBatchResponse, StudentDetailResponse,
+    ModuleBase, ModuleResponse, ModuleBatchResponse,
+    TutorBase, TutorResponse, TutorBatchResponse,
+    GradeBase, GradeResponse,
+    GradeImportResult
+)
+
+async_router = APIRouter()
+
+# Students Endpoints
+@async_router.post("/students/", response_model=StudentResponse)
+async def create_student(
+    student: StudentBase, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.create_student(student, s))
+
+@async_router.get("/students/", response_model=List[StudentResponse])
+async def get_all_students(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    personal_tutor_id: Optional[int] = None,
+    classification: Optional[Classification] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_all_students(
+        request, response, page, personal_tutor_id, classification, s
+    ))
+
+@async_router.post("/students/batch", response_model=StudentBatchResponse)
+async def get_students_batch(
+    batch: StudentBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_students_batch(batch, s))
+
+@async_router.get("/students/{student_id}", response_model=StudentResponse)
+async def get_student(
+    student_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_student(student_id, request, s))
+
+@async_router.get(
+    "/students/{student_id}/detail", response_model=StudentDetailResponse
+)
+async def get_student_detail(
+    student_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_student_detail(student_id, request, s)
+    )
+
+@async_router.get("/students/{student_id}/grades", response_model=List[GradeResponse])
+async def get_student_grades(
+    student_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_student_grades(student_id, request, s)
+    )
+
+# Modules Endpoints
+@async_router.post("/modules/", response_model=ModuleResponse)
+async def create_module(module: ModuleBase, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: routes.create_module(module, s))
+
+@async_router.get("/modules/", response_model=List[ModuleResponse])
+async def get_all_modules(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    module_tutor_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_all_modules(
+            request, response, page, module_tutor_id, s
+        )
+    )
+
+@async_router.post("/modules/batch", response_model=ModuleBatchResponse)
+async def get_modules_batch(
+    batch: IdBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_modules_batch(batch, s))
+
+@async_router.get("/modules/{module_id}", response_model=ModuleResponse)
+async def get_module(
+    module_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_module(module_id, request, s))
+
+# Tutors Endpoints
+@async_router.post("/tutors/", response_model=TutorResponse)
+async def create_tutor(tutor: TutorBase, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: routes.create_tutor(tutor, s))
+
+@async_router.get("/tutors/", response_model=List[TutorResponse])
+async def get_all_tutors(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_all_tutors(request, response, page, s)
+    )
+
+@async_router.post("/tutors/batch", response_model=TutorBatchResponse)
+async def get_tutors_batch(
+    batch: IdBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_tutors_batch(batch, s))
+
+@async_router.get("/tutors/{tutor_id}", response_model=TutorResponse)
+async def get_tutor(
+    tutor_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_tutor(tutor_id, request, s))
+
+# Grades Endpoints
+@async_router.post("/grades/", response_model=GradeResponse)
+async def create_grade(grade: GradeBase, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: routes.create_grade(grade, s))
+
+@async_router.post("/grades/bulk", response_model=GradeImportResult)
+async def bulk_create_grades(
+    grades: List[Any] = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.bulk_create_grades(grades, s))
+
+@async_router.post("/grades/bulk/csv", response_model=GradeImportResult)
+async def bulk_create_grades_csv(
+    body: bytes = Body(..., media_type="text/csv"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.bulk_create_grades_csv(body, s))
+
+@async_router.get("/grades/module/{module_id}", response_model=List[GradeResponse])
+async def get_module_grades(
+    module_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_module_grades(module_id, request, response, page, s)
+    )
+
+@async_router.put("/grades/{student_id}/{module_id}", response_model=GradeResponse)
+async def update_grade(
+    student_id: str,
+    module_id: int,
+    grade: GradeBase,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.update_grade(student_id, module_id, grade, s)
+    )
+
+# Analytics Endpoints
+@async_router.get("/analytics/cohort", response_model=CohortAnalytics)
+async def get_cohort_analytics(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_cohort_analytics(request, s))
+
+# Rankings Endpoints
+@async_router.get("/rankings/students", response_model=List[StudentRanking])
+async def get_top_students(
+    request: Request,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_top_students(request, limit, s))
+
+@async_router.get(
+    "/rankings/modules/{module_id}", response_model=List[ModuleRanking]
+)
+async def get_top_module_students(
+    module_id: int,
+    request: Request,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_top_module_students(module_id, request, limit, s)
+    )
+
+@async_router.get(
+    "/students/{student_id}/rank", response_model=StudentRankResponse
+)
+async def get_student_rank(
+    student_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.get_student_rank(student_id, request, s)
+    )
+
+# Search Endpoints
+@async_router.get("/search", response_model=List[SearchResult])
+async def search_directory(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200),
+    type: Optional[List[SearchType]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda s: routes.search_directory(
+            request, response, q, type, cursor, limit, s
+        )
+    )
+
+# Changes Endpoints
+@async_router.get("/changes", response_model=ChangeFeed)
+async def get_changes(
+    since: Optional[str] = Query(
+        None, description="Cursor from a previous response; omit to start over"
+    ),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda s: routes.get_changes(since, limit, s))
+
+def _route_key(route):
+    return route.path, frozenset(getattr(route, "methods", None) or ())
+
+def build_router() -> APIRouter:
+    """Merge the async handlers into routes.router, keeping route order."""
+    overrides = {_route_key(route): route for route in async_router.routes}
+    merged = APIRouter()
+    merged.routes.extend(
+        overrides.get(_route_key(route), route) for route in routes.router.routes
+    )
+    return merged
+
+router = build_router()
@@ -0,0 +1,130 @@
+"""Latency of the cohort analytics over a large grades table.
+
+Seeds ``--students`` x ``--modules`` grades (one million by default) and
+reports the time to load the grade arrays, to compute every summary from
+them, and to serve ``GET /analytics/cohort`` cold and from the response
+cache:
+
+    python -m benchmarks.bench_analytics --students 100000 --modules 10
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import analytics
+import routes
+import stats
+from cache import response_cache
+from database import Base, get_db
+from models import Grade, Module, Student, Tutor
+
+def seed(engine, students: int, modules: int, tutors: int) -> None:
+    student_ids = [f"{100000 + i:06d}A" for i in range(students)]
+    with engine.begin() as conn:
+        conn.execute(insert(Tutor), [
+            {"id": t, "first_name": "Bench", "last_name": f"Tutor {t}"}
+            for t in range(1, tutors + 1)
+        ])
+        conn.execute(insert(Module), [
+            {"id": m, "title": f"Module {m}", "module_tutor_id": m % tutors + 1}
+            for m in range(1, modules + 1)
+        ])
+        conn.execute(insert(Student), [
+            {
+                "student_id": sid,
+                "first_name": "Bench",
+                "last_name": "Student",
+                "dob": date(2000, 1, 1),
+                "personal_tutor_id": 1,
+            }
+            for sid in student_ids
+        ])
+        for m in range(1, modules + 1):
+            conn.execute(insert(Grade), [
+                {"student_id": sid, "module_id": m, "score": random.random()}
+                for sid in student_ids
+            ])
+        stats.rebuild_student_stats(conn)
+
+def timed(call, repeat: int) -> float:
+    """Best wall time in milliseconds over ``repeat`` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--tutors", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_analytics_"))
+    engine = create_engine(
+        f"sqlite:///{workdir / 'bench.db'}", connect_args={"check_same_thread": False}
+    )
+    try:
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.students, args.modules, args.tutors)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def get_bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        with Session() as db:
+            grades = analytics.load_grade_arrays(db)
+            load_ms = timed(lambda: analytics.load_grade_arrays(db), args.repeat)
+            compute_ms = timed(
+                lambda: analytics.summarize_groups(
+                    grades["module_id"] - 1, grades["score"], args.modules
+                ),
+                args.repeat,
+            )
+            total_ms = timed(lambda: analytics.cohort_analytics(db), args.repeat)
+
+        app = FastAPI()
+        app.include_router(routes.router)
+        app.dependency_overrides[get_db] = get_bench_db
+        with TestClient(app) as client:
+            def cold():
+                response_cache.clear()
+                client.get("/analytics/cohort").raise_for_status()
+
+            cold_ms = timed(cold, args.repeat)
+            cached_ms = timed(
+                lambda: client.get("/analytics/cohort").raise_for_status(),
+                args.repeat,
+            )
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "grades": len(grades),
+        "load_arrays_ms": load_ms,
+        "per_module_summary_ms": compute_ms,
+        "cohort_analytics_ms": total_ms,
+        "endpoint_cold_ms": cold_ms,
+        "endpoint_cached_ms": cached_ms,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare throughput and tail latency of the sync and async database stacks.
+
+Starts the API twice against the same seeded database, once with the
+default sync handlers and once with DB_ASYNC=1, and drives the read
+endpoints at a fixed concurrency:
+
+    python -m benchmarks.bench_async --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import drive, run_server, seed_sample_data
+
+MODES = {"sync": {"DB_ASYNC": "0"}, "async": {"DB_ASYNC": "1"}}
+
+def read_paths(base_url: str) -> list:
+    students = httpx.get(f"{base_url}/students/").json()
+    modules = httpx.get(f"{base_url}/modules/").json()
+    paths = ["/students/", "/modules/", "/tutors/"]
+    paths += [f"/students/{s['student_id']}" for s in students]
+    paths += [f"/students/{s['student_id']}/grades" for s in students]
+    paths += [f"/grades/module/{m['id']}" for m in modules]
+    return paths
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_async_"))
+    try:
+        seed_sample_data(workdir)
+        results = {}
+        for mode, env in MODES.items():
+            with run_server(workdir, env=env) as base_url:
+                paths = read_paths(base_url)
+                results[mode] = asyncio.run(
+                    drive(base_url, paths, args.concurrency, args.duration)
+                )
+        print(json.dumps({
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "results": results,
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Fan-out of GET /events/grades to many concurrent subscribers on one worker.
+
+Opens ``--subscribers`` SSE streams against a single uvicorn worker, then:
+
+1. writes ``--writes`` grades one at a time and measures how long each
+   event takes to reach every subscriber;
+2. stops reading on a ``--stalled`` fraction of the streams and imports
+   ``--burst`` grades in bulk, so those subscribers' queues overflow.
+
+It reports delivery latency percentiles and the worker's resident memory
+(from GET /metrics) before the subscribers connect, once they are
+connected, after the burst, and per subscriber:
+
+    python -m benchmarks.bench_events --subscribers 2000 --burst 10000
+
+Subscribers are raw asyncio sockets in this process, so the client side
+costs little next to the server.
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from benchmarks.common import percentile, run_server, seed_sample_data
+
+MODULES = 10
+CONNECT_BATCH = 200
+
+def metric(base_url: str, name: str) -> float:
+    for line in httpx.get(f"{base_url}/metrics").text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return 0.0
+
+async def student_ids(client: httpx.AsyncClient) -> List[str]:
+    ids, params = [], {"limit": 1000}
+    while True:
+        response = await client.get("/students/", params=params)
+        ids.extend(student["student_id"] for student in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            return ids
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+class Subscriber:
+    def __init__(self):
+        self.received: List[float] = []
+        self.lagged = 0
+        self.stalled = asyncio.Event()
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self, host: str, port: int) -> None:
+        reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(
+            f"GET /events/grades HTTP/1.1\r\nHost: {host}\r\n"
+            "Accept: text/event-stream\r\n\r\n".encode()
+        )
+        # Headers, then the retry frame: the stream is subscribed
+        while not (await reader.readline()).startswith(b"retry:"):
+            pass
+        self.task = asyncio.ensure_future(self.read(reader))
+
+    async def read(self, reader: asyncio.StreamReader) -> None:
+        while not self.stalled.is_set():
+            # Counting frames per read, rather than parsing lines, keeps the
+            # client cheap next to the server
+            data = await reader.read(65536)
+            if not data:
+                return
+            now = time.perf_counter()
+            self.received.extend([now] * data.count(b"\nid: "))
+            self.lagged += data.count(b"event: lagged")
+        # Stalled: stop reading and let the socket buffers fill up
+        await asyncio.Event().wait()
+
+    def close(self) -> None:
+        self.task.cancel()
+        self.writer.close()
+
+async def run(base_url: str, args) -> dict:
+    url = urlsplit(base_url)
+    idle_rss = metric(base_url, "process_resident_memory_bytes")
+    result = {"rss_mb": {"idle": round(idle_rss / 2**20, 1)}}
+
+    subscribers = [Subscriber() for _ in range(args.subscribers)]
+    started = time.perf_counter()
+    for i in range(0, len(subscribers), CONNECT_BATCH):
+        await asyncio.gather(*(
+            s.connect(url.hostname, url.port)
+            for s in subscribers[i:i + CONNECT_BATCH]
+        ))
+    result["connect_s"] = round(time.perf_counter() - started, 2)
+    connected_rss = metric(base_url, "process_resident_memory_bytes")
+    result["rss_mb"]["connected"] = round(connected_rss / 2**20, 1)
+    result["subscribers"] = int(metric(base_url, "grade_event_subscribers"))
+
+    # Phase 1: one grade at a time, each delivered to every subscriber
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        pairs = iter(
+            (student_id, m)
+            for student_id in await student_ids(client)
+            for m in range(1, MODULES + 1)
+        )
+        sent = []
+        for _ in range(args.writes):
+            student_id, module_id = next(pairs)
+            sent.append(time.perf_counter())
+            await client.post("/grades/", json={
+                "student_id": student_id, "module_id": module_id, "score": 0.5
+            })
+            await asyncio.sleep(args.interval)
+        await asyncio.sleep(1.0)
+        latencies = sorted(
+            received - sent[k]
+            for s in subscribers for k, received in enumerate(s.received)
+        )
+        result["delivery"] = {
+            "expected": args.writes * len(subscribers),
+            "delivered": len(latencies),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        }
+
+        # Phase 2: a burst while some subscribers do not read
+        stalled = subscribers[:int(len(subscribers) * args.stalled)]
+        for s in stalled:
+            s.stalled.set()
+        burst = [
+            {"student_id": student_id, "module_id": module_id, "score": 0.7}
+            for student_id, module_id in (next(pairs) for _ in range(args.burst))
+        ]
+        started = time.perf_counter()
+        for i in range(0, len(burst), 500):
+            await client.post("/grades/bulk", json=burst[i:i + 500])
+        await asyncio.sleep(2.0)
+        result["burst"] = {
+            "grades": len(burst),
+            "stalled_subscribers": len(stalled),
+            "seconds": round(time.perf_counter() - started, 2),
+            "events_dropped": int(metric(base_url, "grade_events_dropped_total")),
+            "lagged_notices_to_readers": sum(
+                s.lagged for s in subscribers[len(stalled):]
+            ),
+        }
+    burst_rss = metric(base_url, "process_resident_memory_bytes")
+    result["rss_mb"]["after_burst"] = round(burst_rss / 2**20, 1)
+    result["rss_kb_per_subscriber"] = round(
+        (burst_rss - idle_rss) / len(subscribers) / 1024, 1
+    )
+    for s in subscribers:
+        s.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument(
+        "--interval", type=float, default=0.2, help="seconds between single writes"
+    )
+    parser.add_argument("--stalled", type=float, default=0.5)
+    parser.add_argument("--burst", type=int, default=10000)
+    parser.add_argument("--queue-size", type=int, default=100)
+    args = parser.parse_args()
+
+    students = (args.writes + args.burst) // MODULES + 1
+    env = {
+        "SQLITE_PRAGMA_PROFILE": "production",
+        "EVENT_QUEUE_SIZE": str(args.queue_size),
+        "MAX_EVENT_SUBSCRIBERS": str(args.subscribers),
+    }
+    workdir = Path(tempfile.mkdtemp(prefix="bench_events_"))
+    try:
+        seed_sample_data(workdir, env, (
+            "--reset", "--tutors", "5", "--modules", str(MODULES),
+            "--students", str(students), "--grade-density", "0",
+        ))
+        with run_server(workdir, env=env) as base_url:
+            result = asyncio.run(run(base_url, args))
+        print(json.dumps({
+            "subscribers": args.subscribers,
+            "queue_size": args.queue_size,
+            **result,
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
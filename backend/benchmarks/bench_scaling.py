@@ -0,0 +1,103 @@
+"""Read throughput of serve.py as the number of worker processes grows.
+
+Seeds one database, then for each worker count starts serve.py against it
+and drives the read endpoints from ``--clients`` load-generating processes.
+Reports requests per second and the scaling efficiency relative to one
+worker (1.0 is perfectly linear):
+
+    python -m benchmarks.bench_scaling --workers 1,2,4,8 --duration 10
+
+The response cache is disabled so that every request reaches SQLite
+(``--cache`` keeps it on). Workers and clients share the machine, so run
+with at least as many cores as the largest worker count plus the clients.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks.bench_async import read_paths
+from benchmarks.common import drive, run_server, seed_sample_data
+
+SEED_ARGS = ("--reset", "--tutors", "20", "--modules", "10", "--students", "2000")
+WARMUP_SECONDS = 2.0
+
+def client_process(base_url: str, paths: list, concurrency: int, duration: float):
+    return asyncio.run(drive(base_url, paths, concurrency, duration))
+
+def measure(
+    base_url: str, paths: list, clients: int, concurrency: int, duration: float
+) -> dict:
+    with ProcessPoolExecutor(clients) as pool:
+        results = list(pool.map(
+            client_process,
+            [base_url] * clients,
+            [paths] * clients,
+            [concurrency] * clients,
+            [duration] * clients,
+        ))
+    return {
+        "requests_per_sec": round(sum(r["requests_per_sec"] for r in results), 1),
+        "errors": sum(r["errors"] for r in results),
+        "p95_ms": max(r["p95_ms"] for r in results),
+    }
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers", default=",".join(str(2 ** i) for i in range(cpus.bit_length())),
+        help="comma-separated worker counts (default: powers of two up to the CPUs)",
+    )
+    parser.add_argument(
+        "--clients", type=int, default=None,
+        help="load-generating processes (default: the largest worker count)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="connections per client"
+    )
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--cache", action="store_true", help="keep the response cache enabled"
+    )
+    args = parser.parse_args()
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    clients = args.clients or max(worker_counts)
+
+    env = {"SQLITE_PRAGMA_PROFILE": "production"}
+    if not args.cache:
+        env["RESPONSE_CACHE_SIZE"] = "0"
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_scaling_"))
+    try:
+        seed_sample_data(workdir, env, SEED_ARGS)
+        results = {}
+        for workers in worker_counts:
+            with run_server(workdir, env=env, workers=workers) as base_url:
+                paths = read_paths(base_url)
+                # Lets every worker finish starting before the measurement
+                measure(base_url, paths, clients, args.concurrency, WARMUP_SECONDS)
+                results[workers] = measure(
+                    base_url, paths, clients, args.concurrency, args.duration
+                )
+        baseline = results[worker_counts[0]]["requests_per_sec"] / worker_counts[0]
+        for workers, result in results.items():
+            result["efficiency"] = round(
+                result["requests_per_sec"] / (baseline * workers), 2
+            )
+        print(json.dumps({
+            "cpus": cpus,
+            "clients": clients,
+            "concurrency_per_client": args.concurrency,
+            "duration_s": args.duration,
+            "results": results,
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Latency of prefix search over a large directory.
+
+Seeds ``--students`` students (one hundred thousand by default) with
+random names, plus tutors and modules, and reports the median and worst
+time of ``search`` for a set of prefixes on the FTS5 index and on the
+LIKE fallback:
+
+    python -m benchmarks.bench_search --students 100000
+"""
+import argparse
+import json
+import random
+import shutil
+import statistics
+import string
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import search
+from database import Base
+from models import Module, Student, Tutor
+
+QUERIES = ("sm", "jo", "ma", "sam smi", "zz", "mathematics", "1000", "e")
+
+def random_name(rng: random.Random) -> str:
+    length = rng.randint(3, 9)
+    return rng.choice(string.ascii_uppercase) + "".join(
+        rng.choices(string.ascii_lowercase, k=length - 1)
+    )
+
+def seed(engine, students: int, tutors: int, modules: int) -> None:
+    rng = random.Random(15)
+    with engine.begin() as conn:
+        conn.execute(insert(Tutor), [
+            {
+                "id": t,
+                "first_name": random_name(rng),
+                "last_name": random_name(rng),
+                "email": f"tutor{t}@example.com",
+            }
+            for t in range(1, tutors + 1)
+        ])
+        conn.execute(insert(Module), [
+            {
+                "id": m,
+                "title": f"{random_name(rng)} Mathematics {m}",
+                "module_tutor_id": m % tutors + 1,
+            }
+            for m in range(1, modules + 1)
+        ])
+        conn.execute(insert(Student), [
+            {
+                "student_id": f"{100000 + i:06d}A",
+                "first_name": random_name(rng),
+                "last_name": random_name(rng),
+                "dob": date(2000, 1, 1),
+                "personal_tutor_id": i % tutors + 1,
+            }
+            for i in range(students)
+        ])
+
+def timings(db, repeat: int, limit: int):
+    """Median and worst milliseconds per query over ``repeat`` runs."""
+    result = {}
+    for query in QUERIES:
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            search.search(db, query, limit=limit)
+            runs.append((time.perf_counter() - started) * 1000)
+        result[query] = {
+            "median_ms": round(statistics.median(runs), 2),
+            "max_ms": round(max(runs), 2),
+        }
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--tutors", type=int, default=200)
+    parser.add_argument("--modules", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_search_"))
+    engine = create_engine(
+        f"sqlite:///{workdir / 'bench.db'}", connect_args={"check_same_thread": False}
+    )
+    try:
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.students, args.tutors, args.modules)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with Session() as db:
+            fts = timings(db, args.repeat, args.limit)
+            db.connection().info["fts_search"] = False
+            like = timings(db, args.repeat, args.limit)
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "students": args.students,
+        "fts5": fts,
+        "like_fallback": like,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
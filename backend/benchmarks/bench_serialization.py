@@ -0,0 +1,135 @@
+"""CPU cost of serializing the list endpoints, default path vs FAST_JSON.
+
+A temporary database is seeded with ``--rows`` students, modules, tutors
+and grades in one module. Every list endpoint is then read page by page
+in process, with the response cache disabled, under both settings and
+the CPU time per 10k rows is reported:
+
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import fast_json
+import routes
+import stats
+from cache import response_cache
+from config import settings
+from database import Base, get_db
+from models import Grade, Module, Student, Tutor
+from pagination import MAX_PAGE_SIZE
+
+ENDPOINTS = ("/students/", "/modules/", "/tutors/", "/grades/module/1")
+
+def seed(engine, rows: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(Tutor), [
+            {
+                "id": i,
+                "first_name": "Bench",
+                "last_name": f"Tutor {i}",
+                "email": f"tutor{i}@example.com",
+                "title": "Dr.",
+            }
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Module), [
+            {"id": i, "title": f"Module {i}", "module_tutor_id": i}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Student), [
+            {
+                "student_id": f"{100000 + i}A",
+                "first_name": "Bench",
+                "last_name": f"Student {i}",
+                "dob": date(2000, 1, 1),
+                "personal_tutor_id": 1,
+            }
+            for i in range(rows)
+        ])
+        conn.execute(insert(Grade), [
+            {"student_id": f"{100000 + i}A", "module_id": 1, "score": (i % 100) / 100}
+            for i in range(rows)
+        ])
+        stats.rebuild_student_stats(conn)
+
+def read_all(client: TestClient, path: str) -> int:
+    rows, params = 0, {"limit": MAX_PAGE_SIZE}
+    while True:
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        rows += len(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return rows
+        params = {"limit": MAX_PAGE_SIZE, "cursor": cursor}
+
+def measure(client: TestClient, path: str, fast: bool, repeat: int) -> float:
+    """Best CPU seconds per 10k rows over ``repeat`` full reads of ``path``."""
+    settings.fast_json = fast
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        rows = read_all(client, path)
+        best = min(best, (time.process_time() - started) * 10000 / rows)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_serialization_"))
+    engine = create_engine(
+        f"sqlite:///{workdir / 'bench.db'}", connect_args={"check_same_thread": False}
+    )
+    try:
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.rows)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def get_bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(routes.router)
+        app.dependency_overrides[get_db] = get_bench_db
+        response_cache.maxsize = 0
+
+        results = {}
+        with TestClient(app) as client:
+            for path in ENDPOINTS:
+                default = measure(client, path, False, args.repeat)
+                fast = measure(client, path, True, args.repeat)
+                results[path] = {
+                    "default_cpu_ms_per_10k": round(default * 1000, 1),
+                    "fast_cpu_ms_per_10k": round(fast * 1000, 1),
+                    "speedup": round(default / fast, 2),
+                }
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "encoder": "orjson" if fast_json.orjson is not None else "json",
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Concurrent read/write throughput of SQLite under each PRAGMA profile.
+
+For every profile in config.SQLITE_PRAGMA_PROFILES a fresh database file
+is seeded, then reader threads fetch students with their grade stats
+while writer threads update grades through the ORM, committing after
+every write:
+
+    python -m benchmarks.bench_sqlite_pragmas --readers 8 --writers 2
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import stats  # noqa: F401  writes go through the grade stats hook
+from config import SQLITE_PRAGMA_PROFILES, Settings
+from database import Base, apply_sqlite_pragmas
+from models import Grade, Module, Student, Tutor
+from utils import query_students_with_stats
+
+def seed(engine, students: int, modules: int) -> list:
+    student_ids = [f"{100000 + i}A" for i in range(students)]
+    with engine.begin() as conn:
+        conn.execute(insert(Tutor), [
+            {"id": 1, "first_name": "Bench", "last_name": "Tutor"}
+        ])
+        conn.execute(insert(Module), [
+            {"id": m, "title": f"Module {m}", "module_tutor_id": 1}
+            for m in range(1, modules + 1)
+        ])
+        conn.execute(insert(Student), [
+            {
+                "student_id": sid,
+                "first_name": "Bench",
+                "last_name": "Student",
+                "dob": date(2000, 1, 1),
+                "personal_tutor_id": 1,
+            }
+            for sid in student_ids
+        ])
+        conn.execute(insert(Grade), [
+            {"student_id": sid, "module_id": m, "score": random.random()}
+            for sid in student_ids
+            for m in range(1, modules + 1)
+        ])
+        stats.rebuild_student_stats(conn)
+    return student_ids
+
+def run_profile(profile: str, args, workdir: Path) -> dict:
+    path = workdir / f"{profile}.db"
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=args.readers + args.writers,
+    )
+    pragmas = Settings(sqlite_pragma_profile=profile).sqlite_pragmas
+    event.listen(
+        engine, "connect", lambda conn, record: apply_sqlite_pragmas(conn, pragmas)
+    )
+    Base.metadata.create_all(bind=engine)
+    student_ids = seed(engine, args.students, args.modules)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    counts = {"reads": 0, "writes": 0, "lock_errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def reader():
+        done = 0
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                sid = random.choice(student_ids)
+                query_students_with_stats(db).filter(
+                    Student.student_id == sid
+                ).first()
+                db.rollback()
+                done += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer():
+        done = errors = 0
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                grade = db.get(
+                    Grade, (random.choice(student_ids), random.randint(1, args.modules))
+                )
+                grade.score = random.random()
+                try:
+                    db.commit()
+                    done += 1
+                except OperationalError:
+                    db.rollback()
+                    errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["lock_errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    return {
+        "pragmas": pragmas,
+        "reads_per_sec": round(counts["reads"] / elapsed, 1),
+        "writes_per_sec": round(counts["writes"] / elapsed, 1),
+        "lock_errors": counts["lock_errors"],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--profiles", nargs="+", default=sorted(SQLITE_PRAGMA_PROFILES),
+        choices=sorted(SQLITE_PRAGMA_PROFILES)
+    )
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_pragmas_"))
+    try:
+        results = {
+            profile: run_profile(profile, args, workdir) for profile in args.profiles
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({
+        "readers": args.readers,
+        "writers": args.writers,
+        "duration_s": args.duration,
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
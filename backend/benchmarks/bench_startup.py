@@ -0,0 +1,81 @@
+"""Cold-start time of the app: from ``import main`` to the first response.
+
+Each run starts a fresh interpreter against a migrated database, imports
+the app, runs its lifespan startup and serves ``GET /students/``, and
+reports the time of each phase in milliseconds:
+
+    python -m benchmarks.bench_startup --runs 5
+
+``COLD_START_BUDGET_SECONDS`` is the budget that
+tests/integration_tests/test_startup.py enforces.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from benchmarks.common import BACKEND_DIR, seed_sample_data
+
+COLD_START_BUDGET_SECONDS = 1.5
+
+# Interpreter and test client imports happen before the clock starts
+_PROBE = """
+import json, time
+from fastapi.testclient import TestClient
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    status = client.get("/students/").status_code
+    served = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (served - ready) * 1000,
+    "total_ms": (served - started) * 1000,
+}))
+"""
+
+def measure_cold_start(workdir: Path, env: Optional[Dict[str, str]] = None) -> dict:
+    """Run the probe once in a new interpreter with ``workdir`` as cwd."""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=workdir,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR), **(env or {})},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_startup_"))
+    try:
+        seed_sample_data(workdir, args=("--reset",))
+        runs = [measure_cold_start(workdir) for _ in range(args.runs)]
+        phases = [key for key in runs[0] if key.endswith("_ms")]
+        print(json.dumps({
+            "runs": args.runs,
+            "budget_ms": COLD_START_BUDGET_SECONDS * 1000,
+            "median": {
+                phase: round(statistics.median(run[phase] for run in runs), 1)
+                for phase in phases
+            },
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
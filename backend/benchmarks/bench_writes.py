@@ -0,0 +1,142 @@
+"""Write throughput of the create endpoints before and after single-statement
+inserts.
+
+Runs each create handler against a scratch SQLite file, once with the
+previous ORM path (existence check, add, commit, refresh) and once with
+the handlers in routes.py, and reports writes per second and SQL
+statements per write:
+
+    python -m benchmarks.bench_writes --writes 5000
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
+
+import routes
+from database import Base, create_db_engine
+from models import Grade, Module, Student, Tutor
+from schemas import GradeBase, StudentBase, TutorBase
+from utils import check_exists
+
+def orm_create_tutor(tutor: TutorBase, db):
+    db_tutor = Tutor(**tutor.dict())
+    db.add(db_tutor)
+    db.commit()
+    db.refresh(db_tutor)
+    return db_tutor
+
+def orm_create_student(student: StudentBase, db):
+    db_student = Student(**student.dict())
+    db.add(db_student)
+    db.commit()
+    db.refresh(db_student)
+    return db_student
+
+def orm_create_grade(grade: GradeBase, db):
+    if check_exists(db, Grade, student_id=grade.student_id, module_id=grade.module_id):
+        raise HTTPException(status_code=400, detail="Grade already exists")
+    db_grade = Grade(**grade.dict())
+    db.add(db_grade)
+    db.commit()
+    db.refresh(db_grade)
+    return db_grade
+
+PATHS = {
+    "orm": {
+        "tutors": orm_create_tutor,
+        "students": orm_create_student,
+        "grades": orm_create_grade,
+    },
+    "single_statement": {
+        "tutors": routes.create_tutor,
+        "students": routes.create_student,
+        "grades": routes.create_grade,
+    },
+}
+
+def payloads(kind: str, writes: int, offset: int):
+    for i in range(writes):
+        n = offset + i
+        if kind == "tutors":
+            yield TutorBase(
+                first_name="Bench", last_name=f"Tutor {n}",
+                email=f"tutor{n}@example.com",
+            )
+        elif kind == "students":
+            yield StudentBase(
+                student_id=f"{100000 + n:06d}W", first_name="Bench",
+                last_name="Student", dob=date(2000, 1, 1), personal_tutor_id=1,
+            )
+        else:
+            # Spread over the seeded students and modules so every key is new
+            yield GradeBase(
+                student_id=f"{100000 + n // 10:06d}A", module_id=n % 10 + 1,
+                score=0.5,
+            )
+
+def run_path(directory: Path, handlers: dict, writes: int) -> dict:
+    engine = create_db_engine(f"sqlite:///{directory / 'bench.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Tutor), [{"id": 1, "first_name": "A", "last_name": "B"}])
+        conn.execute(insert(Module), [
+            {"id": m, "title": f"Module {m}", "module_tutor_id": 1}
+            for m in range(1, 11)
+        ])
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Students for the grades, inserted through the ORM so they get stats rows
+    with Session() as db:
+        db.add_all(
+            Student(student_id=f"{100000 + i:06d}A", personal_tutor_id=1)
+            for i in range(writes // 10 + 1)
+        )
+        db.commit()
+
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    results = {}
+    for kind, handler in handlers.items():
+        statements = 0
+        with Session() as db:
+            started = time.perf_counter()
+            for payload in payloads(kind, writes, offset=0):
+                handler(payload, db)
+            elapsed = time.perf_counter() - started
+        results[kind] = {
+            "writes_per_sec": round(writes / elapsed, 1),
+            "sql_statements_per_write": round(statements / writes, 2),
+        }
+    engine.dispose()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_writes_"))
+    try:
+        results = {}
+        for name, handlers in PATHS.items():
+            directory = workdir / name
+            directory.mkdir()
+            results[name] = run_path(directory, handlers, args.writes)
+        print(json.dumps({"writes": args.writes, "results": results}, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks start the API with uvicorn in a scratch directory, so the
+``./students.db`` they create never touches the development database.
+"""
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = round(pct / 100 * len(sorted_values)) - 1
+    rank = max(0, min(len(sorted_values) - 1, rank))
+    return sorted_values[rank]
+
+def summarize(
+    latencies: List[float], elapsed: float, errors: int = 0
+) -> Dict[str, float]:
+    """Throughput and latency percentiles (in milliseconds) for one run."""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def seed_sample_data(
+    workdir: Path,
+    env: Optional[Dict[str, str]] = None,
+    args: Sequence[str] = (),
+) -> None:
+    """Create ./students.db in ``workdir`` with sample_data.py ``args``."""
+    subprocess.run(
+        [sys.executable, str(BACKEND_DIR / "sample_data.py"), *args],
+        cwd=workdir,
+        env={**os.environ, **(env or {})},
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+@contextmanager
+def run_server(
+    workdir: Path,
+    env: Optional[Dict[str, str]] = None,
+    extra_args: Sequence[str] = (),
+    startup_timeout: float = 30.0,
+    workers: Optional[int] = None,
+) -> Iterator[str]:
+    """Run uvicorn against ``workdir`` and yield its base URL.
+
+    With ``workers`` the server is started through serve.py instead, with
+    that many worker processes.
+    """
+    port = free_port()
+    if workers is None:
+        command = [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--app-dir", str(BACKEND_DIR),
+        ]
+    else:
+        command = [
+            sys.executable, str(BACKEND_DIR / "serve.py"), "--workers", str(workers),
+        ]
+    process = subprocess.Popen(
+        [
+            *command,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+            *extra_args,
+        ],
+        cwd=workdir,
+        env={**os.environ, **(env or {})},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            try:
+                httpx.get(f"{base_url}/openapi.json", timeout=1.0)
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start in time")
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+async def drive_requests(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Dict[str, Any]],
+    concurrency: int,
+    duration: float,
+    start: int = 0,
+) -> Dict[str, float]:
+    """Send requests from ``concurrency`` workers for ``duration`` seconds.
+
+    ``make_request(i)`` returns the keyword arguments of
+    ``client.request`` for the i-th request; ``i`` counts from ``start``
+    across workers. Responses with a 5xx status count as errors.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count(start)
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            request = make_request(next(counter))
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                ok = response.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors)
+
+async def drive(
+    base_url: str,
+    paths: Sequence[str],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, float]:
+    """Issue GETs over ``paths`` from ``concurrency`` clients for ``duration`` s."""
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0)
+    async with client:
+        return await drive_requests(
+            client,
+            lambda i: {"method": "GET", "url": paths[i % len(paths)]},
+            concurrency,
+            duration,
+        )
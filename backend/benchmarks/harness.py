@@ -0,0 +1,449 @@
+"""HTTP benchmark of every route in routes.py, with regression checks.
+
+``run`` seeds a scratch database with sample_data.py, then drives each
+endpoint in turn at a fixed concurrency for ``--duration`` seconds, against
+a local uvicorn server or the app in process. It reports throughput,
+p50/p95/p99 latency and the SQL statements one uncached request executes,
+as JSON. Reads run before writes, so every read sees the seeded data.
+
+The response cache is off unless ``--response-cache`` is given, so the
+numbers measure the handlers rather than cache hits.
+
+``compare`` checks a run against a stored baseline and exits with status 1
+when an endpoint got slower or runs more SQL:
+
+    python -m benchmarks.harness run --students 10000 --output baseline.json
+    python -m benchmarks.harness run --students 10000 --baseline baseline.json
+    python -m benchmarks.harness compare baseline.json current.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import create_engine, event, text
+
+from benchmarks.common import drive_requests, run_server, seed_sample_data
+
+BULK_SIZE = 50
+SEARCH_QUERIES = ("ali", "sam", "gra", "noa", "smi", "pat")
+
+@dataclass
+class Dataset:
+    """Keys of the seeded rows that the scenarios build requests from."""
+    student_ids: List[str]
+    module_ids: List[int]
+    tutor_ids: List[int]
+    graded: List[Tuple[str, int]]
+    # Students and pairs not in the database yet, used up by the writes
+    new_student_ids: List[str]
+    ungraded: List[Tuple[str, int]]
+    rng: random.Random = field(default_factory=lambda: random.Random(0))
+
+    def student(self, i: int) -> str:
+        return self.student_ids[i % len(self.student_ids)]
+
+    def module(self, i: int) -> int:
+        return self.module_ids[i % len(self.module_ids)]
+
+    def tutor(self, i: int) -> int:
+        return self.tutor_ids[i % len(self.tutor_ids)]
+
+    def sample(self, values: list, size: int = BULK_SIZE) -> list:
+        return self.rng.sample(values, min(size, len(values)))
+
+    def take_ungraded(self, size: int) -> List[Tuple[str, int]]:
+        """Pairs without a grade; repeats (and gets 400s) once used up."""
+        if len(self.ungraded) < size:
+            return self.sample(self.graded, size)
+        taken, self.ungraded = self.ungraded[:size], self.ungraded[size:]
+        return taken
+
+def _grade(pair: Tuple[str, int], rng: random.Random) -> Dict[str, Any]:
+    return {"student_id": pair[0], "module_id": pair[1], "score": rng.random()}
+
+def _new_student(data: Dataset, i: int) -> Dict[str, Any]:
+    return {
+        "student_id": data.new_student_ids[i % len(data.new_student_ids)],
+        "first_name": "Bench",
+        "last_name": f"Student {i}",
+        "dob": "2000-01-01",
+        "personal_tutor_id": data.tutor(i),
+    }
+
+def _grades_csv(data: Dataset) -> bytes:
+    rows = [
+        f"{student_id},{module_id},{data.rng.random():.4f}"
+        for student_id, module_id in data.take_ungraded(BULK_SIZE)
+    ]
+    return "\n".join(["student_id,module_id,score", *rows]).encode()
+
+def _update_grade(data: Dataset, i: int) -> Dict[str, Any]:
+    pair = data.graded[i % len(data.graded)]
+    return {
+        "method": "PUT",
+        "url": f"/grades/{pair[0]}/{pair[1]}",
+        "json": _grade(pair, data.rng),
+    }
+
+def _get(url: Callable[[Dataset, int], str]):
+    return lambda data, i: {"method": "GET", "url": url(data, i)}
+
+def _post(url: str, body: Callable[[Dataset, int], Any]):
+    return lambda data, i: {"method": "POST", "url": url, "json": body(data, i)}
+
+# Route -> builder of the keyword arguments of httpx's request() for the
+# i-th request. Every route in routes.router needs an entry.
+SCENARIOS: Dict[str, Callable[[Dataset, int], Dict[str, Any]]] = {
+    "GET /students/": _get(lambda d, i: "/students/"),
+    "POST /students/batch": _post(
+        "/students/batch", lambda d, i: {"ids": d.sample(d.student_ids)}
+    ),
+    "GET /students/{student_id}": _get(lambda d, i: f"/students/{d.student(i)}"),
+    "GET /students/{student_id}/detail": _get(
+        lambda d, i: f"/students/{d.student(i)}/detail"
+    ),
+    "GET /students/{student_id}/grades": _get(
+        lambda d, i: f"/students/{d.student(i)}/grades"
+    ),
+    "GET /students/{student_id}/rank": _get(
+        lambda d, i: f"/students/{d.student(i)}/rank"
+    ),
+    "GET /modules/": _get(lambda d, i: "/modules/"),
+    "POST /modules/batch": _post(
+        "/modules/batch", lambda d, i: {"ids": d.sample(d.module_ids)}
+    ),
+    "GET /modules/{module_id}": _get(lambda d, i: f"/modules/{d.module(i)}"),
+    "GET /tutors/": _get(lambda d, i: "/tutors/"),
+    "POST /tutors/batch": _post(
+        "/tutors/batch", lambda d, i: {"ids": d.sample(d.tutor_ids)}
+    ),
+    "GET /tutors/{tutor_id}": _get(lambda d, i: f"/tutors/{d.tutor(i)}"),
+    "GET /grades/export": _get(lambda d, i: "/grades/export"),
+    "GET /grades/module/{module_id}": _get(
+        lambda d, i: f"/grades/module/{d.module(i)}"
+    ),
+    "GET /analytics/cohort": _get(lambda d, i: "/analytics/cohort"),
+    "GET /rankings/students": _get(lambda d, i: "/rankings/students"),
+    "GET /rankings/modules/{module_id}": _get(
+        lambda d, i: f"/rankings/modules/{d.module(i)}"
+    ),
+    "GET /search": _get(
+        lambda d, i: f"/search?q={SEARCH_QUERIES[i % len(SEARCH_QUERIES)]}"
+    ),
+    "GET /changes": _get(lambda d, i: "/changes?limit=100"),
+    "GET /cache/stats": _get(lambda d, i: "/cache/stats"),
+    "GET /metrics": _get(lambda d, i: "/metrics"),
+    "POST /students/": _post("/students/", _new_student),
+    "POST /modules/": _post(
+        "/modules/",
+        lambda d, i: {"title": f"Bench Module {i}", "module_tutor_id": d.tutor(i)},
+    ),
+    "POST /tutors/": _post(
+        "/tutors/",
+        lambda d, i: {
+            "first_name": "Bench",
+            "last_name": f"Tutor {i}",
+            "email": f"bench.tutor.{i}@example.com",
+        },
+    ),
+    "POST /grades/": _post(
+        "/grades/", lambda d, i: _grade(d.take_ungraded(1)[0], d.rng)
+    ),
+    "POST /grades/bulk": _post(
+        "/grades/bulk",
+        lambda d, i: [_grade(pair, d.rng) for pair in d.take_ungraded(BULK_SIZE)],
+    ),
+    "POST /grades/bulk/csv": lambda d, i: {
+        "method": "POST",
+        "url": "/grades/bulk/csv",
+        "content": _grades_csv(d),
+        "headers": {"Content-Type": "text/csv"},
+    },
+    "PUT /grades/{student_id}/{module_id}": _update_grade,
+}
+
+# Responses that never end; bench_events.py measures these
+STREAMING_ROUTES = {"GET /events/grades"}
+
+def route_keys() -> List[str]:
+    """``METHOD /path`` of every request/response route in routes.router."""
+    import routes
+
+    keys = (
+        f"{method} {route.path}"
+        for route in routes.router.routes
+        for method in sorted(route.methods)
+    )
+    return [key for key in keys if key not in STREAMING_ROUTES]
+
+def load_dataset(database: Path, seed: int, limit: int = 100000) -> Dataset:
+    from sample_data import unique_student_ids
+
+    engine = create_engine(f"sqlite:///{database}")
+    try:
+        with engine.connect() as conn:
+            def column(sql: str) -> list:
+                return list(conn.execute(text(sql)).scalars())
+
+            student_ids = column("SELECT student_id FROM students")
+            module_ids = column("SELECT id FROM modules ORDER BY id")
+            tutor_ids = column("SELECT id FROM tutors ORDER BY id")
+            graded = [tuple(row) for row in conn.execute(text(
+                "SELECT student_id, module_id FROM grades LIMIT :limit"
+            ), {"limit": limit})]
+            ungraded = [tuple(row) for row in conn.execute(text(
+                "SELECT s.student_id, m.id FROM students s CROSS JOIN modules m "
+                "WHERE NOT EXISTS (SELECT 1 FROM grades g "
+                "WHERE g.student_id = s.student_id AND g.module_id = m.id) "
+                "LIMIT :limit"
+            ), {"limit": limit})]
+    finally:
+        engine.dispose()
+    rng = random.Random(seed)
+    return Dataset(
+        student_ids=student_ids,
+        module_ids=module_ids,
+        tutor_ids=tutor_ids,
+        graded=graded,
+        new_student_ids=unique_student_ids(rng, limit, set(student_ids)),
+        ungraded=ungraded,
+        rng=rng,
+    )
+
+def ordered_scenarios(only: Optional[List[str]] = None) -> List[str]:
+    """Route keys to run, reads first and then writes."""
+    keys = [key for key in route_keys() if not only or key in only]
+    return sorted(keys, key=lambda key: not key.startswith("GET "))
+
+def in_process_app() -> Any:
+    """The app, bound to ./students.db in the current directory.
+
+    SQLAlchemy makes the SQLite path absolute when the engine is created,
+    so run() changes into the scratch directory before any module of the
+    app is imported.
+    """
+    import main
+
+    return main.app
+
+@contextmanager
+def count_statements() -> Iterator[List[int]]:
+    """Count the SQL statements the app's engines execute in the block."""
+    import database
+
+    engines = [database.engine]
+    if database.async_engine is not None:
+        engines.append(database.async_engine.sync_engine)
+    count = [0]
+
+    def on_execute(*args, **kwargs):
+        count[0] += 1
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield count
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+async def statements_per_request(
+    app, data: Dataset, keys: List[str]
+) -> Dict[str, int]:
+    """SQL statements of one uncached request (request 0) to each route."""
+    from cache import response_cache
+
+    counts = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for key in keys:
+            response_cache.clear()
+            with count_statements() as count:
+                await client.request(**SCENARIOS[key](data, 0))
+            counts[key] = count[0]
+    return counts
+
+@asynccontextmanager
+async def bench_client(base_url: Optional[str], app, concurrency: int):
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    if base_url is None:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench",
+            timeout=60.0,
+        )
+    else:
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0)
+    async with client:
+        yield client
+
+async def drive_scenarios(
+    base_url: Optional[str], app, data: Dataset, keys: List[str],
+    concurrency: int, duration: float,
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    async with bench_client(base_url, app, concurrency) as client:
+        for key in keys:
+            results[key] = await drive_requests(
+                client,
+                lambda i, build=SCENARIOS[key]: build(data, i),
+                concurrency,
+                duration,
+                start=1,
+            )
+            print(f"{key}: {results[key]['requests_per_sec']} req/s",
+                  file=sys.stderr)
+    return results
+
+def run(args) -> Dict[str, Any]:
+    # Set before the app modules are first imported and read their settings
+    env = {"RESPONSE_CACHE_SIZE": "1024" if args.response_cache else "0"}
+    os.environ.update(env)
+    seed_args = [
+        "--reset",
+        "--tutors", str(args.tutors),
+        "--modules", str(args.modules),
+        "--students", str(args.students),
+        "--grade-density", str(args.grade_density),
+        "--seed", str(args.seed),
+    ]
+    workdir = Path(tempfile.mkdtemp(prefix="bench_harness_"))
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        keys = ordered_scenarios(args.only)
+        seed_sample_data(workdir, env, seed_args)
+        data = load_dataset(workdir / "students.db", args.seed)
+        app = in_process_app()
+        # Request 0 of each route is the counted one; the load uses 1..
+        statements = asyncio.run(statements_per_request(app, data, keys))
+        base_url = None
+        with ExitStack() as stack:
+            if args.server == "uvicorn":
+                base_url = stack.enter_context(run_server(workdir, env=env))
+            endpoints = asyncio.run(drive_scenarios(
+                base_url, app, data, keys, args.concurrency, args.duration
+            ))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for key, result in endpoints.items():
+        result["sql_statements"] = statements[key]
+    return {
+        "config": {
+            "server": args.server,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "tutors": args.tutors,
+            "modules": args.modules,
+            "students": args.students,
+            "grade_density": args.grade_density,
+            "seed": args.seed,
+            "response_cache": args.response_cache,
+        },
+        "endpoints": endpoints,
+    }
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float = 0.2,
+    min_latency_ms: float = 1.0,
+) -> List[str]:
+    """Regressions of ``current`` against ``baseline``, one line each.
+
+    An endpoint regresses when its p95 latency rises by more than
+    ``tolerance`` (and by at least ``min_latency_ms``, to ignore noise on
+    fast routes), when its throughput falls by more than ``tolerance``, when
+    it runs more SQL statements, or when it has errors it did not have.
+    Endpoints missing from either run are skipped.
+    """
+    regressions = []
+    for key, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(key)
+        if after is None:
+            continue
+        p95, old_p95 = after["p95_ms"], before["p95_ms"]
+        if p95 > old_p95 * (1 + tolerance) and p95 - old_p95 >= min_latency_ms:
+            regressions.append(f"{key}: p95 {old_p95} ms -> {p95} ms")
+        rps, old_rps = after["requests_per_sec"], before["requests_per_sec"]
+        if rps < old_rps * (1 - tolerance):
+            regressions.append(f"{key}: throughput {old_rps} -> {rps} req/s")
+        if after["sql_statements"] > before["sql_statements"]:
+            regressions.append(
+                f"{key}: SQL statements {before['sql_statements']} -> "
+                f"{after['sql_statements']}"
+            )
+        if after["errors"] and not before["errors"]:
+            regressions.append(f"{key}: {after['errors']} errors")
+    return regressions
+
+def report(baseline_path: str, current: Dict[str, Any], tolerance: float) -> int:
+    baseline = json.loads(Path(baseline_path).read_text())
+    if baseline.get("config") != current.get("config"):
+        print("warning: baseline was run with a different config", file=sys.stderr)
+    regressions = compare(baseline, current, tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if not regressions:
+        print("No regressions against the baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed, benchmark and report")
+    run_parser.add_argument(
+        "--server", choices=("uvicorn", "inprocess"), default="uvicorn"
+    )
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=3.0)
+    run_parser.add_argument("--tutors", type=int, default=20)
+    run_parser.add_argument("--modules", type=int, default=10)
+    run_parser.add_argument("--students", type=int, default=10000)
+    run_parser.add_argument("--grade-density", type=float, default=0.8)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--response-cache", action="store_true")
+    run_parser.add_argument(
+        "--only", nargs="+", metavar="ROUTE",
+        help='Routes to run, e.g. "GET /students/"',
+    )
+    run_parser.add_argument("--output", help="Also write the results here")
+    run_parser.add_argument("--baseline", help="Compare against this run")
+    run_parser.add_argument("--tolerance", type=float, default=0.2)
+
+    compare_parser = commands.add_parser("compare", help="Compare two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        current = json.loads(Path(args.current).read_text())
+        sys.exit(report(args.baseline, current, args.tolerance))
+
+    results = run(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+    if args.baseline:
+        sys.exit(report(args.baseline, results, args.tolerance))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""In-process cache of serialized GET responses with ETag support.
+
+Entries are tagged (e.g. ``"modules"``, ``"student:123456A"``) and the
+write handlers in routes.py invalidate exactly the tags their change
+affects. Every cached response carries an ETag, so clients that send
+If-None-Match get a bodiless 304 when nothing has changed.
+"""
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from config import settings
+
+CACHE_STATUS_HEADER = "X-Cache"
+# Let browsers store responses but revalidate them with If-None-Match
+CACHE_CONTROL = "no-cache"
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    tags: Tuple[str, ...]
+    expires_at: float
+
+def render_json(data: Any) -> bytes:
+    """Serialize a handler result exactly as FastAPI's JSONResponse would.
+
+    Handlers on the fast path (see fast_json.py) return an already
+    rendered response, whose body is used as is.
+    """
+    if isinstance(data, Response):
+        return data.body
+    return JSONResponse(jsonable_encoder(data)).body
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    weak = "W/" + etag
+    return "*" in candidates or etag in candidates or weak in candidates
+
+def cache_key(request: Request) -> str:
+    query = sorted(request.query_params.multi_items())
+    return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in query)
+
+@dataclass
+class ResponseCache:
+    """Thread-safe LRU of serialized responses with a TTL and tag index."""
+    maxsize: int
+    ttl: float
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    _entries: "OrderedDict[str, CacheEntry]" = field(default_factory=OrderedDict)
+    _tag_keys: Dict[str, set] = field(default_factory=dict)
+    # Generation at which each tag was last invalidated
+    _tag_generation: Dict[str, int] = field(default_factory=dict)
+    _generation: int = 0
+    _cleared_generation: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, generation: int) -> bool:
+        """Store ``entry`` unless one of its tags was invalidated after
+        ``generation``, i.e. while the response was being built."""
+        with self._lock:
+            if generation < self._cleared_generation or any(
+                self._tag_generation.get(tag, -1) > generation for tag in entry.tags
+            ):
+                return False
+            self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._tag_generation[tag] = self._generation
+                for key in list(self._tag_keys.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def invalidate_all(self) -> None:
+        """Drop every entry, counting them as invalidations."""
+        with self._lock:
+            self._generation += 1
+            self._cleared_generation = self._generation
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tag_keys.clear()
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._generation += 1
+            self._cleared_generation = self._generation
+            self._entries.clear()
+            self._tag_keys.clear()
+            self._tag_generation.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def respond(
+        self,
+        request: Request,
+        tags: Iterable[str],
+        produce: Callable[[], Any],
+        sub_response: Optional[Response] = None,
+    ) -> Response:
+        """Serve ``request`` from the cache, building it with ``produce`` on a miss.
+
+        Headers the handler set on its injected ``sub_response`` (such as
+        the pagination cursor) are cached along with the body.
+        """
+        key = cache_key(request)
+        entry = self.get(key) if self.enabled else None
+        status = "HIT"
+        if entry is None:
+            status = "MISS"
+            generation = self.generation
+            body = render_json(produce())
+            headers = {}
+            if sub_response is not None:
+                headers = {
+                    name: value for name, value in sub_response.headers.items()
+                    if name.lower() not in ("content-length", "content-type")
+                }
+            entry = CacheEntry(
+                body=body,
+                etag=make_etag(body),
+                headers=headers,
+                tags=tuple(tags),
+                expires_at=time.monotonic() + self.ttl,
+            )
+            if self.enabled:
+                self.set(key, entry, generation)
+
+        headers = {
+            **entry.headers,
+            "ETag": entry.etag,
+            "Cache-Control": CACHE_CONTROL,
+            CACHE_STATUS_HEADER: status,
+        }
+        if etag_matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=entry.body, media_type="application/json", headers=headers
+        )
+
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_size, ttl=settings.response_cache_ttl
+)
+
+def cached(*tag_templates: str):
+    """Cache a GET endpoint's serialized response under the given tags.
+
+    Tags are formatted with the endpoint's arguments, e.g.
+    ``@cached("student:{student_id}")``. The endpoint must accept a
+    ``request: Request`` argument.
+    """
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            tags = [template.format(**arguments) for template in tag_templates]
+            return response_cache.respond(
+                arguments["request"],
+                tags,
+                lambda: endpoint(*args, **kwargs),
+                arguments.get("response"),
+            )
+
+        return wrapper
+
+    return decorator
+
+def invalidate_cache(*tags: str) -> None:
+    """Drop every cached response carrying one of ``tags``."""
+    response_cache.invalidate(*tags)
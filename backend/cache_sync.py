@@ -0,0 +1,108 @@
+"""Cross-process cache invalidation through SQLite's ``data_version``.
+
+Each worker process keeps its own response cache and reference data, so
+when several workers serve one database (see serve.py) a write handled by
+one has to reach the caches of the others. ``PRAGMA data_version`` changes
+whenever another connection commits to the database file, in this process
+or any other. A daemon thread holding one dedicated connection polls it
+every ``CACHE_SYNC_INTERVAL_MS`` and, when it changes, drops the response
+cache and has the reference data revalidated on its next read.
+
+The dedicated connection also sees this worker's own commits, and
+data_version only says that something changed. Every write therefore
+empties the whole cache of every worker, not just the tags the write
+endpoints invalidate (see cache.py). That is the price of needing no
+other service and no knowledge of what a commit touched. Mapping commits
+back to tags, e.g. from the change feed, would keep more of the cache
+but duplicate every endpoint's tag logic here. Databases other than
+SQLite fall back to the cache TTL and the reference data check.
+"""
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy.engine import Engine
+
+from cache import response_cache
+from config import settings
+from events import grade_events
+from reference_data import reference_cache
+
+logger = logging.getLogger(__name__)
+
+def invalidate_local_caches() -> None:
+    response_cache.invalidate_all()
+    reference_cache.recheck()
+    # Grade writes by other workers reach this worker's event streams
+    grade_events.notify()
+
+class DataVersionPoller:
+    """Call ``on_change`` after other connections commit to ``engine``'s file."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        interval: float,
+        on_change: Callable[[], None] = invalidate_local_caches,
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.on_change = on_change
+        self._connection = None
+        self._version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> bool:
+        """Read data_version once; True (after ``on_change``) if it moved."""
+        if self._connection is None:
+            # Taken out of the pool for good so no other work runs on it
+            self._connection = self.engine.raw_connection()
+            self._connection.detach()
+        cursor = self._connection.cursor()
+        try:
+            version = cursor.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            cursor.close()
+        changed = self._version is not None and version != self._version
+        self._version = version
+        if changed:
+            self.on_change()
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("data_version poll failed")
+
+    def start(self) -> None:
+        self.poll()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+def start_cache_sync(
+    engine: Engine, interval_ms: Optional[int] = None
+) -> Optional[DataVersionPoller]:
+    """Start polling when enabled and ``engine`` is a SQLite file database."""
+    if interval_ms is None:
+        interval_ms = settings.cache_sync_interval_ms
+    url = engine.url
+    if interval_ms <= 0 or url.get_backend_name() != "sqlite":
+        return None
+    if url.database in (None, "", ":memory:"):
+        return None
+    poller = DataVersionPoller(engine, interval_ms / 1000)
+    poller.start()
+    return poller
@@ -0,0 +1,175 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# PRAGMAs applied to every new SQLite connection, on top of foreign_keys=ON.
+# "default" keeps SQLite's own settings (rollback journal, full fsync on
+# every commit). "production" lets readers run alongside a writer (WAL),
+# only fsyncs at checkpoints (synchronous=NORMAL, still durable against
+# application crashes), memory-maps up to 256 MiB of the file, keeps a
+# 64 MiB page cache and waits up to 5 s for a lock instead of failing.
+SQLITE_PRAGMA_PROFILES: Dict[str, Dict[str, str]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": "268435456",
+        "cache_size": "-65536",
+        "temp_store": "MEMORY",
+        "busy_timeout": "5000",
+    },
+}
+
+# Allowed values for each tunable PRAGMA; None means any integer
+SQLITE_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+    "mmap_size": None,
+    "cache_size": None,
+    "busy_timeout": None,
+}
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag such as DB_ASYNC=1 from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def env_int(name: str, default: int, minimum: Optional[int] = None) -> int:
+    """Read an integer setting, no lower than ``minimum``, from the environment."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    if minimum is not None and number < minimum:
+        raise ValueError(f"{name} must be at least {minimum}, got {number}")
+    return number
+
+def validate_sqlite_pragma(name: str, value: str) -> str:
+    """Normalise a PRAGMA value, rejecting anything outside the known choices.
+
+    Values end up interpolated into PRAGMA statements, so they must never
+    be passed through unchecked.
+    """
+    if name not in SQLITE_PRAGMA_CHOICES:
+        raise ValueError(f"Unsupported SQLite pragma: {name}")
+    choices = SQLITE_PRAGMA_CHOICES[name]
+    value = str(value).strip()
+    if choices is None:
+        try:
+            return str(int(value))
+        except ValueError:
+            raise ValueError(f"SQLite pragma {name} must be an integer, got {value!r}")
+    if value.upper() not in choices:
+        raise ValueError(f"SQLite pragma {name} must be one of {sorted(choices)}")
+    return value.upper()
+
+@dataclass
+class Settings:
+    """Runtime configuration read from environment variables."""
+    database_url: str = "sqlite:///./students.db"
+    # Derived from database_url for SQLite; required for other databases
+    async_database_url: Optional[str] = None
+    # Connection pool sizing, ignored for in-memory SQLite
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    # Seconds before a pooled connection is replaced; -1 keeps them forever
+    db_pool_recycle: int = 1800
+    # Serve the CRUD endpoints from async handlers over an AsyncSession
+    async_db: bool = False
+    # Encode list endpoints from column rows with orjson (see fast_json.py)
+    fast_json: bool = False
+    # Entries kept by the GET response cache (0 disables it) and their TTL
+    response_cache_size: int = 1024
+    response_cache_ttl: int = 60
+    # Apply pending schema migrations at startup instead of refusing to start
+    auto_migrate: bool = False
+    # Seconds between checks that the cached tutors and modules still match
+    # the database, for changes made by other workers (0 disables)
+    reference_cache_check_seconds: int = 5
+    # Milliseconds between checks of SQLite's data_version for writes by
+    # other processes, which clear this process's caches (0 disables)
+    cache_sync_interval_ms: int = 0
+    # Grade event streams (see events.py): frames queued per subscriber,
+    # subscribers per process (0 for no limit) and seconds between checks
+    # for grade writes no notification announced (0 disables)
+    event_queue_size: int = 100
+    max_event_subscribers: int = 10000
+    event_poll_seconds: int = 5
+    # Log statements slower than this many milliseconds (0 disables)
+    slow_query_ms: int = 100
+    # Report per-request SQL counts and timings in a Server-Timing header
+    server_timing: bool = True
+    # Named PRAGMA profile, individually overridable with SQLITE_<PRAGMA>
+    sqlite_pragma_profile: str = "default"
+    sqlite_pragma_overrides: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        overrides = {
+            name: os.environ[f"SQLITE_{name.upper()}"]
+            for name in SQLITE_PRAGMA_CHOICES
+            if f"SQLITE_{name.upper()}" in os.environ
+        }
+        return cls(
+            database_url=os.getenv("DATABASE_URL") or cls.database_url,
+            async_database_url=os.getenv("ASYNC_DATABASE_URL") or None,
+            db_pool_size=env_int("DB_POOL_SIZE", cls.db_pool_size),
+            db_max_overflow=env_int("DB_MAX_OVERFLOW", cls.db_max_overflow),
+            db_pool_pre_ping=env_bool("DB_POOL_PRE_PING", cls.db_pool_pre_ping),
+            db_pool_recycle=env_int("DB_POOL_RECYCLE", cls.db_pool_recycle),
+            async_db=env_bool("DB_ASYNC", cls.async_db),
+            fast_json=env_bool("FAST_JSON", cls.fast_json),
+            response_cache_size=env_int(
+                "RESPONSE_CACHE_SIZE", cls.response_cache_size
+            ),
+            response_cache_ttl=env_int("RESPONSE_CACHE_TTL", cls.response_cache_ttl),
+            auto_migrate=env_bool("AUTO_MIGRATE", cls.auto_migrate),
+            reference_cache_check_seconds=env_int(
+                "REFERENCE_CACHE_CHECK_SECONDS", cls.reference_cache_check_seconds
+            ),
+            cache_sync_interval_ms=env_int(
+                "CACHE_SYNC_INTERVAL_MS", cls.cache_sync_interval_ms
+            ),
+            # A queue of size 0 would be unbounded
+            event_queue_size=env_int(
+                "EVENT_QUEUE_SIZE", cls.event_queue_size, minimum=1
+            ),
+            max_event_subscribers=env_int(
+                "MAX_EVENT_SUBSCRIBERS", cls.max_event_subscribers, minimum=0
+            ),
+            event_poll_seconds=env_int(
+                "EVENT_POLL_SECONDS", cls.event_poll_seconds, minimum=0
+            ),
+            slow_query_ms=env_int("SLOW_QUERY_MS", cls.slow_query_ms),
+            server_timing=env_bool("SERVER_TIMING", cls.server_timing),
+            sqlite_pragma_profile=os.getenv(
+                "SQLITE_PRAGMA_PROFILE", cls.sqlite_pragma_profile
+            ),
+            sqlite_pragma_overrides=overrides,
+        )
+
+    @property
+    def sqlite_pragmas(self) -> Dict[str, str]:
+        """The validated PRAGMAs of the selected profile plus overrides."""
+        if self.sqlite_pragma_profile not in SQLITE_PRAGMA_PROFILES:
+            raise ValueError(
+                f"Unknown SQLITE_PRAGMA_PROFILE {self.sqlite_pragma_profile!r}; "
+                f"expected one of {sorted(SQLITE_PRAGMA_PROFILES)}"
+            )
+        pragmas = {
+            **SQLITE_PRAGMA_PROFILES[self.sqlite_pragma_profile],
+            **self.sqlite_pragma_overrides,
+        }
+        return {
+            name: validate_sqlite_pragma(name, value)
+            for name, value in pragmas.items()
+        }
+
+settings = Settings.from_env()
@@ -1,23 +1,126 @@
+import functools
+from typing import Any, Callable, Dict, List
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from config import Settings, settings
 
-DATABASE_URL = "sqlite:///./students.db"  # SQLite file-based DB
+DATABASE_URL = settings.database_url
+SQLITE_PRAGMAS = settings.sqlite_pragmas
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def async_database_url(config: Settings = settings) -> str:
+    """URL for the async engine; SQLite URLs are switched to aiosqlite."""
+    if config.async_database_url:
+        return config.async_database_url
+    url = make_url(config.database_url)
+    if url.get_backend_name() != "sqlite":
+        raise ValueError("Set ASYNC_DATABASE_URL to use DB_ASYNC with this database")
+    return url.set(drivername="sqlite+aiosqlite").render_as_string(
+        hide_password=False
+    )
 
-# Enable foreign key constraints for SQLite
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
+def engine_options(url: str, config: Settings = settings) -> Dict[str, Any]:
+    """Keyword arguments for create_engine suited to the URL's dialect."""
+    url = make_url(url)
+    options: Dict[str, Any] = {}
+    if url.get_backend_name() == "sqlite":
+        if url.get_driver_name() == "pysqlite":
+            # Sessions may be used from any threadpool worker
+            options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases use a single-connection pool with no sizing
+            return options
+        if url.get_driver_name() == "aiosqlite":
+            # This SQLAlchemy release defaults file databases on aiosqlite to
+            # NullPool, which takes no sizing and reconnects per checkout
+            options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_pre_ping=config.db_pool_pre_ping,
+        pool_recycle=config.db_pool_recycle,
+    )
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, str]) -> None:
+    """Enable foreign keys and apply validated PRAGMAs to a new connection."""
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
     cursor.close()
 
+# Enable foreign key constraints and the configured tuning profile for SQLite
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection, SQLITE_PRAGMAS)
+
+def create_db_engine(url: str, config: Settings = settings, **kwargs) -> Engine:
+    """Create an engine for ``url``, adding the SQLite hooks only for SQLite."""
+    engine = create_engine(url, **{**engine_options(url, config), **kwargs})
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", set_sqlite_pragma)
+    return engine
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = None
+
+# Called with (engine, name) as each engine is created, e.g. to instrument it
+engine_created_hooks: List[Callable[[Engine, str], None]] = []
+
+# Engines are created on first use rather than at import, so importing the
+# app (a worker spawn, a test, a CLI) does not load the database drivers
+@functools.lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """The application's engine, bound to SessionLocal when created."""
+    engine = create_db_engine(DATABASE_URL)
+    SessionLocal.configure(bind=engine)
+    for hook in engine_created_hooks:
+        hook(engine, "sync")
+    return engine
+
+@functools.lru_cache(maxsize=None)
+def get_async_engine():
+    """The async engine, or None unless DB_ASYNC is enabled.
+
+    It needs an async driver, so it is only built when enabled.
+    """
+    global AsyncSessionLocal
+    if not settings.async_db:
+        return None
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = async_database_url()
+    async_engine = create_async_engine(url, **engine_options(url))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autocommit=False, autoflush=False
+    )
+    for hook in engine_created_hooks:
+        hook(async_engine.sync_engine, "async")
+    return async_engine
+
+def __getattr__(name: str):
+    # ``from database import engine`` keeps working, creating it on demand
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 Base = declarative_base()
 
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    if get_async_engine() is None:
+        raise RuntimeError("Set DB_ASYNC=1 to enable the async database session")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,303 @@
+"""Server-sent events for grade writes, served at GET /events/grades.
+
+Every grade created or updated (one at a time or by a bulk import) is
+pushed to each subscriber as one frame, with the student's recomputed
+average and classification:
+
+    id: 1234
+    event: grade
+    data: {"version": 1234, "student_id": "...", "module_id": 1, "score": 0.7,
+           "average_grade": 0.65, "classification": "Merit"}
+
+Events come from the grade ``version`` numbers of the change feed (see
+changes.py), not from the request that made the write. That way one
+worker can stream the writes of every worker. The write endpoints call
+``grade_events.notify()`` after their commit. The data_version poller
+(see cache_sync.py) does the same for commits by other processes, and the
+feed is also checked every ``EVENT_POLL_SECONDS`` unless that is 0. One pump task per
+process then reads the new versions with one indexed query, encodes each
+frame once and hands the same bytes to every subscriber.
+
+Each subscriber has a queue of at most ``EVENT_QUEUE_SIZE`` frames. A
+client that reads too slowly loses its oldest frames rather than growing
+the queue. It then gets an ``event: lagged`` frame and can catch up from
+GET /changes. A reconnecting EventSource sends ``Last-Event-ID``, and
+the missed events are replayed up to the same bound. Memory per worker
+is therefore bounded by the subscriber count times the queue size, and
+``MAX_EVENT_SUBSCRIBERS`` caps the former.
+
+Versions are only kept on SQLite (see changes.py), so elsewhere the
+endpoint answers 501 rather than streaming nothing. If the pump fails,
+its subscribers get an ``event: error`` frame and their streams end; the
+next subscriber starts a new pump.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from changes import require_change_versions
+from config import settings
+from database import SessionLocal, get_engine
+from fast_json import dumps
+from models import Grade, StudentGradeStats
+
+logger = logging.getLogger(__name__)
+
+# Sent when nothing else was, so proxies keep idle streams open
+KEEPALIVE_SECONDS = 15.0
+PUMP_BATCH_SIZE = 500
+RETRY_FRAME = b"retry: 3000\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+# The version of the frame that ends a stream
+CLOSED = -1
+
+Event = Tuple[int, bytes]
+
+def _default_session() -> Session:
+    get_engine()  # binds SessionLocal
+    return SessionLocal()
+
+def latest_grade_version(db: Session) -> int:
+    return db.scalar(select(func.max(Grade.version))) or 0
+
+def grade_events_since(db: Session, since: int, limit: int) -> List[Event]:
+    """The first ``limit`` grade writes after version ``since`` as frames."""
+    rows = db.execute(
+        select(
+            Grade.version,
+            Grade.student_id,
+            Grade.module_id,
+            Grade.score,
+            func.coalesce(StudentGradeStats.average_grade, 0.0).label(
+                "average_grade"
+            ),
+            func.coalesce(StudentGradeStats.classification, "Fail").label(
+                "classification"
+            ),
+        )
+        .outerjoin(
+            StudentGradeStats, StudentGradeStats.student_id == Grade.student_id
+        )
+        .where(Grade.version > since)
+        .order_by(Grade.version)
+        .limit(limit)
+    ).all()
+    return [
+        (row.version, format_event("grade", row._asdict(), row.version))
+        for row in rows
+    ]
+
+def format_event(
+    event: str, data: Dict[str, Any], event_id: Optional[int] = None
+) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+class Subscriber:
+    """One stream's bounded queue of (version, frame) pairs."""
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+        self.backlog: List[Event] = []
+        self.dropped = 0
+        self.last_version = 0
+
+    def offer(self, event: Event) -> bool:
+        """Queue ``event``, dropping the oldest one when full; False if so."""
+        dropped = self.queue.full()
+        if dropped:
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+        return not dropped
+
+    def take_gap(self) -> bytes:
+        """A lagged frame for the frames dropped since the last one."""
+        frame = format_event("lagged", {"dropped": self.dropped})
+        self.dropped = 0
+        return frame
+
+class GradeEventHub:
+    def __init__(self, session_factory: Callable[[], Session] = _default_session):
+        self.session_factory = session_factory
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._pump_task: Optional[asyncio.Task] = None
+        self._cursor = 0
+        self._last_frame_at = 0.0
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def full(self) -> bool:
+        limit = settings.max_event_subscribers
+        return limit > 0 and len(self._subscribers) >= limit
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "version": self._cursor,
+        }
+
+    def check_supported(self) -> None:
+        """Raise 501 unless the database keeps change versions."""
+        with self.session_factory() as db:
+            require_change_versions(db)
+
+    def notify(self) -> None:
+        """Have the pump look for new grade versions; safe from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            # The loop has closed since its last subscriber left
+            pass
+
+    def _read(self, query: Callable, *args):
+        with self.session_factory() as db:
+            return query(db, *args)
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(settings.event_queue_size)
+        loop = asyncio.get_running_loop()
+        if self._pump_task is None or self._pump_task.done() or self._loop is not loop:
+            self._loop, self._wake = loop, asyncio.Event()
+            self._ready = asyncio.Event()
+            self._pump_task = loop.create_task(self._pump())
+        # Subscribed before the replay is read, so every later event is in
+        # the replay, the queue or both; stream() skips the duplicates
+        self._subscribers.add(subscriber)
+        try:
+            # Writes committed from here on are past the pump's cursor
+            await self._ready.wait()
+            if last_event_id is not None:
+                limit = settings.event_queue_size
+                backlog = await run_in_threadpool(
+                    self._read, grade_events_since, last_event_id, limit + 1
+                )
+                if len(backlog) > limit:
+                    backlog = backlog[:limit]
+                    subscriber.dropped += 1
+                subscriber.backlog = backlog
+        except BaseException:
+            self.unsubscribe(subscriber)
+            raise
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._wake is not None:
+            self._wake.set()  # lets the pump exit
+
+    def publish(self, events: List[Event]) -> None:
+        for event in events:
+            for subscriber in self._subscribers:
+                if not subscriber.offer(event):
+                    self.dropped += 1
+            self.published += 1
+        self._last_frame_at = time.monotonic()
+
+    def _keep_alive(self) -> None:
+        """Queue a keepalive for idle streams; full queues have data pending."""
+        for subscriber in self._subscribers:
+            if not subscriber.queue.full():
+                subscriber.queue.put_nowait((0, KEEPALIVE_FRAME))
+        self._last_frame_at = time.monotonic()
+
+    def _close_all(self) -> None:
+        """End every current stream with an error frame."""
+        frame = format_event("error", {"detail": "Grade events are unavailable"})
+        for subscriber in self._subscribers:
+            subscriber.offer((CLOSED, frame))
+
+    async def _pump(self) -> None:
+        try:
+            await self._run_pump()
+        except Exception:
+            logger.exception("Grade event pump failed")
+            self._close_all()
+        finally:
+            self._ready.set()
+
+    async def _run_pump(self) -> None:
+        # Streams start from the writes committed after the first subscriber
+        self._cursor = await run_in_threadpool(self._read, latest_grade_version)
+        self._ready.set()
+        self._last_frame_at = time.monotonic()
+        while self._subscribers:
+            # Without a periodic poll only notify() and keepalives wake it
+            poll = settings.event_poll_seconds
+            timeout = min(poll, KEEPALIVE_SECONDS) if poll > 0 else KEEPALIVE_SECONDS
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._subscribers:
+                break
+            try:
+                await self._publish_new()
+            except Exception:
+                logger.exception("Reading grade events failed")
+            if time.monotonic() - self._last_frame_at >= KEEPALIVE_SECONDS:
+                self._keep_alive()
+
+    async def _publish_new(self) -> None:
+        while True:
+            events = await run_in_threadpool(
+                self._read, grade_events_since, self._cursor, PUMP_BATCH_SIZE
+            )
+            if events:
+                self._cursor = events[-1][0]
+            # Half a queue at a time, yielding in between, so that streams
+            # keeping up drain their queues before a large batch overflows them
+            step = max(1, settings.event_queue_size // 2)
+            for start in range(0, len(events), step):
+                self.publish(events[start:start + step])
+                await asyncio.sleep(0)
+            if len(events) < PUMP_BATCH_SIZE:
+                return
+
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """SSE frames for one client until it disconnects."""
+        subscriber = await self.subscribe(last_event_id)
+        try:
+            yield RETRY_FRAME
+            for version, frame in subscriber.backlog:
+                subscriber.last_version = version
+                yield frame
+            subscriber.backlog = []
+            if subscriber.dropped:
+                yield subscriber.take_gap()  # the replay was cut short
+            while True:
+                # A plain get: the pump queues the keepalives, so a put
+                # wakes the stream directly, with no timeout task per stream
+                version, frame = await subscriber.queue.get()
+                if subscriber.dropped:
+                    yield subscriber.take_gap()
+                if version == CLOSED:
+                    yield frame
+                    return
+                if not version:
+                    yield frame  # keepalive
+                elif version > subscriber.last_version:
+                    subscriber.last_version = version
+                    yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+grade_events = GradeEventHub()
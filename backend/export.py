@@ -0,0 +1,80 @@
+"""Streaming export of the full grade book as NDJSON or CSV.
+
+Rows are read through ``yield_per`` so only one batch is held in memory at
+a time, and each batch is encoded and sent before the next one is fetched.
+"""
+import csv
+import io
+from typing import Iterator
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from fast_json import dumps
+from models import Grade, Module, Student
+from schemas import ExportFormat
+
+EXPORT_BATCH_SIZE = 1000
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+def export_query(expand: bool = False):
+    """Every grade in primary key order, with student and module columns
+    when ``expand`` is set."""
+    columns = [Grade.student_id, Grade.module_id, Grade.score]
+    query = select(*columns)
+    if expand:
+        query = (
+            select(
+                *columns,
+                Student.first_name.label("student_first_name"),
+                Student.last_name.label("student_last_name"),
+                Module.title.label("module_title"),
+            )
+            .join(Student, Student.student_id == Grade.student_id)
+            .join(Module, Module.id == Grade.module_id)
+        )
+    return query.order_by(Grade.student_id, Grade.module_id)
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def stream_grades(
+    db: Session,
+    export_format: ExportFormat,
+    expand: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Yield the encoded export one batch of rows at a time.
+
+    FastAPI closes the request's session before a streaming body is sent,
+    so the session is used again here and closed once the export ends.
+    """
+    try:
+        result = db.execute(
+            export_query(expand).execution_options(yield_per=batch_size)
+        )
+        if export_format == ExportFormat.csv:
+            yield _csv_chunk([list(result.keys())])
+            for rows in result.partitions():
+                yield _csv_chunk(rows)
+        else:
+            for rows in result.partitions():
+                yield b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+    finally:
+        db.close()
+
+def export_response(
+    db: Session, export_format: ExportFormat, expand: bool = False
+) -> StreamingResponse:
+    filename = f"grades.{export_format.value}"
+    return StreamingResponse(
+        stream_grades(db, export_format, expand),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
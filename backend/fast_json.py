@@ -0,0 +1,61 @@
+"""Opt-in fast serialization path for the list endpoints (FAST_JSON=1).
+
+The default path loads ORM objects, builds a Pydantic response model per
+row and encodes the list with jsonable_encoder and the stdlib json module.
+The fast path selects only the response columns, turns each row into a
+plain dict and encodes the whole page with orjson in one call. Without
+orjson installed the stdlib encoder is used for the same dicts.
+"""
+import json
+from datetime import date
+
+from fastapi import Response
+from sqlalchemy import func
+
+from models import Grade, Module, Student, StudentGradeStats, Tutor
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Column order follows the field order of the matching response schema
+STUDENT_COLUMNS = (
+    Student.student_id,
+    Student.first_name,
+    Student.last_name,
+    Student.dob,
+    Student.personal_tutor_id,
+    func.coalesce(StudentGradeStats.average_grade, 0.0).label("average_grade"),
+    func.coalesce(StudentGradeStats.classification, "Fail").label("classification"),
+)
+MODULE_COLUMNS = (Module.title, Module.module_tutor_id, Module.id)
+TUTOR_COLUMNS = (Tutor.first_name, Tutor.last_name, Tutor.email, Tutor.title, Tutor.id)
+GRADE_COLUMNS = (Grade.student_id, Grade.module_id, Grade.score)
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(data) -> bytes:
+    """Encode ``data`` with orjson, or compact stdlib json if unavailable."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def rows_response(rows) -> FastJSONResponse:
+    """Encode column rows (as selected with the *_COLUMNS above) directly."""
+    return FastJSONResponse([row._asdict() for row in rows])
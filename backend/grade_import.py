@@ -0,0 +1,142 @@
+"""Bulk grade import shared by the JSON and CSV upload endpoints."""
+import csv
+import io
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models import Grade, Student
+from reference_data import reference_cache
+from schemas import GradeBase, GradeImportResult, GradeImportRow
+from stats import apply_grade_deltas
+from utils import chunked
+
+MAX_IMPORT_ROWS = 10000
+CSV_COLUMNS = ("student_id", "module_id", "score")
+
+def _existing_values(db: Session, column, values: list) -> set:
+    found = set()
+    for chunk in chunked(values):
+        found.update(db.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+def _existing_grade_keys(db: Session, keys: List[Tuple[str, int]]) -> set:
+    # Row-value IN (VALUES ...) cannot use the primary key on SQLite, so
+    # look up by student_id and module_id lists and match pairs here
+    wanted = set(keys)
+    modules = list({module_id for _, module_id in keys})
+    found = set()
+    for chunk in chunked(list({student_id for student_id, _ in keys})):
+        rows = db.execute(
+            select(Grade.student_id, Grade.module_id)
+            .where(Grade.student_id.in_(chunk), Grade.module_id.in_(modules))
+        )
+        found.update(key for key in map(tuple, rows) if key in wanted)
+    return found
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    )
+
+def parse_grade_csv(body: bytes) -> List[Dict[str, Any]]:
+    """Parse a CSV upload with a student_id,module_id,score header row."""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [c for c in CSV_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"CSV is missing column(s): {', '.join(missing)}"
+        )
+    return list(reader)
+
+def import_grades(db: Session, raw_rows: List[Any]) -> GradeImportResult:
+    """Validate and insert many grades in one transaction.
+
+    Duplicate and foreign key checks run as a handful of set-based
+    queries, accepted rows are written with a single executemany INSERT
+    and the student statistics are updated in one batch. Rejected rows do
+    not prevent the rest of the batch from being imported.
+    """
+    if len(raw_rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_IMPORT_ROWS} grades can be imported at once"
+        )
+
+    results: List[GradeImportRow] = []
+    candidates: List[Tuple[GradeImportRow, GradeBase]] = []
+    seen = set()
+    for index, raw in enumerate(raw_rows, start=1):
+        row = GradeImportRow(row=index, status="rejected")
+        results.append(row)
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("Row must be an object")
+            grade = GradeBase(**raw)
+        except ValidationError as e:
+            row.error = _validation_message(e)
+            continue
+        except (TypeError, ValueError) as e:
+            row.error = str(e)
+            continue
+
+        row.student_id, row.module_id = grade.student_id, grade.module_id
+        key = (grade.student_id, grade.module_id)
+        if key in seen:
+            row.error = "Duplicate grade within the import"
+            continue
+        seen.add(key)
+        candidates.append((row, grade))
+
+    students = _existing_values(
+        db, Student.student_id, list({g.student_id for _, g in candidates})
+    )
+    modules = reference_cache.existing_module_ids(
+        db, {g.module_id for _, g in candidates}
+    )
+    existing = _existing_grade_keys(db, list(seen))
+
+    accepted: List[Dict[str, Any]] = []
+    deltas: Dict[str, List[float]] = {}
+    for row, grade in candidates:
+        error: Optional[str] = None
+        if grade.student_id not in students:
+            error = f"Student {grade.student_id} not found"
+        elif grade.module_id not in modules:
+            error = f"Module {grade.module_id} not found"
+        elif (grade.student_id, grade.module_id) in existing:
+            error = (
+                f"Grade for student {grade.student_id} "
+                f"in module {grade.module_id} already exists"
+            )
+        if error:
+            row.error = error
+            continue
+        row.status = "accepted"
+        accepted.append(grade.dict())
+        delta = deltas.setdefault(grade.student_id, [0, 0.0])
+        delta[0] += 1
+        delta[1] += grade.score
+
+    if accepted:
+        db.execute(insert(Grade), accepted)
+        apply_grade_deltas(
+            db.connection(),
+            {sid: (count, total) for sid, (count, total) in deltas.items()}
+        )
+        db.commit()
+
+    return GradeImportResult(
+        accepted=len(accepted),
+        rejected=len(results) - len(accepted),
+        results=results
+    )
@@ -0,0 +1,130 @@
+"""Per-request SQL statistics, Server-Timing headers and a slow-query log.
+
+``instrument_engine`` times every statement an engine runs. While a
+request is being served, ``SQLTimingMiddleware`` keeps a ``RequestStats``
+in a context variable, which the engine hooks add each statement to, and
+reports the totals in a ``Server-Timing`` header:
+
+    Server-Timing: db;dur=3.42;desc="4 statements", db-slowest;dur=1.87,
+                   app;dur=5.10
+
+Statements slower than ``SLOW_QUERY_MS`` are logged as one JSON object
+each on the ``sql.slow`` logger, with the request they belong to. The
+statement text is logged without its parameters.
+
+Statements run by a streaming body after the headers are sent are logged
+but not counted in the header.
+"""
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from config import settings
+
+logger = logging.getLogger("sql.slow")
+
+MAX_LOGGED_STATEMENT = 2000
+
+@dataclass
+class RequestStats:
+    """SQL executed while serving one request."""
+    method: str = ""
+    path: str = ""
+    statements: int = 0
+    db_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self, total: float) -> str:
+        plural = "" if self.statements == 1 else "s"
+        metrics = [
+            f"db;dur={self.db_time * 1000:.2f};"
+            f'desc="{self.statements} statement{plural}"'
+        ]
+        if self.statements:
+            metrics.append(f"db-slowest;dur={self.slowest_time * 1000:.2f}")
+        metrics.append(f"app;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being served, or None outside a request."""
+    return _request_stats.get()
+
+def _compact(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()[:MAX_LOGGED_STATEMENT]
+
+def log_slow_query(statement: str, elapsed: float, stats: Optional[RequestStats]):
+    logger.warning(json.dumps({
+        "event": "slow_query",
+        "duration_ms": round(elapsed * 1000, 2),
+        "threshold_ms": settings.slow_query_ms,
+        "method": stats.method if stats else None,
+        "path": stats.path if stats else None,
+        "statement": _compact(statement),
+    }))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if 0 < settings.slow_query_ms <= elapsed * 1000:
+        log_slow_query(statement, elapsed, stats)
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement ``engine`` executes; safe to call twice."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class SQLTimingMiddleware:
+    """Collect the SQL stats of each HTTP request and, when ``header`` is
+    set, report them in a Server-Timing response header."""
+
+    def __init__(self, app, header: bool = True):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(method=scope["method"], path=scope["path"])
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.header:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", stats.server_timing(time.perf_counter() - started)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
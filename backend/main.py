@@ -1,9 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from cache_sync import start_cache_sync
+from config import settings
+from database import SessionLocal, engine_created_hooks, get_engine
+from instrumentation import SQLTimingMiddleware, instrument_engine
+from metrics import MetricsMiddleware, instrument_pool
+from migrations import ensure_current
+from pagination import NEXT_CURSOR_HEADER
+from reference_data import reference_cache
 import routes
 
-app = FastAPI()
+def instrument(engine, name):
+    instrument_engine(engine)
+    instrument_pool(engine, name)
+
+engine_created_hooks.append(instrument)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is migrated as a separate step (see migrations.py); startup
+    # only checks its version
+    engine = get_engine()
+    ensure_current(engine, auto_migrate=settings.auto_migrate)
+    with SessionLocal() as db:
+        reference_cache.load(db)
+    poller = start_cache_sync(engine)
+    yield
+    if poller is not None:
+        poller.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# Added first so it runs inside SQLTimingMiddleware and sees the SQL stats
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(SQLTimingMiddleware, header=settings.server_timing)
 
 # Enable CORS
 app.add_middleware(
@@ -12,8 +43,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
 
-Base.metadata.create_all(bind=engine)
-
-app.include_router(routes.router)
+if settings.async_db:
+    import async_routes
+    app.include_router(async_routes.router)
+else:
+    app.include_router(routes.router)
@@ -0,0 +1,205 @@
+"""Versioned schema migrations, run as a step of their own before the app:
+
+    python migrations.py upgrade   # apply pending migrations
+    python migrations.py current   # print the applied and latest versions
+
+``MIGRATIONS`` lists every schema change in order. Each function takes a
+connection and brings the schema from the previous version to its own,
+and the ``schema_version`` table records what has been applied. Every
+database, new or old, goes through the same steps, so each migration
+spells out its own DDL rather than reading the current models: migration
+1 creates the version 1 tables frozen below. A database created before
+migrations existed (tables but no ``schema_version``) is at version 0;
+migration 1 adds the tables and indexes it is missing and fills in the
+student grade statistics when they are empty.
+
+At startup the app only reads the version, and it refuses to serve an
+outdated schema unless ``AUTO_MIGRATE`` is set.
+"""
+import sys
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import (
+    CheckConstraint, Column, Date, DateTime, Float, ForeignKey, Index, Integer,
+    MetaData, String, Table, func, inspect, insert, select
+)
+from sqlalchemy.engine import Connection, Engine
+
+import models  # noqa: F401  registers the tables on Base.metadata
+import changes
+import search
+import stats
+from utils import chunked
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+# The schema at version 1, kept apart from Base.metadata so that model
+# changes (and its after_create hooks) never alter what migration 1 creates
+_v1 = MetaData()
+_v1_tutors = Table(
+    "tutors", _v1,
+    Column("id", Integer, primary_key=True),
+    Column("title", String(10)),
+    Column("first_name", String(50), nullable=False),
+    Column("last_name", String(50), nullable=False),
+    Column("email", String(100), unique=True),
+)
+_v1_modules = Table(
+    "modules", _v1,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String),
+    Column("module_tutor_id", Integer, ForeignKey("tutors.id"), index=True),
+)
+_v1_students = Table(
+    "students", _v1,
+    Column("student_id", String, primary_key=True, index=True),
+    Column("first_name", String),
+    Column("last_name", String),
+    Column("dob", Date),
+    Column("personal_tutor_id", Integer, ForeignKey("tutors.id"), index=True),
+)
+_v1_grades = Table(
+    "grades", _v1,
+    Column(
+        "student_id", String, ForeignKey("students.student_id"), primary_key=True
+    ),
+    Column("module_id", Integer, ForeignKey("modules.id"), primary_key=True),
+    Column("score", Float),
+    CheckConstraint("score BETWEEN 0 AND 1", name="check_score_range"),
+    Index("ix_grades_module_id_student_id", "module_id", "student_id"),
+)
+_v1_stats = Table(
+    "student_grade_stats", _v1,
+    Column(
+        "student_id", String, ForeignKey("students.student_id"), primary_key=True
+    ),
+    Column("grade_count", Integer, nullable=False, default=0),
+    Column("grade_sum", Float, nullable=False, default=0),
+    Column("average_grade", Float, nullable=False, default=0, index=True),
+    Column("classification", String, nullable=False, default="Fail", index=True),
+)
+
+def _initial_schema(connection: Connection) -> None:
+    _v1.create_all(bind=connection)
+    # create_all skips the indexes of tables that already exist
+    for table in _v1.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    search.create_search_indexes(connection)
+    # Schemas from before the stats table have students but no summaries
+    # of their grades, which every student read depends on
+    has_stats = connection.scalar(select(_v1_stats.c.student_id).limit(1))
+    has_students = connection.scalar(select(_v1_students.c.student_id).limit(1))
+    if has_students is not None and has_stats is None:
+        grades = _v1_grades.c
+        rows = connection.execute(
+            select(
+                _v1_students.c.student_id,
+                func.count(grades.score),
+                func.coalesce(func.sum(grades.score), 0.0),
+            )
+            .outerjoin(_v1_grades, grades.student_id == _v1_students.c.student_id)
+            .group_by(_v1_students.c.student_id)
+        ).all()
+        for chunk in chunked(rows, stats.REBUILD_CHUNK_SIZE):
+            connection.execute(insert(_v1_stats), [
+                {"student_id": sid, **stats.summarize(count, total)}
+                for sid, count, total in chunk
+            ])
+
+def _add_change_versions(connection: Connection) -> None:
+    inspector = inspect(connection)
+    for table in changes.VERSIONED_TABLES:
+        if "version" not in {c["name"] for c in inspector.get_columns(table.name)}:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table.name} ADD COLUMN version INTEGER"
+            )
+        for index in table.indexes:
+            if "version" in index.columns:
+                index.create(bind=connection, checkfirst=True)
+    changes.change_sequence.create(bind=connection, checkfirst=True)
+    changes.create_change_triggers(connection)
+    changes.backfill_versions(connection)
+    # Recreated so that their UPDATE triggers ignore version bumps
+    search.drop_search_indexes(connection)
+    search.create_search_indexes(connection)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Initial schema", _initial_schema),
+    Migration(2, "Change sequence versions", _add_change_versions),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+class SchemaOutdated(RuntimeError):
+    pass
+
+def current_version(connection: Connection) -> Optional[int]:
+    """The applied schema version, 0 for a pre-migrations schema and None
+    for an empty database."""
+    if inspect(connection).has_table(schema_version.name):
+        return connection.scalar(select(func.max(schema_version.c.version))) or 0
+    if inspect(connection).has_table(models.Student.__tablename__):
+        return 0
+    return None
+
+def _record(connection: Connection, migration: Migration) -> None:
+    connection.execute(insert(schema_version).values(
+        version=migration.version,
+        description=migration.description,
+        applied_at=datetime.now(timezone.utc),
+    ))
+
+def upgrade(bind: Engine) -> List[int]:
+    """Apply every pending migration in one transaction; return their versions."""
+    with bind.begin() as connection:
+        version = current_version(connection)
+        schema_version.create(bind=connection, checkfirst=True)
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version > (version or 0):
+                migration.apply(connection)
+                _record(connection, migration)
+                applied.append(migration.version)
+        return applied
+
+def ensure_current(bind: Engine, auto_migrate: bool = False) -> None:
+    """Raise SchemaOutdated unless the schema is at LATEST_VERSION, applying
+    the pending migrations instead when ``auto_migrate`` is set."""
+    with bind.connect() as connection:
+        version = current_version(connection)
+    if version == LATEST_VERSION:
+        return
+    if auto_migrate:
+        upgrade(bind)
+        return
+    raise SchemaOutdated(
+        f"Database schema is at version {version or 0}, expected {LATEST_VERSION}; "
+        "run `python migrations.py upgrade` or set AUTO_MIGRATE=1"
+    )
+
+if __name__ == "__main__":
+    from database import get_engine
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    engine = get_engine()
+    if command == "upgrade":
+        applied = upgrade(engine)
+        print(f"Applied migration(s) {applied}." if applied else "Schema is current.")
+    elif command == "current":
+        with engine.connect() as connection:
+            print(f"{current_version(connection) or 0} (latest {LATEST_VERSION})")
+    else:
+        print("Usage: python migrations.py [upgrade|current]")
+        sys.exit(2)
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Date, Float, Integer, ForeignKey, CheckConstraint
+from sqlalchemy import (
+    Column, String, Date, Float, Integer, ForeignKey, CheckConstraint, Index
+)
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -9,6 +11,8 @@ class Tutor(Base):
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(100), unique=True)
+    # Change sequence number, set by a trigger on every write (see changes.py)
+    version = Column(Integer, index=True)
 
     # Relationships
     taught_modules = relationship("Module", back_populates="module_tutor")
@@ -25,7 +29,8 @@ class Module(Base):
     __tablename__ = "modules"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
-    module_tutor_id = Column(Integer, ForeignKey("tutors.id"))
+    module_tutor_id = Column(Integer, ForeignKey("tutors.id"), index=True)
+    version = Column(Integer, index=True)
     module_tutor = relationship("Tutor", back_populates="taught_modules")
     grades = relationship("Grade", back_populates="module")
 
@@ -42,9 +47,13 @@ class Student(Base):
     first_name = Column(String)
     last_name = Column(String)
     dob = Column(Date)
-    personal_tutor_id = Column(Integer, ForeignKey("tutors.id"))
+    personal_tutor_id = Column(Integer, ForeignKey("tutors.id"), index=True)
+    version = Column(Integer, index=True)
     personal_tutor = relationship("Tutor", back_populates="personal_students")
     grades = relationship("Grade", back_populates="student")
+    grade_stats = relationship(
+        "StudentGradeStats", back_populates="student", uselist=False
+    )
 
     def __repr__(self):
         name = f"{self.first_name} {self.last_name}"
@@ -57,11 +66,15 @@ class Grade(Base):
     __tablename__ = "grades"
     __table_args__ = (
         CheckConstraint("score BETWEEN 0 AND 1", name="check_score_range"),
+        # The primary key only serves lookups by student; module grade
+        # listings filter on module_id and page on student_id
+        Index("ix_grades_module_id_student_id", "module_id", "student_id"),
     )
 
     student_id = Column(String, ForeignKey("students.student_id"), primary_key=True)
     module_id = Column(Integer, ForeignKey("modules.id"), primary_key=True)
     score = Column(Float)
+    version = Column(Integer, index=True)
     student = relationship("Student", back_populates="grades")
     module = relationship("Module", back_populates="grades")
 
@@ -70,3 +83,24 @@ class Grade(Base):
             f"<Grade(student='{self.student_id}', module={self.module_id}, "
             f"score={self.score})>"
         )
+
+class StudentGradeStats(Base):
+    """Per-student grade summary maintained on every grade write (see stats.py)."""
+    __tablename__ = "student_grade_stats"
+
+    student_id = Column(String, ForeignKey("students.student_id"), primary_key=True)
+    grade_count = Column(Integer, nullable=False, default=0)
+    grade_sum = Column(Float, nullable=False, default=0)
+    # Indexed so the rankings windows read averages in order without a sort
+    average_grade = Column(Float, nullable=False, default=0, index=True)
+    classification = Column(String, nullable=False, default="Fail", index=True)
+    # Bumped with every grade write, so student averages show up as changes
+    version = Column(Integer, index=True)
+    student = relationship("Student", back_populates="grade_stats")
+
+    def __repr__(self):
+        return (
+            f"<StudentGradeStats(student='{self.student_id}', "
+            f"count={self.grade_count}, average={self.average_grade}, "
+            f"classification='{self.classification}')>"
+        )
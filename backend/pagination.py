@@ -0,0 +1,96 @@
+import base64
+import json
+from enum import Enum
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query as OrmQuery
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+class PageParams:
+    """Query parameters shared by every paginated collection endpoint."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(
+            None, description="Opaque cursor from a previous X-Next-Cursor header"
+        ),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        order: SortOrder = SortOrder.asc,
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.order = order
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the key values of the last row of a page as an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(
+    cursor: str, size: int, types: Optional[Sequence[Any]] = None
+) -> List[Any]:
+    """Decode a cursor produced by encode_cursor or raise 400.
+
+    ``types`` gives the expected type (or tuple of types) of each value, so
+    a tampered cursor is rejected here rather than failing in the query.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if types is not None:
+        for value, expected in zip(values, types):
+            # bool is an int subclass, but JSON true is never a valid key
+            if isinstance(value, bool) or not isinstance(value, expected):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_paginate(
+    query: OrmQuery,
+    key_columns: Sequence[Any],
+    key_of: Callable[[Any], Sequence[Any]],
+    page: PageParams,
+) -> Tuple[list, Optional[str]]:
+    """Apply keyset pagination to ``query`` ordered by ``key_columns``.
+
+    Rows after the cursor are selected with a range predicate on the key
+    rather than an OFFSET, so every page costs the same to fetch. One
+    extra row is read to tell whether another page exists.
+    """
+    descending = page.order == SortOrder.desc
+    if page.cursor is not None:
+        values = decode_cursor(
+            page.cursor, len(key_columns),
+            [col.type.python_type for col in key_columns],
+        )
+        if len(key_columns) == 1:
+            key, bound = key_columns[0], values[0]
+        else:
+            key, bound = tuple_(*key_columns), tuple_(*values)
+        query = query.filter(key < bound if descending else key > bound)
+
+    ordering = [col.desc() if descending else col.asc() for col in key_columns]
+    rows = query.order_by(*ordering).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(key_of(rows[-1]))
+    return rows, next_cursor
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the cursor for the following page, if any, as a header."""
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
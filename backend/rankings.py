@@ -0,0 +1,133 @@
+"""Leaderboards and percentiles computed with SQL window functions.
+
+Ranks use RANK() so tied students share a position. Percentiles are
+PERCENT_RANK() over the ascending order, times 100: the share of the
+other ranked students with a strictly lower average (or score). Only
+students with at least one grade take part in the overall ranking.
+"""
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import Grade, Module, Student, StudentGradeStats
+from utils import get_or_404
+
+def _percentile(percent_rank: Optional[float]) -> Optional[float]:
+    return None if percent_rank is None else round(percent_rank * 100, 2)
+
+def ranked_students():
+    """Every graded student with their overall rank and percent rank."""
+    average = StudentGradeStats.average_grade
+    return select(
+        StudentGradeStats.student_id,
+        average,
+        StudentGradeStats.classification,
+        func.rank().over(order_by=average.desc()).label("rank"),
+        func.percent_rank().over(order_by=average).label("percent_rank"),
+    ).where(StudentGradeStats.grade_count > 0)
+
+def ranked_module_grades(module_filter):
+    """Grades of the modules matched by ``module_filter``, ranked per module."""
+    partition = Grade.module_id
+    return select(
+        Grade.module_id,
+        Grade.student_id,
+        Grade.score,
+        func.rank().over(partition_by=partition, order_by=Grade.score.desc())
+        .label("rank"),
+        func.percent_rank().over(partition_by=partition, order_by=Grade.score)
+        .label("percent_rank"),
+        func.count().over(partition_by=partition).label("students"),
+    ).where(module_filter)
+
+def top_students(db: Session, limit: int) -> List[Dict[str, Any]]:
+    ranked = ranked_students().subquery()
+    rows = db.execute(
+        select(ranked, Student.first_name, Student.last_name)
+        .join(Student, Student.student_id == ranked.c.student_id)
+        .order_by(ranked.c.rank, ranked.c.student_id)
+        .limit(limit)
+    )
+    return [
+        {
+            "rank": row.rank,
+            "percentile": _percentile(row.percent_rank),
+            "student_id": row.student_id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "average_grade": row.average_grade,
+            "classification": row.classification,
+        }
+        for row in rows
+    ]
+
+def top_module_students(
+    db: Session, module_id: int, limit: int
+) -> List[Dict[str, Any]]:
+    get_or_404(db, Module, id=module_id)
+    ranked = ranked_module_grades(Grade.module_id == module_id).subquery()
+    rows = db.execute(
+        select(ranked, Student.first_name, Student.last_name)
+        .join(Student, Student.student_id == ranked.c.student_id)
+        .order_by(ranked.c.rank, ranked.c.student_id)
+        .limit(limit)
+    )
+    return [
+        {
+            "rank": row.rank,
+            "percentile": _percentile(row.percent_rank),
+            "student_id": row.student_id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "score": row.score,
+        }
+        for row in rows
+    ]
+
+def student_rank(db: Session, student_id: str) -> Dict[str, Any]:
+    """A student's overall rank and their rank within each of their modules."""
+    student = db.query(Student).filter(Student.student_id == student_id).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    # Ordered like the percent_rank window so both share one pass over the
+    # average_grade index; the full frame makes it a total count
+    ranked = ranked_students().add_columns(
+        func.count().over(
+            order_by=StudentGradeStats.average_grade, range_=(None, None)
+        ).label("students")
+    ).subquery()
+    overall = db.execute(
+        select(ranked).where(ranked.c.student_id == student_id)
+    ).first()
+
+    student_modules = select(Grade.module_id).where(Grade.student_id == student_id)
+    module_ranked = ranked_module_grades(
+        Grade.module_id.in_(student_modules)
+    ).subquery()
+    modules = db.execute(
+        select(module_ranked, Module.title)
+        .join(Module, Module.id == module_ranked.c.module_id)
+        .where(module_ranked.c.student_id == student_id)
+        .order_by(module_ranked.c.module_id)
+    )
+    return {
+        "student_id": student_id,
+        "rank": overall.rank if overall else None,
+        "percentile": _percentile(overall.percent_rank) if overall else None,
+        "students": overall.students if overall else None,
+        "average_grade": overall.average_grade if overall else None,
+        "modules": [
+            {
+                "module_id": row.module_id,
+                "title": row.title,
+                "score": row.score,
+                "rank": row.rank,
+                "percentile": _percentile(row.percent_rank),
+                "students": row.students,
+            }
+            for row in modules
+        ],
+    }
@@ -0,0 +1,181 @@
+"""Process-wide in-memory copy of the tutors and modules tables.
+
+Tutors and modules change rarely and are small, so both tables are loaded
+in bulk (at startup, then again after any change) into an immutable
+snapshot that ``get_module``, ``get_tutor`` and their list endpoints read
+without a database round trip. Each load gets a new ``version``.
+
+A snapshot is dropped, to be reloaded by the next read, when:
+
+- a session commits ORM changes to a ``Tutor`` or ``Module``;
+- ``invalidate()`` is called, as the create endpoints do after their
+  Core INSERT commits;
+- another process changed the tables. Every ``REFERENCE_CACHE_CHECK_SECONDS``,
+  or after ``recheck()`` (see cache_sync.py), a read compares the row
+  counts and highest ids with the database in one query and reloads on a
+  mismatch. Rows missing from the snapshot are also looked up in the
+  database before a 404, so a row created by another worker is found
+  straight away.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from fast_json import MODULE_COLUMNS, TUTOR_COLUMNS
+from models import Module, Tutor
+from pagination import PageParams, SortOrder, decode_cursor, encode_cursor
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Tutor and module rows keyed and sorted by id, as loaded at ``version``."""
+    version: int
+    fingerprint: Tuple[Any, ...]
+    tutors: Dict[int, Any]
+    tutor_ids: List[int]
+    modules: Dict[int, Any]
+    module_ids: List[int]
+
+def _fingerprint(db: Session) -> Tuple[Any, ...]:
+    # Rows are only ever inserted, so a new row changes the count and
+    # usually the highest id; one statement covers both tables
+    return tuple(db.execute(select(
+        select(func.count()).select_from(Tutor).scalar_subquery(),
+        select(func.max(Tutor.id)).scalar_subquery(),
+        select(func.count()).select_from(Module).scalar_subquery(),
+        select(func.max(Module.id)).scalar_subquery(),
+    )).one())
+
+class ReferenceCache:
+    def __init__(self):
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._checked_at = 0.0
+        self._recheck = False
+        # Bumped by invalidate() so a load racing with a write is not kept
+        self._generation = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def recheck(self) -> None:
+        """Compare the snapshot with the database on the next read."""
+        self._recheck = True
+
+    def load(self, db: Session) -> ReferenceSnapshot:
+        """Read both tables and install them as the current snapshot."""
+        with self._lock:
+            generation = self._generation
+        fingerprint = _fingerprint(db)
+        tutors = db.execute(select(*TUTOR_COLUMNS).order_by(Tutor.id)).all()
+        modules = db.execute(select(*MODULE_COLUMNS).order_by(Module.id)).all()
+        with self._lock:
+            self._version += 1
+            snapshot = ReferenceSnapshot(
+                version=self._version,
+                fingerprint=fingerprint,
+                tutors={row.id: row for row in tutors},
+                tutor_ids=[row.id for row in tutors],
+                modules={row.id: row for row in modules},
+                module_ids=[row.id for row in modules],
+            )
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._checked_at = time.monotonic()
+        return snapshot
+
+    def snapshot(self, db: Session) -> ReferenceSnapshot:
+        """The current snapshot, loading or re-validating it when due."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load(db)
+        interval = settings.reference_cache_check_seconds
+        due = interval > 0 and time.monotonic() - self._checked_at >= interval
+        if due or self._recheck:
+            self._recheck = False
+            if _fingerprint(db) != snapshot.fingerprint:
+                return self.load(db)
+            self._checked_at = time.monotonic()
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "tutors": len(snapshot.tutor_ids) if snapshot else 0,
+            "modules": len(snapshot.module_ids) if snapshot else 0,
+        }
+
+    def _get_or_404(self, db: Session, model, rows_of, row_id: int):
+        row = rows_of(self.snapshot(db)).get(row_id)
+        if row is None and db.get(model, row_id) is not None:
+            # Created by another process since the last load
+            row = rows_of(self.load(db)).get(row_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+        return row
+
+    def tutor_or_404(self, db: Session, tutor_id: int):
+        return self._get_or_404(db, Tutor, lambda s: s.tutors, tutor_id)
+
+    def module_or_404(self, db: Session, module_id: int):
+        return self._get_or_404(db, Module, lambda s: s.modules, module_id)
+
+    def existing_module_ids(self, db: Session, module_ids) -> set:
+        """The ids in ``module_ids`` that belong to a module."""
+        snapshot = self.snapshot(db)
+        found = {i for i in module_ids if i in snapshot.modules}
+        missing = set(module_ids) - found
+        if missing:
+            found.update(db.scalars(select(Module.id).where(Module.id.in_(missing))))
+        return found
+
+reference_cache = ReferenceCache()
+
+def paginate_ids(
+    ids: List[int], rows: Dict[int, Any], page: PageParams
+) -> Tuple[list, Optional[str]]:
+    """keyset_paginate over rows held in memory, sorted ascending by ``ids``."""
+    descending = page.order == SortOrder.desc
+    if page.cursor is None:
+        end = len(ids) if descending else 0
+    else:
+        bound = decode_cursor(page.cursor, 1, [int])[0]
+        end = bisect_left(ids, bound) if descending else bisect_right(ids, bound)
+    if descending:
+        selected = ids[max(end - page.limit - 1, 0):end][::-1]
+    else:
+        selected = ids[end:end + page.limit + 1]
+
+    next_cursor = None
+    if len(selected) > page.limit:
+        selected = selected[:page.limit]
+        next_cursor = encode_cursor([selected[-1]])
+    return [rows[i] for i in selected], next_cursor
+
+@event.listens_for(Session, "after_flush")
+def _note_reference_writes(session, flush_context):
+    if any(
+        isinstance(obj, (Tutor, Module))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info["reference_data_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    # Dropped after the commit so a concurrent load cannot re-read the old rows
+    if session.info.pop("reference_data_changed", False):
+        reference_cache.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_reference_writes(session):
+    session.info.pop("reference_data_changed", None)
@@ -1,108 +1,272 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from models import Student, Module, Tutor, Grade
 from schemas import (
+    Classification,
+    CohortAnalytics,
+    StudentRanking, ModuleRanking, StudentRankResponse,
+    SearchResult, SearchType,
+    ChangeFeed,
+    ExportFormat,
+    IdBatchRequest,
+    StudentBatchRequest, StudentBatchResponse, StudentDetailResponse,
+    ModuleBatchResponse,
+    TutorBatchResponse,
     StudentBase, StudentResponse,
     ModuleBase, ModuleResponse,
     TutorBase, TutorResponse,
-    GradeBase, GradeResponse
+    GradeBase, GradeResponse,
+    GradeImportResult
 )
+from analytics import cohort_analytics
+from cache import cached, invalidate_cache, response_cache
+from changes import changes_since
+from config import settings
 from database import get_db
-from typing import List
+from fast_json import (
+    GRADE_COLUMNS, STUDENT_COLUMNS, rows_response
+)
+from events import grade_events
+from export import export_response
+from grade_import import import_grades, parse_grade_csv
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+import stats  # noqa: F401  registers the grade stats flush hook
+from pagination import MAX_PAGE_SIZE, PageParams, keyset_paginate, set_next_cursor
+from reference_data import paginate_ids, reference_cache
+from rankings import student_rank, top_module_students, top_students
+from search import search
+from typing import Any, List, Optional
 from utils import (
     build_student_response,
     build_module_response,
     build_tutor_response,
     build_grade_response,
+    build_student_detail_response,
+    build_batch_response,
+    fetch_by_ids,
     get_or_404,
-    check_exists
+    get_student_with_stats_or_404,
+    query_students_with_stats
 )
+from writes import insert_grade, insert_row, insert_student
 
 router = APIRouter()
 
 # Students Endpoints
 @router.post("/students/", response_model=StudentResponse)
 def create_student(student: StudentBase, db: Session = Depends(get_db)):
-    db_student = Student(**student.dict())
-    db.add(db_student)
+    db_student = insert_student(db, student.dict())
     db.commit()
-    db.refresh(db_student)
+    invalidate_cache("students", f"student:{db_student.student_id}", "analytics")
     return build_student_response(db_student)
 
 @router.get("/students/", response_model=List[StudentResponse])
-def get_all_students(db: Session = Depends(get_db)):
-    students = db.query(Student).all()
-    return [build_student_response(student) for student in students]
+@cached("students")
+def get_all_students(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    personal_tutor_id: Optional[int] = None,
+    classification: Optional[Classification] = None,
+    db: Session = Depends(get_db)
+):
+    query = query_students_with_stats(
+        db, classification.value if classification else None
+    )
+    if personal_tutor_id is not None:
+        query = query.filter(Student.personal_tutor_id == personal_tutor_id)
+    fast = settings.fast_json
+    if fast:
+        query = query.with_entities(*STUDENT_COLUMNS)
+    rows, next_cursor = keyset_paginate(
+        query,
+        [Student.student_id],
+        lambda row: [row.student_id if fast else row[0].student_id],
+        page
+    )
+    set_next_cursor(response, next_cursor)
+    if fast:
+        return rows_response(rows)
+    return [
+        build_student_response(student, grade_stats)
+        for student, grade_stats in rows
+    ]
+
+@router.post("/students/batch", response_model=StudentBatchResponse)
+def get_students_batch(batch: StudentBatchRequest, db: Session = Depends(get_db)):
+    found = fetch_by_ids(
+        query_students_with_stats(db),
+        Student.student_id,
+        batch.ids,
+        lambda row: row[0].student_id
+    )
+    return build_batch_response(
+        batch.ids, found, lambda row: build_student_response(*row)
+    )
 
 @router.get("/students/{student_id}", response_model=StudentResponse)
-def get_student(student_id: str, db: Session = Depends(get_db)):
-    student = get_or_404(db, Student, student_id=student_id)
-    return build_student_response(student)
+@cached("student:{student_id}")
+def get_student(student_id: str, request: Request, db: Session = Depends(get_db)):
+    return build_student_response(*get_student_with_stats_or_404(db, student_id))
+
+@router.get("/students/{student_id}/detail", response_model=StudentDetailResponse)
+@cached("student:{student_id}")
+def get_student_detail(
+    student_id: str, request: Request, db: Session = Depends(get_db)
+):
+    row = get_student_with_stats_or_404(db, student_id)
+    return build_student_detail_response(db, *row)
 
 @router.get("/students/{student_id}/grades", response_model=List[GradeResponse])
-def get_student_grades(student_id: str, db: Session = Depends(get_db)):
+@cached("student:{student_id}")
+def get_student_grades(
+    student_id: str, request: Request, db: Session = Depends(get_db)
+):
     student = db.query(Student).filter(Student.student_id == student_id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return student.grades
+    return [build_grade_response(grade) for grade in student.grades]
 
 # Modules Endpoints
 @router.post("/modules/", response_model=ModuleResponse)
 def create_module(module: ModuleBase, db: Session = Depends(get_db)):
-    db_module = Module(**module.dict())
-    db.add(db_module)
+    db_module = insert_row(db, Module, module.dict())
     db.commit()
-    db.refresh(db_module)
+    reference_cache.invalidate()
+    invalidate_cache("modules", "analytics")
     return build_module_response(db_module)
 
 @router.get("/modules/", response_model=List[ModuleResponse])
-def get_all_modules(db: Session = Depends(get_db)):
-    modules = db.query(Module).all()
+@cached("modules")
+def get_all_modules(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    module_tutor_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    snapshot = reference_cache.snapshot(db)
+    module_ids = snapshot.module_ids
+    if module_tutor_id is not None:
+        module_ids = [
+            module_id for module_id in module_ids
+            if snapshot.modules[module_id].module_tutor_id == module_tutor_id
+        ]
+    modules, next_cursor = paginate_ids(module_ids, snapshot.modules, page)
+    set_next_cursor(response, next_cursor)
+    if settings.fast_json:
+        return rows_response(modules)
     return [build_module_response(module) for module in modules]
 
+@router.post("/modules/batch", response_model=ModuleBatchResponse)
+def get_modules_batch(batch: IdBatchRequest, db: Session = Depends(get_db)):
+    found = fetch_by_ids(
+        db.query(Module), Module.id, batch.ids, lambda module: module.id
+    )
+    return build_batch_response(batch.ids, found, build_module_response)
+
 @router.get("/modules/{module_id}", response_model=ModuleResponse)
-def get_module(module_id: int, db: Session = Depends(get_db)):
-    module = get_or_404(db, Module, id=module_id)
-    return build_module_response(module)
+@cached("modules")
+def get_module(module_id: int, request: Request, db: Session = Depends(get_db)):
+    return build_module_response(reference_cache.module_or_404(db, module_id))
 
 # Tutors Endpoints
 @router.post("/tutors/", response_model=TutorResponse)
 def create_tutor(tutor: TutorBase, db: Session = Depends(get_db)):
-    db_tutor = Tutor(**tutor.dict())
-    db.add(db_tutor)
+    db_tutor = insert_row(db, Tutor, tutor.dict())
     db.commit()
-    db.refresh(db_tutor)
+    reference_cache.invalidate()
+    invalidate_cache("tutors", "analytics")
     return build_tutor_response(db_tutor)
 
 @router.get("/tutors/", response_model=List[TutorResponse])
-def get_all_tutors(db: Session = Depends(get_db)):
-    tutors = db.query(Tutor).all()
+@cached("tutors")
+def get_all_tutors(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db)
+):
+    snapshot = reference_cache.snapshot(db)
+    tutors, next_cursor = paginate_ids(snapshot.tutor_ids, snapshot.tutors, page)
+    set_next_cursor(response, next_cursor)
+    if settings.fast_json:
+        return rows_response(tutors)
     return [build_tutor_response(tutor) for tutor in tutors]
 
+@router.post("/tutors/batch", response_model=TutorBatchResponse)
+def get_tutors_batch(batch: IdBatchRequest, db: Session = Depends(get_db)):
+    found = fetch_by_ids(db.query(Tutor), Tutor.id, batch.ids, lambda tutor: tutor.id)
+    return build_batch_response(batch.ids, found, build_tutor_response)
+
 @router.get("/tutors/{tutor_id}", response_model=TutorResponse)
-def get_tutor(tutor_id: int, db: Session = Depends(get_db)):
-    tutor = get_or_404(db, Tutor, id=tutor_id)
-    return build_tutor_response(tutor)
+@cached("tutors")
+def get_tutor(tutor_id: int, request: Request, db: Session = Depends(get_db)):
+    return build_tutor_response(reference_cache.tutor_or_404(db, tutor_id))
 
 # Grades Endpoints
 @router.post("/grades/", response_model=GradeResponse)
 def create_grade(grade: GradeBase, db: Session = Depends(get_db)):
-    if check_exists(db, Grade, student_id=grade.student_id, module_id=grade.module_id):
+    db_grade = insert_grade(db, grade.dict())
+    if db_grade is None:
         error_msg = (
             f"Grade for student {grade.student_id} "
             f"in module {grade.module_id} already exists"
         )
         raise HTTPException(status_code=400, detail=error_msg)
-    
-    db_grade = Grade(**grade.dict())
-    db.add(db_grade)
     db.commit()
-    db.refresh(db_grade)
+    invalidate_grade_caches([(db_grade.student_id, db_grade.module_id)])
+    grade_events.notify()
     return build_grade_response(db_grade)
 
+@router.post("/grades/bulk", response_model=GradeImportResult)
+def bulk_create_grades(
+    grades: List[Any] = Body(...),
+    db: Session = Depends(get_db)
+):
+    result = import_grades(db, grades)
+    invalidate_imported_grades(result)
+    return result
+
+@router.post("/grades/bulk/csv", response_model=GradeImportResult)
+def bulk_create_grades_csv(
+    body: bytes = Body(..., media_type="text/csv"),
+    db: Session = Depends(get_db)
+):
+    result = import_grades(db, parse_grade_csv(body))
+    invalidate_imported_grades(result)
+    return result
+
+@router.get("/grades/export")
+def export_grades(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    expand: bool = False,
+    db: Session = Depends(get_db)
+):
+    return export_response(db, export_format, expand)
+
 @router.get("/grades/module/{module_id}", response_model=List[GradeResponse])
-def get_module_grades(module_id: int, db: Session = Depends(get_db)):
-    grades = db.query(Grade).filter(Grade.module_id == module_id).all()
+@cached("module:{module_id}:grades")
+def get_module_grades(
+    module_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db)
+):
+    # module_id is fixed by the path, so student_id completes the grade key
+    fast = settings.fast_json
+    query = db.query(*GRADE_COLUMNS) if fast else db.query(Grade)
+    query = query.filter(Grade.module_id == module_id)
+    grades, next_cursor = keyset_paginate(
+        query, [Grade.student_id], lambda grade: [grade.student_id], page
+    )
+    set_next_cursor(response, next_cursor)
+    if fast:
+        return rows_response(grades)
     return [build_grade_response(grade) for grade in grades]
 
 @router.put("/grades/{student_id}/{module_id}", response_model=GradeResponse)
@@ -117,6 +281,114 @@ def update_grade(
     for key, value in grade.dict().items():
         setattr(db_grade, key, value)
     
+    # Built before commit expires the row, so no reload is needed
+    db.flush()
+    response = build_grade_response(db_grade)
     db.commit()
-    db.refresh(db_grade)
-    return build_grade_response(db_grade)
\ No newline at end of file
+    invalidate_grade_caches([
+        (student_id, module_id), (response.student_id, response.module_id)
+    ])
+    grade_events.notify()
+    return response
+
+# Analytics Endpoints
+@router.get("/analytics/cohort", response_model=CohortAnalytics)
+@cached("analytics")
+def get_cohort_analytics(request: Request, db: Session = Depends(get_db)):
+    return cohort_analytics(db)
+
+# Rankings Endpoints
+@router.get("/rankings/students", response_model=List[StudentRanking])
+@cached("rankings")
+def get_top_students(
+    request: Request,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    return top_students(db, limit)
+
+@router.get("/rankings/modules/{module_id}", response_model=List[ModuleRanking])
+@cached("rankings")
+def get_top_module_students(
+    module_id: int,
+    request: Request,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    return top_module_students(db, module_id, limit)
+
+@router.get("/students/{student_id}/rank", response_model=StudentRankResponse)
+@cached("rankings")
+def get_student_rank(
+    student_id: str, request: Request, db: Session = Depends(get_db)
+):
+    return student_rank(db, student_id)
+
+# Search Endpoints
+@router.get("/search", response_model=List[SearchResult])
+@cached("students", "tutors", "modules")
+def search_directory(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200),
+    type: Optional[List[SearchType]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    types = [t.value for t in type] if type else None
+    results, next_cursor = search(db, q, types, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return results
+
+# Changes Endpoints
+@router.get("/changes", response_model=ChangeFeed)
+def get_changes(
+    since: Optional[str] = Query(
+        None, description="Cursor from a previous response; omit to start over"
+    ),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    changes, cursor, has_more = changes_since(db, since, limit)
+    return {"changes": changes, "cursor": cursor, "has_more": has_more}
+
+# Events Endpoints
+@router.get("/events/grades", response_class=StreamingResponse)
+async def stream_grade_events(last_event_id: Optional[int] = Header(None)):
+    grade_events.check_supported()
+    if grade_events.full():
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+    return StreamingResponse(
+        grade_events.stream(last_event_id),
+        media_type="text/event-stream",
+        # Keeps proxies such as nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Cache Endpoints
+@router.get("/cache/stats")
+def get_cache_stats():
+    return {**response_cache.stats(), "reference_data": reference_cache.stats()}
+
+# Metrics Endpoints
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+def invalidate_grade_caches(keys):
+    """Invalidate cached reads affected by writing grades with these keys."""
+    tags = {"students", "analytics", "rankings"}
+    for student_id, module_id in keys:
+        tags.add(f"student:{student_id}")
+        tags.add(f"module:{module_id}:grades")
+    invalidate_cache(*tags)
+
+def invalidate_imported_grades(result: GradeImportResult):
+    if not result.accepted:
+        return
+    invalidate_grade_caches(
+        (row.student_id, row.module_id)
+        for row in result.results if row.status == "accepted"
+    )
+    grade_events.notify()
\ No newline at end of file
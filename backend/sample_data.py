@@ -1,154 +1,286 @@
-from datetime import datetime
-from models import Student, Tutor, Module, Grade
+"""Populate the database with synthetic tutors, modules, students and grades.
+
+Sizes are parameters, so the same script seeds the small demo database and
+production-scale fixtures for benchmarking. Rows are bulk-inserted with
+Core ``insert()`` executemany calls in chunks of ``--chunk-size``, and the
+student grade statistics are rebuilt with one statement at the end:
+
+    python sample_data.py --reset                      # demo data
+    python sample_data.py --reset --students 1000000 --modules 10 --seed 1
+
+Without ``--reset`` the rows are added to the existing data; with
+``--if-empty`` nothing is generated when there already are students, so
+container starts keep their data. Pending schema migrations are applied
+first.
+"""
+import argparse
 import random
-import string   
-from database import engine, Base
-from sqlalchemy.orm import Session
-
-def generate_student_id():
-    """Generate a student ID matching 6 digits + 1 letter (e.g., 123456A)"""
-    return f"{random.randint(100000, 999999)}{random.choice(string.ascii_uppercase)}"
-
-def create_sample_data(db: Session):
-    try:
-        Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
-
-        # 1. Create Tutors
-        email_domain = "university.ac.uk"
-        tutors = [
-            Tutor(
-                title="Dr",
-                first_name="John",
-                last_name="Smith",
-                email=f"john.smith@{email_domain}"
-            ),
-            Tutor(
-                title="Prof",
-                first_name="Brown",
-                last_name="Johnson",
-                email=f"brown.johnson@{email_domain}"
-            ),
-            Tutor(
-                title="Dr",
-                first_name="Lee",
-                last_name="Jones",
-                email=f"lee.jones@{email_domain}"
-            )
-        ]
-        db.add_all(tutors)
-        db.commit()  # Flush to get tutor IDs
-
-        # 2. Create Modules
-        modules = [
-            Module(title="Mathematics", module_tutor_id=tutors[0].id),
-            Module(title="Literature", module_tutor_id=tutors[1].id),
-            Module(title="Computer Science", module_tutor_id=tutors[2].id)
-        ]
-        db.add_all(modules)
-        db.commit()  # Flush to get module IDs
-
-        # 3. Create Students with Personal Tutors
-        students = [
-            Student(
-                student_id=generate_student_id(),
-                first_name="Alice",
-                last_name="Brown",
-                dob=datetime(2000, 5, 15),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Bob",
-                last_name="Wilson",
-                dob=datetime(2001, 8, 22),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Charlie",
-                last_name="Davis",
-                dob=datetime(2000, 3, 10),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="David",
-                last_name="Evans",
-                dob=datetime(2001, 11, 30),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Frank",
-                last_name="Garcia",
-                dob=datetime(2000, 7, 15),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Grace",
-                last_name="Hernandez",
-                dob=datetime(2002, 2, 28),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Henry",
-                last_name="Ibarra",
-                dob=datetime(2001, 9, 12),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Ivy",
-                last_name="Johnson",
-                dob=datetime(2001, 4, 25),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Jack",
-                last_name="Kim",
-                dob=datetime(2001, 1, 18),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            Student(
-                student_id=generate_student_id(),
-                first_name="Liam",
-                last_name="Lopez",
-                dob=datetime(2001, 10, 14),
-                personal_tutor_id=tutors[random.randint(0, 2)].id
-            ),
-            
-        ]
-        db.add_all(students)
-        db.commit()
-
-        # 4. Create Grades (linking students to modules)
-        grade_records = []
-        for student in students:
-            for module in modules:
-                grade_records.append(
-                    Grade(
-                        student_id=student.student_id,
-                        module_id=module.id,
-                        score=round(random.uniform(0.4, 1.0), 2) 
-                    )
-                )
-        
-        db.add_all(grade_records)
-        db.commit()
-
-        print("Sample data created successfully!")
-
-    except Exception as e:
-        db.rollback()
-        print(f"Error: {e}")
-    finally:
-        db.close()
+import string
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+import changes
+import migrations
+import search
+import stats
+from database import Base, engine
+from models import Grade, Module, Student, Tutor
+from utils import chunked
+
+CHUNK_SIZE = 10000
+EMAIL_DOMAIN = "university.ac.uk"
+
+# 6 digits + 1 letter, e.g. 123456A
+STUDENT_ID_SPACE = 900000 * 26
+
+FIRST_NAMES = (
+    "Alice", "Bob", "Charlie", "David", "Emma", "Frank", "Grace", "Henry",
+    "Ivy", "Jack", "Liam", "Mia", "Noah", "Olivia", "Priya", "Quentin",
+    "Ruby", "Sam", "Tara", "Umar", "Violet", "Wei", "Xavier", "Yara", "Zoe",
+)
+LAST_NAMES = (
+    "Brown", "Davis", "Evans", "Garcia", "Hernandez", "Ibarra", "Johnson",
+    "Jones", "Kim", "Lee", "Lopez", "Martin", "Nguyen", "Owen", "Patel",
+    "Quinn", "Roberts", "Smith", "Taylor", "Wilson", "Wright", "Young",
+)
+SUBJECTS = (
+    "Mathematics", "Literature", "Computer Science", "Physics", "Chemistry",
+    "Biology", "History", "Economics", "Philosophy", "Psychology",
+)
+TUTOR_TITLES = ("Dr", "Prof")
+
+def student_id_at(position: int) -> str:
+    """The student ID at ``position`` in 0..STUDENT_ID_SPACE - 1."""
+    number, letter = divmod(position, 26)
+    return f"{100000 + number}{string.ascii_uppercase[letter]}"
+
+def generate_student_id(taken: Set[str], rng: random.Random = random) -> str:
+    """Generate a student ID matching 6 digits + 1 letter (e.g., 123456A)
+    that is not in ``taken``, and add it there."""
+    if len(taken) >= STUDENT_ID_SPACE:
+        raise ValueError("Every student ID is taken")
+    while True:
+        student_id = student_id_at(rng.randrange(STUDENT_ID_SPACE))
+        if student_id not in taken:
+            taken.add(student_id)
+            return student_id
+
+def unique_student_ids(
+    rng: random.Random, count: int, taken: Set[str] = frozenset()
+) -> List[str]:
+    """``count`` distinct random student IDs, none of them in ``taken``."""
+    if count + len(taken) > STUDENT_ID_SPACE:
+        raise ValueError(f"Cannot generate {count} more unique student IDs")
+    # Sampling without replacement guarantees uniqueness; the extra draws
+    # cover any that are already taken
+    positions = rng.sample(range(STUDENT_ID_SPACE), count + len(taken))
+    ids = (student_id_at(p) for p in positions)
+    return [student_id for student_id in ids if student_id not in taken][:count]
+
+def _random_dob(rng: random.Random) -> date:
+    return date(1998, 1, 1) + timedelta(days=rng.randrange(6 * 365))
+
+def _next_id(connection: Connection, column) -> int:
+    return (connection.execute(select(func.max(column))).scalar() or 0) + 1
+
+def _insert_chunks(
+    connection: Connection, table, rows: Iterable[dict], chunk_size: int
+) -> int:
+    inserted = 0
+    for chunk in chunked(rows, chunk_size):
+        connection.execute(insert(table), chunk)
+        inserted += len(chunk)
+    return inserted
+
+def _insert_tuple_chunks(
+    connection: Connection, table, keys: List[str], rows: Iterable[tuple],
+    chunk_size: int
+) -> int:
+    """Insert rows given as tuples of the ``keys`` columns.
+
+    The Core insert is compiled once and the rows go to the driver as
+    they are: SQLAlchemy's per-row parameter processing costs more than
+    SQLite's own insert. Only for columns that need no type conversion.
+    """
+    if not connection.dialect.positional:
+        return _insert_chunks(
+            connection, table, (dict(zip(keys, row)) for row in rows), chunk_size
+        )
+    sql = str(insert(table).compile(dialect=connection.dialect, column_keys=keys))
+    inserted = 0
+    for chunk in chunked(rows, chunk_size):
+        connection.exec_driver_sql(sql, chunk)
+        inserted += len(chunk)
+    return inserted
+
+def generate_data(
+    connection: Connection,
+    tutors: int = 3,
+    modules: int = 3,
+    students: int = 10,
+    grade_density: float = 1.0,
+    seed: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, int]:
+    """Insert synthetic rows and return how many of each were added.
+
+    Each student is graded in each module with probability
+    ``grade_density``. The same ``seed`` on the same database gives the
+    same data.
+    """
+    if not 0 <= grade_density <= 1:
+        raise ValueError("grade_density must be between 0 and 1")
+    if tutors < 1 and (modules or students):
+        raise ValueError("Modules and students need at least one tutor")
+    rng = random.Random(seed)
+
+    first_tutor = _next_id(connection, Tutor.id)
+    tutor_ids = list(range(first_tutor, first_tutor + tutors))
+    tutor_rows = []
+    for tutor_id in tutor_ids:
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        tutor_rows.append({
+            "id": tutor_id,
+            "title": rng.choice(TUTOR_TITLES),
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": f"{first_name}.{last_name}.{tutor_id}@{EMAIL_DOMAIN}".lower(),
+        })
+    _insert_chunks(connection, Tutor, tutor_rows, chunk_size)
+
+    first_module = _next_id(connection, Module.id)
+    module_ids = list(range(first_module, first_module + modules))
+    _insert_chunks(connection, Module, (
+        {
+            "id": module_id,
+            "title": SUBJECTS[i % len(SUBJECTS)]
+            + (f" {i // len(SUBJECTS) + 1}" if i >= len(SUBJECTS) else ""),
+            "module_tutor_id": rng.choice(tutor_ids),
+        }
+        for i, module_id in enumerate(module_ids)
+    ), chunk_size)
+
+    taken = set()
+    if connection.execute(select(Student.student_id).limit(1)).first():
+        taken = set(connection.execute(select(Student.student_id)).scalars())
+    # Inserting in key order appends to the primary key B-trees instead of
+    # splitting pages all over them
+    student_ids = sorted(unique_student_ids(rng, students, taken))
+    _insert_chunks(connection, Student, (
+        {
+            "student_id": student_id,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "dob": _random_dob(rng),
+            "personal_tutor_id": rng.choice(tutor_ids),
+        }
+        for student_id in student_ids
+    ), chunk_size)
+
+    grades = _insert_tuple_chunks(
+        connection, Grade.__table__, ["student_id", "module_id", "score"], (
+            (student_id, module_id, rng.randint(40, 100) / 100)
+            for student_id in student_ids
+            for module_id in module_ids
+            if grade_density == 1 or rng.random() < grade_density
+        ), chunk_size,
+    )
+
+    # Core inserts bypass the ORM hook that maintains the summaries
+    if taken:
+        for chunk in chunked(student_ids):
+            stats.rebuild_student_stats(connection, chunk)
+    else:
+        stats.rebuild_student_stats(connection)
+    return {
+        "tutors": tutors, "modules": modules, "students": students, "grades": grades
+    }
+
+def reset_schema(bind: Engine) -> None:
+    """Drop every table and recreate the schema at the latest version."""
+    Base.metadata.drop_all(bind=bind)
+    migrations.schema_version.drop(bind=bind, checkfirst=True)
+    migrations.upgrade(bind)
+
+def has_students(bind: Engine) -> bool:
+    with bind.connect() as connection:
+        if migrations.current_version(connection) is None:
+            return False
+        return connection.scalar(select(Student.student_id).limit(1)) is not None
+
+@contextmanager
+def deferred_indexes(connection: Connection):
+    """Drop the secondary and search indexes and the change triggers for a
+    bulk load, then build each once from the loaded rows, which is much
+    cheaper than updating them row by row."""
+    indexes = [
+        index for table in Base.metadata.sorted_tables for index in table.indexes
+    ]
+    for index in indexes:
+        index.drop(connection)
+    search.drop_search_indexes(connection)
+    changes.drop_change_triggers(connection)
+    yield
+    changes.backfill_versions(connection)
+    changes.create_change_triggers(connection)
+    for index in indexes:
+        index.create(connection)
+    search.create_search_indexes(connection)
+
+def create_sample_data(
+    bind: Engine = engine, reset: bool = False, **options
+) -> Dict[str, int]:
+    """Generate data in one transaction; ``options`` go to generate_data."""
+    if not reset:
+        migrations.upgrade(bind)
+        with bind.begin() as connection:
+            return generate_data(connection, **options)
+    reset_schema(bind)
+    with bind.begin() as connection, deferred_indexes(connection):
+        return generate_data(connection, **options)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tutors", type=int, default=3)
+    parser.add_argument("--modules", type=int, default=3)
+    parser.add_argument("--students", type=int, default=10)
+    parser.add_argument(
+        "--grade-density", type=float, default=1.0,
+        help="Probability that a student is graded in a module",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--reset", action="store_true", help="Drop and recreate the schema first"
+    )
+    parser.add_argument(
+        "--if-empty", action="store_true",
+        help="Do nothing if the database already has students",
+    )
+    args = parser.parse_args()
+
+    if args.if_empty and has_students(engine):
+        print("Database already has data; sample data not created.")
+        return
+
+    started = time.perf_counter()
+    counts = create_sample_data(
+        reset=args.reset,
+        tutors=args.tutors,
+        modules=args.modules,
+        students=args.students,
+        grade_density=args.grade_density,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time.perf_counter() - started
+    summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+    print(f"Sample data created successfully! ({summary} in {elapsed:.1f}s)")
 
 if __name__ == "__main__":
-    from database import SessionLocal
-    db = SessionLocal()
-    create_sample_data(db)
\ No newline at end of file
+    main()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 from datetime import date
-from typing import Optional
+from enum import Enum
+from typing import Dict, List, Optional, Union
 import re
 
 # Tutor Schemas
@@ -29,6 +30,12 @@ class ModuleResponse(ModuleBase):
         from_attributes = True
 
 # Student Schemas
+class Classification(str, Enum):
+    distinction = "Distinction"
+    merit = "Merit"
+    passed = "Pass"
+    fail = "Fail"
+
 class StudentBase(BaseModel):
     student_id: str
     first_name: str
@@ -74,4 +81,141 @@ class GradeBase(BaseModel):
 class GradeResponse(GradeBase):
     class Config:
         from_attributes = True
-        orm_mode = True 
+        orm_mode = True
+
+class GradeImportRow(BaseModel):
+    row: int
+    status: str
+    student_id: Optional[str] = None
+    module_id: Optional[int] = None
+    error: Optional[str] = None
+
+class GradeImportResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[GradeImportRow]
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# Batch Lookup Schemas
+MAX_BATCH_SIZE = 1000
+
+class StudentBatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+
+class IdBatchRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=MAX_BATCH_SIZE)
+
+class StudentBatchResponse(BaseModel):
+    items: List[StudentResponse]
+    missing: List[str]
+
+class ModuleBatchResponse(BaseModel):
+    items: List[ModuleResponse]
+    missing: List[int]
+
+class TutorBatchResponse(BaseModel):
+    items: List[TutorResponse]
+    missing: List[int]
+
+# Student Detail Schemas
+class StudentModuleGrade(BaseModel):
+    module_id: int
+    module_title: str
+    score: float
+
+class StudentDetailResponse(BaseModel):
+    student: StudentResponse
+    grades: List[StudentModuleGrade]
+
+# Analytics Schemas
+class ScoreSummary(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    percentiles: Dict[str, Optional[float]]
+    histogram: List[int]
+    classifications: Dict[str, int]
+
+class ModuleScoreSummary(ScoreSummary):
+    module_id: int
+    title: str
+
+class TutorScoreSummary(ScoreSummary):
+    tutor_id: int
+
+class CohortAnalytics(BaseModel):
+    students: int
+    student_classifications: Dict[str, int]
+    student_average: ScoreSummary
+    grades: ScoreSummary
+    modules: List[ModuleScoreSummary]
+    tutors: List[TutorScoreSummary]
+
+# Ranking Schemas
+class StudentRanking(BaseModel):
+    rank: int
+    percentile: float
+    student_id: str
+    first_name: str
+    last_name: str
+    average_grade: float
+    classification: str
+
+class ModuleRanking(BaseModel):
+    rank: int
+    percentile: float
+    student_id: str
+    first_name: str
+    last_name: str
+    score: float
+
+class StudentModuleRank(BaseModel):
+    module_id: int
+    title: str
+    score: float
+    rank: int
+    percentile: float
+    students: int
+
+class StudentRankResponse(BaseModel):
+    student_id: str
+    rank: Optional[int] = None
+    percentile: Optional[float] = None
+    students: Optional[int] = None
+    average_grade: Optional[float] = None
+    modules: List[StudentModuleRank]
+
+# Search Schemas
+class SearchType(str, Enum):
+    student = "student"
+    tutor = "tutor"
+    module = "module"
+
+class SearchResult(BaseModel):
+    type: SearchType
+    id: str
+    label: str
+    score: float
+
+# Change Feed Schemas
+class ChangeType(str, Enum):
+    tutor = "tutor"
+    module = "module"
+    student = "student"
+    grade = "grade"
+
+class Change(BaseModel):
+    type: ChangeType
+    version: int
+    data: Union[StudentResponse, GradeResponse, ModuleResponse, TutorResponse]
+
+class ChangeFeed(BaseModel):
+    changes: List[Change]
+    cursor: str
+    has_more: bool
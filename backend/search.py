@@ -0,0 +1,224 @@
+"""Prefix full-text search over students, tutors and modules.
+
+On SQLite with FTS5 each table gets an external-content FTS5 index
+(``students_fts``, ``tutors_fts``, ``modules_fts``) keyed by the source
+rowid. Triggers keep the indexes in step with every INSERT, UPDATE and
+DELETE, including Core bulk writes, and an index created on an existing
+database is backfilled with FTS5's ``rebuild`` command. Matches are
+ranked with bm25 and paged with a cursor on (rank, type, rowid).
+
+Other databases fall back to case-insensitive LIKE prefix matching.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, or_, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Module, Student, Tutor
+from pagination import decode_cursor, encode_cursor
+
+SEARCH_TYPES = ("student", "tutor", "module")
+_FTS_INFO_KEY = "fts_search"
+
+# (type, FTS table, source table, indexed columns, id expression, label)
+_INDEXES = (
+    (
+        "student", "students_fts", "students",
+        ("first_name", "last_name", "student_id"),
+        "src.student_id", "src.first_name || ' ' || src.last_name",
+    ),
+    (
+        "tutor", "tutors_fts", "tutors",
+        ("first_name", "last_name", "email"),
+        "CAST(src.id AS TEXT)", "src.first_name || ' ' || src.last_name",
+    ),
+    (
+        "module", "modules_fts", "modules",
+        ("title",),
+        "CAST(src.id AS TEXT)", "src.title",
+    ),
+)
+
+def _index_ddl(fts: str, source: str, columns: Tuple[str, ...]) -> List[str]:
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) "
+        f"VALUES ('delete', old.rowid, {old});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, "
+        f"content='{source}', tokenize='unicode61 remove_diacritics 2', "
+        f"prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} "
+        f"BEGIN {delete} END",
+        # Only the indexed columns, so a version bump (see changes.py)
+        # does not re-index the row
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au "
+        f"AFTER UPDATE OF {names} ON {source} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+def fts_supported(connection: Connection) -> bool:
+    return connection.dialect.name == "sqlite" and bool(
+        connection.exec_driver_sql(
+            "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+        ).scalar()
+    )
+
+def create_search_indexes(connection: Connection) -> None:
+    """Create any missing FTS5 index and its triggers, backfilling new ones."""
+    if not fts_supported(connection):
+        return
+    existing = set(connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).scalars())
+    for _, fts, source, columns, _, _ in _INDEXES:
+        create_table, *triggers = _index_ddl(fts, source, columns)
+        if fts not in existing:
+            connection.exec_driver_sql(create_table)
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        for trigger in triggers:
+            connection.exec_driver_sql(trigger)
+    connection.info.pop(_FTS_INFO_KEY, None)
+
+def drop_search_indexes(connection: Connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for _, fts, _, _, _, _ in _INDEXES:
+        for suffix in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+    connection.info.pop(_FTS_INFO_KEY, None)
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_indexes(target, connection, **kw):
+    create_search_indexes(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_indexes(target, connection, **kw):
+    drop_search_indexes(connection)
+
+def _uses_fts(db: Session) -> bool:
+    # Checked once per pooled connection rather than per request
+    connection = db.connection()
+    if _FTS_INFO_KEY not in connection.info:
+        connection.info[_FTS_INFO_KEY] = connection.dialect.name == "sqlite" and (
+            connection.exec_driver_sql(
+                "SELECT count(*) FROM sqlite_master WHERE name = 'students_fts'"
+            ).scalar() > 0
+        )
+    return connection.info[_FTS_INFO_KEY]
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+def fts_query(terms: List[str]) -> str:
+    """Every term as a quoted prefix, all of which must match."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+def _fts_search(
+    db: Session, terms: List[str], types: List[str],
+    cursor: Optional[str], limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    selects = []
+    for type_order, (kind, fts, source, _, id_expr, label) in enumerate(_INDEXES):
+        if kind not in types:
+            continue
+        selects.append(
+            f"SELECT '{kind}' AS type, {type_order} AS type_order, "
+            f"{id_expr} AS id, {label} AS label, "
+            f"{fts}.rank AS rank, {fts}.rowid AS row_id "
+            f"FROM {fts} JOIN {source} AS src ON src.rowid = {fts}.rowid "
+            f"WHERE {fts} MATCH :match"
+        )
+    params: Dict[str, Any] = {"match": fts_query(terms), "limit": limit + 1}
+    after = ""
+    if cursor is not None:
+        # bm25 ranks are floats, but JSON may round-trip a whole one as an int
+        params["rank"], params["type_order"], params["row_id"] = decode_cursor(
+            cursor, 3, [(float, int), int, int]
+        )
+        after = "WHERE (rank, type_order, row_id) > (:rank, :type_order, :row_id)"
+    rows = db.execute(text(
+        f"SELECT * FROM ({' UNION ALL '.join(selects)}) {after} "
+        "ORDER BY rank, type_order, row_id LIMIT :limit"
+    ), params).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.rank, last.type_order, last.row_id])
+    return [
+        {"type": row.type, "id": row.id, "label": row.label, "score": -row.rank}
+        for row in rows
+    ], next_cursor
+
+def _like_search(
+    db: Session, terms: List[str], types: List[str],
+    cursor: Optional[str], limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    sources = (
+        ("student", Student.student_id,
+         (Student.first_name, Student.last_name, Student.student_id),
+         lambda s: (s.student_id, f"{s.first_name} {s.last_name}")),
+        ("tutor", Tutor.id, (Tutor.first_name, Tutor.last_name, Tutor.email),
+         lambda t: (str(t.id), f"{t.first_name} {t.last_name}")),
+        ("module", Module.id, (Module.title,),
+         lambda m: (str(m.id), m.title)),
+    )
+    start_type, start_key = -1, None
+    if cursor is not None:
+        start_type, start_key = decode_cursor(cursor, 2, [int, (int, str)])
+        if not 0 <= start_type < len(sources) or not isinstance(
+            start_key, sources[start_type][1].type.python_type
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    matches = []
+    for type_order, (kind, key, columns, describe) in enumerate(sources):
+        if kind not in types or type_order < start_type:
+            continue
+        query = db.query(key.class_)
+        for term in terms:
+            query = query.filter(or_(*(c.ilike(f"{term}%") for c in columns)))
+        if type_order == start_type:
+            query = query.filter(key > start_key)
+        for item in query.order_by(key).limit(limit + 1 - len(matches)):
+            matches.append((kind, type_order, getattr(item, key.key), describe(item)))
+        if len(matches) > limit:
+            break
+
+    next_cursor = None
+    if len(matches) > limit:
+        matches = matches[:limit]
+        next_cursor = encode_cursor([matches[-1][1], matches[-1][2]])
+    return [
+        {"type": kind, "id": item_id, "label": label, "score": 0.0}
+        for kind, _, _, (item_id, label) in matches
+    ], next_cursor
+
+def search(
+    db: Session, query: str, types: Optional[List[str]] = None,
+    cursor: Optional[str] = None, limit: int = 20
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Search names, emails, student ids and module titles by word prefix.
+
+    Returns one page of results, best first, and the cursor for the next.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], None
+    types = list(types or SEARCH_TYPES)
+    if _uses_fts(db):
+        return _fts_search(db, terms, types, cursor, limit)
+    return _like_search(db, terms, types, cursor, limit)
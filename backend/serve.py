@@ -0,0 +1,71 @@
+"""Production entry point: several uvicorn worker processes on one database.
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+The schema version is checked once here, before the workers start, and
+with AUTO_MIGRATE=1 pending migrations are applied here rather than by
+every worker. With more than one worker, CACHE_SYNC_INTERVAL_MS
+defaults to 100 so that each worker's caches follow the writes made by the
+others (see cache_sync.py), and SQLITE_PRAGMA_PROFILE defaults to
+production so that they share the database file in WAL mode. Workers
+default to WEB_CONCURRENCY, else the number of CPUs.
+
+That sync cannot tell which rows changed, so any commit, including one
+made by the same worker, empties every worker's whole response cache.
+The per-tag invalidation of the write endpoints then only matters with a
+single worker. A write-heavy deployment keeps few cached responses; set
+CACHE_SYNC_INTERVAL_MS=0 only if serving cached data up to
+RESPONSE_CACHE_TTL seconds stale is acceptable.
+"""
+import argparse
+import os
+from pathlib import Path
+
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parent
+DEFAULT_SYNC_INTERVAL_MS = "100"
+# WAL and a busy timeout, so that workers' readers do not wait for writers
+DEFAULT_PRAGMA_PROFILE = "production"
+
+def default_workers() -> int:
+    value = os.getenv("WEB_CONCURRENCY")
+    return int(value) if value else os.cpu_count() or 1
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    # A flag pair rather than BooleanOptionalAction, which needs Python 3.9
+    parser.add_argument("--access-log", dest="access_log", action="store_true")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    parser.set_defaults(access_log=True)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Read by each worker's settings, so set before any of them starts
+        os.environ.setdefault("CACHE_SYNC_INTERVAL_MS", DEFAULT_SYNC_INTERVAL_MS)
+        os.environ.setdefault("SQLITE_PRAGMA_PROFILE", DEFAULT_PRAGMA_PROFILE)
+    from config import settings
+    from database import get_engine
+    from migrations import ensure_current
+
+    engine = get_engine()
+    ensure_current(engine, auto_migrate=settings.auto_migrate)
+    engine.dispose()
+    os.environ["AUTO_MIGRATE"] = "0"
+
+    uvicorn.run(
+        "main:app",
+        app_dir=str(BACKEND_DIR),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        access_log=args.access_log,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Materialized per-student grade statistics.
+
+``student_grade_stats`` holds the count, sum, rounded average and
+classification of each student's grades so that student reads are a
+single-row lookup instead of an aggregate over ``grades``. The summary is
+maintained incrementally inside the same transaction as every ORM grade
+write, and can be rebuilt or checked for drift from the command line:
+
+    python stats.py rebuild
+    python stats.py verify
+"""
+import math
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from models import Grade, Student, StudentGradeStats
+from utils import average_from_total, chunked, get_classification
+
+stats_table = StudentGradeStats.__table__
+REBUILD_CHUNK_SIZE = 5000
+
+def summarize(count: int, total: float) -> Dict[str, object]:
+    """The stored columns for ``count`` grades summing to ``total``.
+
+    The average and classification come from the same helpers as the
+    uncached responses did; SQL round() rounds halves up and would store
+    e.g. 0.7 (Distinction) rather than 0.69 (Merit) for 0.69 and 0.70.
+    """
+    average = average_from_total(total, count)
+    return {
+        "grade_count": count,
+        "grade_sum": total,
+        "average_grade": average,
+        "classification": get_classification(average),
+    }
+
+# Adds to the totals in place, so concurrent deltas cannot lose one
+_apply_delta = (
+    update(stats_table)
+    .where(stats_table.c.student_id == bindparam("sid"))
+    .values(
+        grade_count=stats_table.c.grade_count + bindparam("count_delta"),
+        grade_sum=stats_table.c.grade_sum + bindparam("sum_delta"),
+    )
+)
+
+_set_summary = (
+    update(stats_table)
+    .where(stats_table.c.student_id == bindparam("sid"))
+    .values(
+        average_grade=bindparam("average_grade"),
+        classification=bindparam("classification"),
+    )
+)
+
+def _aggregate():
+    """(student_id, grade count, score sum) of every student, from grades."""
+    return (
+        select(
+            Student.student_id,
+            func.count(Grade.score),
+            func.coalesce(func.sum(Grade.score), 0.0),
+        )
+        .outerjoin(Grade, Grade.student_id == Student.student_id)
+        .group_by(Student.student_id)
+    )
+
+def insert_student_stats(connection: Connection, student_ids: List[str]) -> None:
+    """Create the empty stats rows of newly inserted students."""
+    if student_ids:
+        connection.execute(
+            insert(stats_table), [{"student_id": sid} for sid in student_ids]
+        )
+
+def apply_grade_deltas(
+    connection: Connection, deltas: Dict[str, Tuple[int, float]]
+) -> None:
+    """Add (count, score sum) deltas to the stats rows of several students.
+
+    Runs as a single executemany UPDATE. Students without a stats row yet
+    (e.g. loaded in bulk before this table existed) are rebuilt from the
+    grades table instead.
+    """
+    params = [
+        {"sid": sid, "count_delta": count, "sum_delta": total}
+        for sid, (count, total) in deltas.items()
+        if count or total
+    ]
+    if not params:
+        return
+    totals = (
+        stats_table.c.student_id, stats_table.c.grade_count, stats_table.c.grade_sum
+    )
+    student_ids = [p["sid"] for p in params]
+    if len(params) == 1 and connection.dialect.update_returning:
+        # A single grade write reads its new totals back in the same statement
+        updated = connection.execute(_apply_delta.returning(*totals), params[0]).all()
+    else:
+        connection.execute(_apply_delta, params)
+        # Read back after the update, which holds the rows for this transaction
+        updated = []
+        for chunk in chunked(student_ids):
+            updated.extend(connection.execute(
+                select(*totals).where(stats_table.c.student_id.in_(chunk))
+            ))
+    summaries = [
+        {"sid": sid, **summarize(count, total)} for sid, count, total in updated
+    ]
+    if summaries:
+        connection.execute(_set_summary, summaries)
+    if len(summaries) != len(params):
+        existing = {summary["sid"] for summary in summaries}
+        missing = [sid for sid in student_ids if sid not in existing]
+        # The flushed grades are already visible here, so the rebuild
+        # includes this delta.
+        rebuild_student_stats(connection, missing)
+
+def rebuild_student_stats(
+    connection: Connection, student_ids: Optional[Iterable[str]] = None
+) -> None:
+    """Recompute stats rows from one aggregate over the grades table.
+
+    Rebuilds every student when ``student_ids`` is None.
+    """
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        if not student_ids:
+            return
+
+    aggregate = _aggregate()
+    clear = delete(stats_table)
+    if student_ids is not None:
+        aggregate = aggregate.where(Student.student_id.in_(student_ids))
+        clear = clear.where(stats_table.c.student_id.in_(student_ids))
+
+    rows = connection.execute(aggregate).all()
+    connection.execute(clear)
+    for chunk in chunked(rows, REBUILD_CHUNK_SIZE):
+        connection.execute(insert(stats_table), [
+            {"student_id": sid, **summarize(count, total)}
+            for sid, count, total in chunk
+        ])
+
+def find_stats_drift(connection: Connection) -> List[dict]:
+    """Compare every stats row with a fresh aggregate and list mismatches."""
+    expected = _aggregate().subquery()
+    student_id, count, total = expected.c
+    rows = connection.execute(
+        select(
+            student_id.label("student_id"),
+            count.label("grade_count"),
+            total.label("grade_sum"),
+            stats_table.c.student_id.label("stored_id"),
+            stats_table.c.grade_count.label("stored_count"),
+            stats_table.c.grade_sum.label("stored_sum"),
+            stats_table.c.average_grade.label("stored_average"),
+            stats_table.c.classification.label("stored_classification"),
+        )
+        .outerjoin(stats_table, stats_table.c.student_id == student_id)
+        .order_by(student_id)
+    )
+
+    drift = []
+    for row in rows:
+        if row.stored_id is None:
+            if row.grade_count:
+                drift.append({"student_id": row.student_id, "issue": "missing"})
+            continue
+        sum_matches = math.isclose(row.stored_sum, row.grade_sum, abs_tol=1e-9)
+        # A sum kept by deltas can differ from a fresh SUM() in the last
+        # bit, so the average is checked against the stored one if close
+        summary = summarize(
+            row.grade_count, row.stored_sum if sum_matches else row.grade_sum
+        )
+        if (
+            row.stored_count != row.grade_count
+            or not sum_matches
+            or row.stored_average != summary["average_grade"]
+            or row.stored_classification != summary["classification"]
+        ):
+            drift.append({
+                "student_id": row.student_id,
+                "issue": "mismatch",
+                "expected": {
+                    "grade_count": row.grade_count,
+                    "grade_sum": row.grade_sum,
+                    "average_grade": summary["average_grade"],
+                    "classification": summary["classification"],
+                },
+                "stored": {
+                    "grade_count": row.stored_count,
+                    "grade_sum": row.stored_sum,
+                    "average_grade": row.stored_average,
+                    "classification": row.stored_classification,
+                },
+            })
+    return drift
+
+def _previous_value(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.obj(), key)
+
+@event.listens_for(Session, "after_flush")
+def _maintain_student_stats(session, flush_context):
+    """Fold the grade rows written by this flush into student_grade_stats."""
+    new_students = []
+    deltas = defaultdict(lambda: [0, 0.0])
+
+    for obj in session.new:
+        if isinstance(obj, Student):
+            new_students.append(obj.student_id)
+        elif isinstance(obj, Grade):
+            deltas[obj.student_id][0] += 1
+            deltas[obj.student_id][1] += obj.score
+
+    for obj in session.dirty:
+        if isinstance(obj, Grade) and session.is_modified(obj):
+            state = inspect(obj)
+            old_student = _previous_value(state, "student_id")
+            deltas[old_student][0] -= 1
+            deltas[old_student][1] -= _previous_value(state, "score")
+            deltas[obj.student_id][0] += 1
+            deltas[obj.student_id][1] += obj.score
+
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            state = inspect(obj)
+            old_student = _previous_value(state, "student_id")
+            deltas[old_student][0] -= 1
+            deltas[old_student][1] -= _previous_value(state, "score")
+
+    if not new_students and not deltas:
+        return
+    connection = session.connection()
+    insert_student_stats(connection, new_students)
+    apply_grade_deltas(
+        connection, {sid: (count, total) for sid, (count, total) in deltas.items()}
+    )
+
+if __name__ == "__main__":
+    from database import engine
+    from migrations import ensure_current
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    # The schema is left to `python migrations.py upgrade`
+    ensure_current(engine)
+    if command == "rebuild":
+        with engine.begin() as conn:
+            rebuild_student_stats(conn)
+        print("Student grade statistics rebuilt.")
+    elif command == "verify":
+        with engine.connect() as conn:
+            drift = find_stats_drift(conn)
+        for item in drift:
+            print(item)
+        print(f"{len(drift)} student(s) with drifted statistics.")
+        sys.exit(1 if drift else 0)
+    else:
+        print("Usage: python stats.py [rebuild|verify]")
+        sys.exit(2)
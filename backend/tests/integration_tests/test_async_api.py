@@ -0,0 +1,107 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import async_routes
+from database import Base, get_async_db, get_db, set_sqlite_pragma
+
+@pytest.fixture
+def client(tmp_path):
+    db_path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+    # NullPool gives every request its own aiosqlite connection, so nothing
+    # is shared across the event loops TestClient starts per request
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool
+    )
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+    AsyncSession = async_sessionmaker(async_engine, autocommit=False, autoflush=False)
+
+    async def get_test_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    def get_test_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(async_routes.router)
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    app.dependency_overrides[get_db] = get_test_sync_db
+    yield TestClient(app)
+    sync_engine.dispose()
+
+def test_async_routes_replace_sync_handlers():
+    endpoints = {
+        (route.path, tuple(sorted(route.methods))): route.endpoint
+        for route in async_routes.router.routes
+    }
+    assert endpoints[("/students/{student_id}", ("GET",))] is async_routes.get_student
+    assert endpoints[("/grades/", ("POST",))] is async_routes.create_grade
+    assert len(async_routes.router.routes) == len(async_routes.routes.router.routes)
+
+def test_async_crud_flow(client):
+    tutor = client.post("/tutors/", json={
+        "first_name": "Jane",
+        "last_name": "Smith",
+        "email": "jane.smith@university.edu"
+    })
+    assert tutor.status_code == 200
+    tutor_id = tutor.json()["id"]
+
+    module = client.post("/modules/", json={
+        "title": "Mathematics",
+        "module_tutor_id": tutor_id
+    })
+    assert module.status_code == 200
+    module_id = module.json()["id"]
+
+    for student_id in ("123456A", "234567B"):
+        response = client.post("/students/", json={
+            "student_id": student_id,
+            "first_name": "John",
+            "last_name": "Doe",
+            "dob": "2000-01-01",
+            "personal_tutor_id": tutor_id
+        })
+        assert response.status_code == 200
+
+    response = client.post("/grades/", json={
+        "student_id": "123456A", "module_id": module_id, "score": 0.75
+    })
+    assert response.status_code == 200
+    response = client.post("/grades/", json={
+        "student_id": "123456A", "module_id": module_id, "score": 0.5
+    })
+    assert response.status_code == 400
+
+    response = client.put(f"/grades/123456A/{module_id}", json={
+        "student_id": "123456A", "module_id": module_id, "score": 0.65
+    })
+    assert response.status_code == 200
+
+    response = client.get("/students/123456A")
+    assert response.json()["average_grade"] == 0.65
+    assert response.json()["classification"] == "Merit"
+
+    response = client.get("/students/", params={"limit": 1})
+    assert [s["student_id"] for s in response.json()] == ["123456A"]
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get("/students/123456A/grades")
+    assert [g["score"] for g in response.json()] == [0.65]
+
+    assert client.get("/students/000000Z").status_code == 404
+    assert client.get(f"/modules/{module_id}").json()["title"] == "Mathematics"
+    assert len(client.get(f"/grades/module/{module_id}").json()) == 1
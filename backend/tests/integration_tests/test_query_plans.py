@@ -0,0 +1,203 @@
+"""Run EXPLAIN QUERY PLAN on every statement each endpoint issues.
+
+A plan step that scans a table is only acceptable for the first page of an
+unfiltered collection: the statement has no WHERE clause and a LIMIT, so
+SQLite stops after one page in primary key order. Any other scan means a
+lookup path is missing an index. The reference data cache (see
+reference_data.py) also reads the small tutors and modules tables whole.
+"""
+import pytest
+from sqlalchemy import event
+from cache import response_cache
+from ..test_client import get_test_client
+from ..test_db import engine, init_test_db
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    init_test_db()
+    yield
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def seeded(client):
+    tutor_id = client.post("/tutors/", json={
+        "first_name": "Jane",
+        "last_name": "Smith",
+        "email": "jane.smith@university.edu"
+    }).json()["id"]
+    module_ids = [
+        client.post("/modules/", json={
+            "title": title,
+            "module_tutor_id": tutor_id
+        }).json()["id"]
+        for title in ("Mathematics", "Physics")
+    ]
+    for student_id in ("123456A", "234567B"):
+        client.post("/students/", json={
+            "student_id": student_id,
+            "first_name": "John",
+            "last_name": "Doe",
+            "dob": "2000-01-01",
+            "personal_tutor_id": tutor_id
+        })
+    client.post("/grades/", json={
+        "student_id": "123456A", "module_id": module_ids[0], "score": 0.75
+    })
+    return {"tutor_id": tutor_id, "module_ids": module_ids}
+
+def capture_statements(call):
+    statements = []
+    # Cached responses would skip the queries under test
+    response_cache.clear()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code < 400, response.text
+    return statements
+
+REFERENCE_TABLES = ("tutors", "modules")
+
+def query_plan(statement, parameters):
+    if statement.lstrip().upper().startswith(("PRAGMA", "EXPLAIN")):
+        return []
+    raw = engine.raw_connection()
+    try:
+        plan = raw.cursor().execute(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        ).fetchall()
+    finally:
+        raw.close()
+    return [row[3] for row in plan]
+
+def full_scans(statement, parameters):
+    unfiltered = " WHERE " not in statement
+    bounded_page = " LIMIT " in statement and unfiltered
+    return [
+        detail for detail in query_plan(statement, parameters)
+        # SCAN CONSTANT ROW is a SELECT without a FROM clause and SCAN anon_N
+        # reads a subquery's result, neither is a table
+        if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW"
+        and not detail.split()[1].startswith("anon_")
+        and not bounded_page
+        and not (unfiltered and detail.split()[1] in REFERENCE_TABLES)
+    ]
+
+def endpoint_calls(client, seeded):
+    tutor_id = seeded["tutor_id"]
+    module_id, other_module_id = seeded["module_ids"]
+    first_page = client.get("/students/", params={"limit": 1})
+    cursor = first_page.headers["X-Next-Cursor"]
+    changes_cursor = client.get("/changes", params={"limit": 2}).json()["cursor"]
+    return {
+        "list students": lambda: client.get("/students/"),
+        "list students after cursor": lambda: client.get(
+            "/students/", params={"limit": 1, "cursor": cursor}
+        ),
+        "list students by tutor": lambda: client.get(
+            "/students/", params={"personal_tutor_id": tutor_id}
+        ),
+        "list students by classification": lambda: client.get(
+            "/students/", params={"classification": "Fail"}
+        ),
+        "get student": lambda: client.get("/students/123456A"),
+        "get student grades": lambda: client.get("/students/123456A/grades"),
+        "get student detail": lambda: client.get("/students/123456A/detail"),
+        "batch students": lambda: client.post("/students/batch", json={
+            "ids": ["123456A", "234567B", "999999Z"]
+        }),
+        "create student": lambda: client.post("/students/", json={
+            "student_id": "345678C",
+            "first_name": "Ann",
+            "last_name": "Lee",
+            "dob": "2000-01-01",
+            "personal_tutor_id": tutor_id
+        }),
+        "list modules": lambda: client.get("/modules/"),
+        "list modules by tutor": lambda: client.get(
+            "/modules/", params={"module_tutor_id": tutor_id}
+        ),
+        "get module": lambda: client.get(f"/modules/{module_id}"),
+        "batch modules": lambda: client.post("/modules/batch", json={
+            "ids": [module_id, other_module_id]
+        }),
+        "create module": lambda: client.post("/modules/", json={
+            "title": "Chemistry", "module_tutor_id": tutor_id
+        }),
+        "list tutors": lambda: client.get("/tutors/"),
+        "get tutor": lambda: client.get(f"/tutors/{tutor_id}"),
+        "batch tutors": lambda: client.post("/tutors/batch", json={
+            "ids": [tutor_id]
+        }),
+        "create tutor": lambda: client.post("/tutors/", json={
+            "first_name": "Sam", "last_name": "Hill", "email": "sam@university.edu"
+        }),
+        "create grade": lambda: client.post("/grades/", json={
+            "student_id": "234567B", "module_id": module_id, "score": 0.5
+        }),
+        "update grade": lambda: client.put(f"/grades/123456A/{module_id}", json={
+            "student_id": "123456A", "module_id": module_id, "score": 0.55
+        }),
+        "module grades": lambda: client.get(f"/grades/module/{module_id}"),
+        "changes": lambda: client.get("/changes"),
+        "changes since cursor": lambda: client.get(
+            "/changes", params={"since": changes_cursor, "limit": 2}
+        ),
+        "bulk import grades": lambda: client.post("/grades/bulk", json=[
+            {"student_id": "123456A", "module_id": other_module_id, "score": 0.6},
+            {"student_id": "234567B", "module_id": other_module_id, "score": 0.7}
+        ]),
+    }
+
+def test_endpoints_do_not_scan_tables(client, seeded):
+    problems = {}
+    for name, call in endpoint_calls(client, seeded).items():
+        for statement, parameters in capture_statements(call):
+            scans = full_scans(statement, parameters)
+            if scans:
+                problems.setdefault(name, []).append((scans, statement))
+    assert problems == {}
+
+def test_module_grades_use_module_index(client, seeded):
+    module_id = seeded["module_ids"][0]
+    statements = capture_statements(
+        lambda: client.get(f"/grades/module/{module_id}")
+    )
+    raw = engine.raw_connection()
+    try:
+        plan = raw.cursor().execute(
+            "EXPLAIN QUERY PLAN " + statements[0][0], statements[0][1]
+        ).fetchall()
+    finally:
+        raw.close()
+    assert any("ix_grades_module_id_student_id" in row[3] for row in plan)
+
+def test_rankings_read_tables_through_indexes(client, seeded):
+    # A ranking window has to see every row it ranks, so base tables may be
+    # walked in full, but only along an index that already has window order
+    module_id = seeded["module_ids"][0]
+    tables = ("students", "modules", "tutors", "grades", "student_grade_stats")
+    calls = {
+        "top students": lambda: client.get("/rankings/students"),
+        "top module students": lambda: client.get(f"/rankings/modules/{module_id}"),
+        "student rank": lambda: client.get("/students/123456A/rank"),
+    }
+    problems = {}
+    for name, call in calls.items():
+        for statement, parameters in capture_statements(call):
+            unindexed = [
+                detail for detail in query_plan(statement, parameters)
+                if detail.split(" ")[:2] in (["SCAN", table] for table in tables)
+                and " INDEX " not in detail
+            ]
+            if unindexed:
+                problems.setdefault(name, []).append((unindexed, statement))
+    assert problems == {}
@@ -0,0 +1,42 @@
+"""Cold start of the app in a fresh interpreter, as a worker starts."""
+import subprocess
+import sys
+
+import pytest
+from benchmarks.bench_startup import COLD_START_BUDGET_SECONDS, measure_cold_start
+from benchmarks.common import BACKEND_DIR, seed_sample_data
+
+@pytest.fixture
+def seeded_dir(tmp_path):
+    seed_sample_data(tmp_path)
+    return tmp_path
+
+# The fastest of a few runs, so a busy machine does not fail the budget
+BUDGET_RUNS = 3
+
+def test_cold_start_within_budget(seeded_dir):
+    runs = [measure_cold_start(seeded_dir) for _ in range(BUDGET_RUNS)]
+    assert all(run["status"] == 200 for run in runs)
+    best = min(runs, key=lambda run: run["total_ms"])
+    assert best["total_ms"] <= COLD_START_BUDGET_SECONDS * 1000, runs
+
+def test_import_does_not_touch_the_database(tmp_path):
+    subprocess.run(
+        [sys.executable, "-c", (
+            "import database, main\n"
+            "assert database.get_engine.cache_info().currsize == 0\n"
+        )],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(BACKEND_DIR), "PATH": ""},
+        check=True,
+        capture_output=True,
+    )
+    assert list(tmp_path.iterdir()) == []
+
+def test_startup_requires_a_migrated_schema(tmp_path):
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        measure_cold_start(tmp_path)
+    assert "migrations.py upgrade" in error.value.stderr
+
+    assert measure_cold_start(tmp_path, env={"AUTO_MIGRATE": "1"})["status"] == 200
+    assert measure_cold_start(tmp_path)["status"] == 200
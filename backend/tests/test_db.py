@@ -2,7 +2,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from cache import response_cache
 from database import Base
+from instrumentation import instrument_engine
+from reference_data import reference_cache
 
 # Create test database engine
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -11,6 +14,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+instrument_engine(engine)
 
 # Create test session
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,6 +22,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def init_test_db():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    reference_cache.invalidate()
 
 def get_test_db():
     db = TestingSessionLocal()
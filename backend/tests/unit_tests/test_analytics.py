@@ -0,0 +1,154 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import get_test_db, init_test_db
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from analytics import begin_snapshot, index_of, summarize_groups
+from database import Base, create_db_engine
+from models import Grade, Module, Student, Tutor
+from utils import get_classification
+
+SCORES = {
+    1: [0.35, 0.45, 0.62, 0.71, 0.9],
+    2: [0.55, 0.68],
+}
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def cohort(db):
+    db.add_all([
+        Tutor(id=1, first_name="Jane", last_name="Smith", email="jane@example.com"),
+        Tutor(id=2, first_name="Sam", last_name="Hill", email="sam@example.com"),
+    ])
+    db.add_all([
+        Module(id=1, title="Mathematics", module_tutor_id=1),
+        Module(id=2, title="Physics", module_tutor_id=1),
+        Module(id=3, title="Chemistry", module_tutor_id=2),
+    ])
+    db.add_all([
+        Student(
+            student_id=f"60000{i}A",
+            first_name="Cohort",
+            last_name=str(i),
+            dob=date(2000, 1, 1),
+            personal_tutor_id=1
+        )
+        for i in range(5)
+    ])
+    db.commit()
+    for module_id, scores in SCORES.items():
+        for i, score in enumerate(scores):
+            db.add(Grade(student_id=f"60000{i}A", module_id=module_id, score=score))
+    db.commit()
+
+def expected_summary(scores):
+    scores = np.array(scores)
+    return {
+        "count": len(scores),
+        "mean": round(float(scores.mean()), 4),
+        "median": round(float(np.median(scores)), 4),
+        "std": round(float(scores.std()), 4),
+        "min": float(scores.min()),
+        "max": float(scores.max()),
+    }
+
+def test_cohort_analytics_matches_numpy(client, cohort):
+    response = client.get("/analytics/cohort")
+    assert response.status_code == 200
+    data = response.json()
+
+    for module in data["modules"][:2]:
+        scores = SCORES[module["module_id"]]
+        for key, value in expected_summary(scores).items():
+            assert module[key] == pytest.approx(value)
+        for name, value in module["percentiles"].items():
+            expected = np.percentile(scores, int(name[1:]))
+            assert value == pytest.approx(expected, abs=1e-4)
+        assert sum(module["histogram"]) == len(scores)
+
+    assert data["modules"][0]["classifications"] == {
+        "Fail": 1, "Pass": 1, "Merit": 1, "Distinction": 2
+    }
+    chemistry = data["modules"][2]
+    assert chemistry["title"] == "Chemistry"
+    assert chemistry["count"] == 0 and chemistry["mean"] is None
+
+    all_scores = SCORES[1] + SCORES[2]
+    assert data["grades"]["mean"] == pytest.approx(np.mean(all_scores), abs=1e-4)
+    assert [t["count"] for t in data["tutors"]] == [len(all_scores), 0]
+
+def test_student_classifications_use_student_averages(client, db, cohort):
+    averages = []
+    for i in range(5):
+        scores = [s[i] for s in SCORES.values() if i < len(s)]
+        averages.append(round(sum(scores) / len(scores), 2))
+    expected = {"Fail": 0, "Pass": 0, "Merit": 0, "Distinction": 0}
+    for average in averages:
+        expected[get_classification(average)] += 1
+
+    data = client.get("/analytics/cohort").json()
+    assert data["students"] == 5
+    assert data["student_classifications"] == expected
+    assert data["student_average"]["max"] == max(averages)
+
+def test_analytics_invalidated_by_grade_writes(client, cohort):
+    assert client.get("/analytics/cohort").json()["modules"][2]["count"] == 0
+    client.post("/grades/", json={
+        "student_id": "600000A", "module_id": 3, "score": 0.5
+    })
+    assert client.get("/analytics/cohort").json()["modules"][2]["count"] == 1
+
+def test_summarize_groups_handles_no_scores():
+    summary = summarize_groups(np.zeros(0, dtype=np.int64), np.zeros(0), 2)
+    assert [s["count"] for s in summary] == [0, 0]
+    assert summary[0]["percentiles"]["p50"] is None
+    assert summary[1]["histogram"] == [0] * 10
+
+def test_modules_without_a_tutor_count_towards_no_tutor(client, db, cohort):
+    db.add(Module(id=4, title="Biology", module_tutor_id=None))
+    db.add(Grade(student_id="600000A", module_id=4, score=0.8))
+    db.commit()
+    data = client.get("/analytics/cohort").json()
+    assert data["modules"][3]["count"] == 1
+    assert data["grades"]["count"] == 8
+    assert sum(tutor["count"] for tutor in data["tutors"]) == 7
+
+def test_index_of_masks_missing_keys():
+    index, found = index_of(np.array([1, 3, 5]), np.array([3, 4, 5, 9]))
+    assert index[found].tolist() == [1, 2]
+    assert found.tolist() == [True, False, True, False]
+    assert index_of(np.zeros(0, dtype=np.int64), np.array([1]))[1].tolist() == [False]
+
+def test_snapshot_hides_later_commits(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        # As in the production profile; a rollback journal would make the
+        # writer wait for the reader instead
+        connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+    with Session(engine) as reader, Session(engine) as writer:
+        begin_snapshot(reader)
+        before = reader.scalar(select(func.count()).select_from(Tutor))
+        writer.add(Tutor(first_name="Ann", last_name="Lee", email="ann@example.com"))
+        writer.commit()
+        assert reader.scalar(select(func.count()).select_from(Tutor)) == before
+    engine.dispose()
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import engine, init_test_db
+from benchmarks.harness import (
+    SCENARIOS, Dataset, compare, ordered_scenarios, route_keys
+)
+from sample_data import generate_data
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def dataset():
+    with engine.begin() as conn:
+        generate_data(conn, tutors=2, modules=3, students=20, grade_density=0.5, seed=1)
+        student_ids = list(conn.exec_driver_sql(
+            "SELECT student_id FROM students"
+        ).scalars())
+        graded = [tuple(row) for row in conn.exec_driver_sql(
+            "SELECT student_id, module_id FROM grades"
+        )]
+    ungraded = [
+        (student_id, module_id)
+        for student_id in student_ids
+        for module_id in (1, 2, 3)
+        if (student_id, module_id) not in set(graded)
+    ]
+    return Dataset(
+        student_ids=student_ids,
+        module_ids=[1, 2, 3],
+        tutor_ids=[1, 2],
+        graded=graded,
+        new_student_ids=["900001B", "900002B", "900003B"],
+        ungraded=ungraded,
+        rng=random.Random(1),
+    )
+
+def test_every_route_has_a_scenario():
+    assert sorted(SCENARIOS) == sorted(route_keys())
+
+def test_reads_run_before_writes():
+    keys = ordered_scenarios()
+    methods = [key.split()[0] for key in keys]
+    assert methods == sorted(methods, key=lambda method: method != "GET")
+    assert ordered_scenarios(["GET /search", "POST /grades/"]) == [
+        "GET /search", "POST /grades/"
+    ]
+
+def test_scenarios_send_valid_requests(client, dataset):
+    for key in ordered_scenarios():
+        for i in range(2):
+            response = client.request(**SCENARIOS[key](dataset, i))
+            assert response.status_code == 200, (key, response.text)
+
+def result(p95=10.0, rps=100.0, statements=2, errors=0):
+    return {
+        "requests": 100, "errors": errors, "requests_per_sec": rps,
+        "p50_ms": p95 / 2, "p95_ms": p95, "p99_ms": p95 * 2,
+        "sql_statements": statements,
+    }
+
+def test_compare_flags_regressions():
+    baseline = {"endpoints": {
+        "GET /a": result(), "GET /b": result(), "GET /c": result(),
+        "GET /d": result(), "GET /gone": result(),
+    }}
+    current = {"endpoints": {
+        "GET /a": result(p95=11.5, rps=90.0),
+        "GET /b": result(p95=14.0),
+        "GET /c": result(rps=70.0, statements=3),
+        "GET /d": result(errors=2),
+        "GET /new": result(),
+    }}
+    assert compare(baseline, current) == [
+        "GET /b: p95 10.0 ms -> 14.0 ms",
+        "GET /c: throughput 100.0 -> 70.0 req/s",
+        "GET /c: SQL statements 2 -> 3",
+        "GET /d: 2 errors",
+    ]
+
+def test_compare_ignores_noise_on_fast_routes():
+    baseline = {"endpoints": {"GET /a": result(p95=0.5)}}
+    current = {"endpoints": {"GET /a": result(p95=1.2)}}
+    assert compare(baseline, current) == []
+    assert compare(baseline, current, min_latency_ms=0.5) == [
+        "GET /a: p95 0.5 ms -> 1.2 ms"
+    ]
@@ -0,0 +1,123 @@
+from datetime import date
+
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import get_test_db, init_test_db
+from cache import CacheEntry, ResponseCache
+from models import Module, Student, Tutor
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    return next(get_test_db())
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def seeded(db):
+    tutor = Tutor(first_name="Jane", last_name="Smith", email="jane@example.com")
+    db.add(tutor)
+    db.commit()
+    module = Module(title="Mathematics", module_tutor_id=tutor.id)
+    student = Student(
+        student_id="123456A",
+        first_name="John",
+        last_name="Doe",
+        dob=date(2000, 1, 1),
+        personal_tutor_id=tutor.id
+    )
+    db.add_all([module, student])
+    db.commit()
+    return tutor.id, module.id
+
+def entry(tags):
+    return CacheEntry(body=b"[]", etag='"x"', headers={}, tags=tags, expires_at=1e12)
+
+def test_second_read_is_served_from_cache(client, seeded):
+    first = client.get("/modules/")
+    second = client.get("/modules/")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+def test_if_none_match_returns_304_without_body(client, seeded):
+    etag = client.get("/tutors/").headers["ETag"]
+    response = client.get("/tutors/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    stale = client.get("/tutors/", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+def test_create_invalidates_collection(client, seeded):
+    tutor_id, _ = seeded
+    assert len(client.get("/modules/").json()) == 1
+    client.post("/modules/", json={"title": "Physics", "module_tutor_id": tutor_id})
+    response = client.get("/modules/")
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(response.json()) == 2
+
+def test_grade_writes_invalidate_student_reads(client, seeded):
+    _, module_id = seeded
+    assert client.get("/students/123456A").json()["average_grade"] == 0
+    assert client.get("/students/123456A/grades").json() == []
+    client.post("/grades/", json={
+        "student_id": "123456A", "module_id": module_id, "score": 0.75
+    })
+    assert client.get("/students/123456A").json()["average_grade"] == 0.75
+    assert len(client.get("/students/123456A/grades").json()) == 1
+
+    client.get(f"/grades/module/{module_id}")
+    client.put(f"/grades/123456A/{module_id}", json={
+        "student_id": "123456A", "module_id": module_id, "score": 0.55
+    })
+    assert client.get("/students/123456A").json()["classification"] == "Pass"
+    assert client.get(f"/grades/module/{module_id}").json()[0]["score"] == 0.55
+
+def test_unrelated_tags_stay_cached(client, seeded):
+    _, module_id = seeded
+    client.get("/tutors/")
+    client.post("/grades/", json={
+        "student_id": "123456A", "module_id": module_id, "score": 0.75
+    })
+    assert client.get("/tutors/").headers["X-Cache"] == "HIT"
+
+def test_cache_stats_counts_hits_and_misses(client, seeded):
+    client.get("/tutors/")
+    client.get("/tutors/")
+    client.get("/modules/")
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["entries"] == 2
+
+def test_lru_evicts_oldest_entry():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    for key in ("a", "b"):
+        cache.set(key, entry(("t",)), cache.generation)
+    cache.get("a")
+    cache.set("c", entry(("t",)), cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.evictions == 1
+
+def test_response_built_during_invalidation_is_not_stored():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate("modules")
+    assert not cache.set("k", entry(("modules",)), generation)
+    assert cache.get("k") is None
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    expired = CacheEntry(body=b"", etag='"x"', headers={}, tags=(), expires_at=0)
+    cache.set("k", expired, cache.generation)
+    assert cache.get("k") is None
+    assert cache.misses == 1
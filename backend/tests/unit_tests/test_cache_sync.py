@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import insert
+from tests.test_db import engine as memory_engine, get_test_db, init_test_db
+from cache import CacheEntry, response_cache
+from cache_sync import DataVersionPoller, invalidate_local_caches, start_cache_sync
+from database import Base, create_db_engine
+from models import Tutor
+from reference_data import reference_cache
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def file_engines(tmp_path):
+    """Two engines on one file, standing in for two worker processes."""
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    engines = [create_db_engine(url), create_db_engine(url)]
+    Base.metadata.create_all(bind=engines[0])
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+def add_tutor(engine, tutor_id):
+    with engine.begin() as conn:
+        conn.execute(insert(Tutor), [{
+            "id": tutor_id, "first_name": "A", "last_name": "B",
+            "email": f"{tutor_id}@example.com",
+        }])
+
+def test_commits_by_other_connections_are_detected(file_engines):
+    mine, other = file_engines
+    changes = []
+    poller = DataVersionPoller(mine, 0.01, lambda: changes.append(1))
+    assert poller.poll() is False
+    assert poller.poll() is False
+
+    add_tutor(other, 1)
+    assert poller.poll() is True
+    assert poller.poll() is False
+    # Commits through this process's own pool are other connections too
+    add_tutor(mine, 2)
+    assert poller.poll() is True
+    assert changes == [1, 1]
+    poller.stop()
+
+def test_poller_thread_invalidates(file_engines):
+    mine, other = file_engines
+    changed = []
+    poller = DataVersionPoller(mine, 0.01, lambda: changed.append(1))
+    poller.start()
+    try:
+        add_tutor(other, 1)
+        for _ in range(200):
+            if changed:
+                break
+            poller._stop.wait(0.01)
+    finally:
+        poller.stop()
+    assert changed
+
+def test_invalidating_local_caches(db):
+    add_tutor(memory_engine, 1)
+    snapshot = reference_cache.snapshot(db)
+    entry = CacheEntry(
+        body=b"[]", etag='"x"', headers={}, tags=("tutors",), expires_at=float("inf")
+    )
+    response_cache.set("/tutors/?", entry, response_cache.generation)
+
+    add_tutor(memory_engine, 2)
+    invalidate_local_caches()
+    assert response_cache.get("/tutors/?") is None
+    assert response_cache.stats()["invalidations"] == 1
+    assert reference_cache.snapshot(db).version == snapshot.version + 1
+
+def test_cache_sync_needs_a_sqlite_file(file_engines):
+    assert start_cache_sync(memory_engine, interval_ms=100) is None
+    assert start_cache_sync(file_engines[0], interval_ms=0) is None
+    poller = start_cache_sync(file_engines[0], interval_ms=100)
+    assert poller is not None
+    poller.stop()
@@ -0,0 +1,124 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from tests.test_client import get_test_client
+from tests.test_db import TestingSessionLocal, engine, init_test_db
+from changes import VERSIONED_TABLES, changes_since
+from pagination import encode_cursor
+from sample_data import create_sample_data
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def seeded(client):
+    client.post("/tutors/", json={
+        "first_name": "Jane", "last_name": "Smith", "email": "jane@example.com"
+    })
+    client.post("/modules/", json={"title": "Mathematics", "module_tutor_id": 1})
+    client.post("/students/", json={
+        "student_id": "123456A", "first_name": "John", "last_name": "Doe",
+        "dob": "2000-01-01", "personal_tutor_id": 1,
+    })
+    client.post("/grades/", json={
+        "student_id": "123456A", "module_id": 1, "score": 0.5
+    })
+
+def feed(client, since=None, limit=100):
+    params = {"limit": limit}
+    if since is not None:
+        params["since"] = since
+    response = client.get("/changes", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def summary(body):
+    return [(change["type"], change["data"]) for change in body["changes"]]
+
+def test_feed_starts_with_every_row_in_write_order(client, seeded):
+    body = feed(client)
+    assert [change["type"] for change in body["changes"]] == [
+        "tutor", "module", "grade", "student"
+    ]
+    versions = [change["version"] for change in body["changes"]]
+    assert versions == sorted(versions)
+    # The student comes after its grade, carrying the updated average
+    assert body["changes"][-1]["data"]["average_grade"] == 0.5
+    assert body["has_more"] is False
+
+def test_cursor_returns_only_later_changes(client, seeded):
+    cursor = feed(client)["cursor"]
+    assert feed(client, cursor)["changes"] == []
+
+    client.put("/grades/123456A/1", json={
+        "student_id": "123456A", "module_id": 1, "score": 0.9
+    })
+    body = feed(client, cursor)
+    assert summary(body) == [
+        ("grade", {"student_id": "123456A", "module_id": 1, "score": 0.9}),
+        ("student", {
+            "student_id": "123456A", "first_name": "John", "last_name": "Doe",
+            "dob": "2000-01-01", "personal_tutor_id": 1,
+            "average_grade": 0.9, "classification": "Distinction",
+        }),
+    ]
+    assert feed(client, body["cursor"])["changes"] == []
+
+def test_pages_cover_every_change(client, seeded):
+    everything = feed(client)["changes"]
+    pages, cursor = [], None
+    while True:
+        body = feed(client, cursor, limit=1)
+        pages.extend(body["changes"])
+        cursor = body["cursor"]
+        if not body["has_more"]:
+            break
+    # A page can also hold an earlier change of a row, superseded later on
+    versions = [change["version"] for change in pages]
+    assert versions == sorted(set(versions))
+    assert [change for change in pages if change in everything] == everything
+
+def test_bulk_writes_get_versions(client, seeded):
+    cursor = feed(client)["cursor"]
+    client.post("/students/", json={
+        "student_id": "234567B", "first_name": "Ann", "last_name": "Lee",
+        "dob": "2000-01-01", "personal_tutor_id": 1,
+    })
+    result = client.post("/grades/bulk", json=[
+        {"student_id": "234567B", "module_id": 1, "score": 0.7},
+    ]).json()
+    assert result["accepted"] == 1
+    assert {(c["type"], c["version"] > 0) for c in feed(client, cursor)["changes"]} == {
+        ("student", True), ("grade", True)
+    }
+
+def test_sample_data_rows_are_versioned():
+    create_sample_data(engine, reset=True, students=50, seed=2)
+    with engine.connect() as conn:
+        for table in VERSIONED_TABLES:
+            versions = conn.execute(
+                select(func.count(table.c.version), func.count(), func.count(
+                    table.c.version.distinct()
+                )).select_from(table)
+            ).one()
+            assert versions[0] == versions[1] == versions[2], table.name
+
+def test_invalid_cursor(client):
+    assert client.get("/changes", params={"since": "nope"}).status_code == 400
+    assert client.get("/changes", params={"since": "WyJ4Il0"}).status_code == 400
+    for since in (True, False):
+        params = {"since": encode_cursor([since])}
+        assert client.get("/changes", params=params).status_code == 400
+
+def test_feed_is_unavailable_off_sqlite(monkeypatch):
+    db = TestingSessionLocal()
+    monkeypatch.setattr(db.get_bind().dialect, "name", "postgresql")
+    with pytest.raises(HTTPException) as error:
+        changes_since(db, None, 10)
+    assert error.value.status_code == 501
+    db.close()
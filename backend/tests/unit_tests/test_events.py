@@ -0,0 +1,193 @@
+import asyncio
+import json
+
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import TestingSessionLocal, init_test_db
+from config import Settings, settings
+from events import KEEPALIVE_FRAME, RETRY_FRAME, GradeEventHub, grade_events
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = GradeEventHub(TestingSessionLocal)
+    # The write endpoints notify the module-level hub
+    monkeypatch.setattr(grade_events, "notify", hub.notify)
+    return hub
+
+@pytest.fixture
+def student(client):
+    client.post("/tutors/", json={
+        "first_name": "Jane", "last_name": "Smith", "email": "jane@example.com"
+    })
+    for title in ("Mathematics", "Physics", "Chemistry"):
+        client.post("/modules/", json={"title": title, "module_tutor_id": 1})
+    client.post("/students/", json={
+        "student_id": "123456A", "first_name": "John", "last_name": "Doe",
+        "dob": "2000-01-01", "personal_tutor_id": 1,
+    })
+    return "123456A"
+
+def parse(frame: bytes) -> dict:
+    fields = dict(
+        line.split(": ", 1) for line in frame.decode().strip().splitlines()
+    )
+    return {**fields, "data": json.loads(fields["data"])}
+
+async def next_frame(stream, timeout=5.0) -> bytes:
+    return await asyncio.wait_for(stream.__anext__(), timeout)
+
+def test_grade_writes_are_streamed_with_student_stats(client, hub, student):
+    async def scenario():
+        stream = hub.stream()
+        assert await next_frame(stream) == RETRY_FRAME
+        # Blocking calls: the app runs in the test client's own thread
+        client.post("/grades/", json={
+            "student_id": student, "module_id": 1, "score": 0.8
+        })
+        created = parse(await next_frame(stream))
+        client.put(f"/grades/{student}/1", json={
+            "student_id": student, "module_id": 1, "score": 0.5
+        })
+        updated = parse(await next_frame(stream))
+        await stream.aclose()
+        return created, updated
+
+    created, updated = asyncio.run(scenario())
+    assert created["event"] == "grade"
+    assert created["id"] == str(created["data"]["version"])
+    assert created["data"] == {
+        "version": created["data"]["version"], "student_id": student,
+        "module_id": 1, "score": 0.8,
+        "average_grade": 0.8, "classification": "Distinction",
+    }
+    assert updated["data"]["version"] > created["data"]["version"]
+    assert (updated["data"]["score"], updated["data"]["classification"]) == (
+        0.5, "Pass"
+    )
+    assert hub.subscriber_count == 0
+
+def test_slow_subscribers_keep_a_bounded_queue(hub, monkeypatch):
+    monkeypatch.setattr(settings, "event_queue_size", 3)
+
+    async def scenario():
+        stream = hub.stream()
+        assert await next_frame(stream) == RETRY_FRAME
+        # Nobody reads while ten events are published
+        hub.publish([(v, f"id: {v}\n\n".encode()) for v in range(1, 11)])
+        (subscriber,) = hub._subscribers
+        assert subscriber.queue.qsize() == 3
+        frames = [await next_frame(stream) for _ in range(4)]
+        await stream.aclose()
+        return frames
+
+    lagged, *frames = asyncio.run(scenario())
+    assert parse(lagged) == {"event": "lagged", "data": {"dropped": 7}}
+    assert frames == [b"id: 8\n\n", b"id: 9\n\n", b"id: 10\n\n"]
+    assert hub.stats()["dropped"] == 7
+
+def test_last_event_id_replays_missed_writes(client, hub, student, monkeypatch):
+    for module_id in (1, 2, 3):
+        client.post("/grades/", json={
+            "student_id": student, "module_id": module_id, "score": 0.6
+        })
+
+    async def replay(last_event_id, frames):
+        stream = hub.stream(last_event_id)
+        received = [await next_frame(stream) for _ in range(frames)]
+        await stream.aclose()
+        return received
+
+    first, *rest = asyncio.run(replay(0, 4))[1:]
+    version = parse(first)["data"]["version"]
+    assert [parse(f)["data"]["module_id"] for f in rest] == [2, 3]
+    replayed = asyncio.run(replay(version, 3))[1:]
+    assert [parse(f)["data"]["module_id"] for f in replayed] == [2, 3]
+
+    # More missed events than a queue holds: the replay is cut short
+    monkeypatch.setattr(settings, "event_queue_size", 1)
+    replayed, lagged = asyncio.run(replay(0, 3))[1:]
+    assert parse(replayed)["data"]["module_id"] == 1
+    assert parse(lagged)["event"] == "lagged"
+
+def test_idle_streams_get_keepalives(hub, monkeypatch):
+    monkeypatch.setattr("events.KEEPALIVE_SECONDS", 0.01)
+
+    async def scenario():
+        stream = hub.stream()
+        frames = [await next_frame(stream) for _ in range(2)]
+        await stream.aclose()
+        return frames
+
+    assert asyncio.run(scenario()) == [RETRY_FRAME, KEEPALIVE_FRAME]
+
+def test_notify_without_subscribers_is_a_no_op(hub):
+    hub.notify()
+    assert hub.stats()["subscribers"] == 0
+
+def test_subscriber_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "max_event_subscribers", 1)
+    monkeypatch.setattr(grade_events, "_subscribers", {object()})
+    response = client.get("/events/grades")
+    assert response.status_code == 503
+
+def test_a_failed_pump_ends_its_streams():
+    def broken_session():
+        raise RuntimeError("database is gone")
+
+    hub = GradeEventHub(broken_session)
+
+    async def scenario():
+        return [frame async for frame in hub.stream()]
+
+    retry, error = asyncio.run(scenario())
+    assert retry == RETRY_FRAME
+    assert parse(error)["event"] == "error"
+    assert hub.subscriber_count == 0
+
+def test_events_are_unavailable_off_sqlite(client, monkeypatch):
+    monkeypatch.setattr(grade_events, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(
+        TestingSessionLocal.kw["bind"].dialect, "name", "postgresql"
+    )
+    response = client.get("/events/grades")
+    assert response.status_code == 501
+
+def test_zero_poll_interval_waits_for_notify(monkeypatch):
+    monkeypatch.setattr(settings, "event_poll_seconds", 0)
+    sessions = []
+
+    def counting_session():
+        sessions.append(1)
+        return TestingSessionLocal()
+
+    hub = GradeEventHub(counting_session)
+
+    async def scenario():
+        stream = hub.stream()
+        assert await next_frame(stream) == RETRY_FRAME
+        await asyncio.sleep(0.2)
+        idle_reads = len(sessions)
+        hub.notify()
+        await asyncio.sleep(0.1)
+        await stream.aclose()
+        return idle_reads
+
+    # Only the starting cursor while idle, then one read for the notify
+    assert asyncio.run(scenario()) == 1
+    assert len(sessions) == 2
+
+@pytest.mark.parametrize("name", [
+    "EVENT_POLL_SECONDS", "MAX_EVENT_SUBSCRIBERS", "EVENT_QUEUE_SIZE"
+])
+def test_negative_event_settings_are_rejected(monkeypatch, name):
+    monkeypatch.setenv(name, "-1")
+    with pytest.raises(ValueError, match=name):
+        Settings.from_env()
@@ -0,0 +1,77 @@
+from datetime import date
+
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import get_test_db, init_test_db
+import fast_json
+from cache import response_cache
+from config import settings
+from models import Grade, Module, Student, Tutor
+
+LIST_PATHS = (
+    "/students/?limit=2",
+    "/students/?limit=2&order=desc",
+    "/students/?classification=Merit",
+    "/modules/?limit=1",
+    "/tutors/",
+    "/grades/module/1?limit=2",
+)
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    return next(get_test_db())
+
+@pytest.fixture(autouse=True)
+def init_db(db):
+    init_test_db()
+    db.add(Tutor(id=1, first_name="Jane", last_name="Smith", email="jane@example.com"))
+    db.add_all([
+        Module(id=1, title="Mathematics", module_tutor_id=1),
+        Module(id=2, title="Physics", module_tutor_id=1),
+    ])
+    db.add_all([
+        Student(
+            student_id=f"12345{i}A",
+            first_name="John",
+            last_name="Doe",
+            dob=date(2000, 1, i + 1),
+            personal_tutor_id=1
+        )
+        for i in range(3)
+    ])
+    db.commit()
+    db.add_all([
+        Grade(student_id="123450A", module_id=1, score=0.65),
+        Grade(student_id="123451A", module_id=1, score=0.8),
+    ])
+    db.commit()
+
+def fetch_all(client, path):
+    """Fetch every page of ``path``, bypassing the response cache."""
+    pages, params = [], {}
+    while True:
+        response_cache.clear()
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        params = {"cursor": cursor}
+
+@pytest.mark.parametrize("path", LIST_PATHS)
+def test_fast_path_matches_default_path(client, monkeypatch, path):
+    default = fetch_all(client, path)
+    monkeypatch.setattr(settings, "fast_json", True)
+    assert fetch_all(client, path) == default
+
+def test_stdlib_fallback_matches_orjson(client, monkeypatch):
+    monkeypatch.setattr(settings, "fast_json", True)
+    with_orjson = fetch_all(client, "/students/")
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert fetch_all(client, "/students/") == with_orjson
+    assert fast_json.dumps([{"dob": date(2000, 1, 1)}]) == b'[{"dob":"2000-01-01"}]'
@@ -1,8 +1,13 @@
+import csv
+import io
+import json
 import pytest
 from datetime import date
 from tests.test_client import get_test_client
 from tests.test_db import get_test_db, init_test_db
+from export import stream_grades
 from models import Student, Module, Tutor, Grade
+from schemas import ExportFormat
 
 @pytest.fixture(autouse=True)
 def init_db():
@@ -148,4 +153,153 @@ def test_update_grade(client, setup_data, db):
     data = response.json()
     assert data["student_id"] == setup_data["student"].student_id
     assert data["module_id"] == setup_data["module"].id
-    assert data["score"] == 0.90 
\ No newline at end of file
+    assert data["score"] == 0.90
+
+def test_get_module_grades_pagination(client, setup_data, db):
+    for i in range(3):
+        student_id = f"{400000 + i}G"
+        db.add(Student(
+            student_id=student_id,
+            first_name="Grade",
+            last_name=str(i),
+            dob=date(2000, 1, 1),
+            personal_tutor_id=setup_data["tutor"].id
+        ))
+        db.add(Grade(
+            student_id=student_id, module_id=setup_data["module"].id, score=0.5
+        ))
+    db.commit()
+
+    url = f"/grades/module/{setup_data['module'].id}"
+    response = client.get(url, params={"limit": 2})
+    assert response.status_code == 200
+    assert [g["student_id"] for g in response.json()] == ["400000G", "400001G"]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(url, params={"limit": 2, "cursor": cursor})
+    assert [g["student_id"] for g in response.json()] == ["400002G"]
+    assert "X-Next-Cursor" not in response.headers
+
+def test_bulk_create_grades(client, setup_data, db):
+    student_id = setup_data["student"].student_id
+    module_id = setup_data["module"].id
+    module2 = Module(title="Second Module", module_tutor_id=setup_data["tutor"].id)
+    db.add(module2)
+    db.add(Grade(student_id=student_id, module_id=module_id, score=0.5))
+    db.commit()
+
+    response = client.post("/grades/bulk", json=[
+        {"student_id": student_id, "module_id": module2.id, "score": 0.9},
+        {"student_id": student_id, "module_id": module_id, "score": 0.7},
+        {"student_id": student_id, "module_id": module2.id, "score": 0.8},
+        {"student_id": "000000X", "module_id": module2.id, "score": 0.8},
+        {"student_id": student_id, "module_id": 999, "score": 0.8},
+        {"student_id": student_id, "module_id": module2.id, "score": 1.5},
+        "not a grade"
+    ])
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 1
+    assert data["rejected"] == 6
+    statuses = [r["status"] for r in data["results"]]
+    assert statuses == ["accepted"] + ["rejected"] * 6
+    errors = [r["error"] for r in data["results"]]
+    assert "already exists" in errors[1]
+    assert "Duplicate" in errors[2]
+    assert "Student 000000X not found" in errors[3]
+    assert "Module 999 not found" in errors[4]
+    assert "between 0 and 1" in errors[5]
+    assert [r["row"] for r in data["results"]] == list(range(1, 8))
+
+    response = client.get(f"/students/{student_id}")
+    assert response.json()["average_grade"] == 0.7
+
+def test_bulk_create_grades_csv(client, setup_data):
+    student_id = setup_data["student"].student_id
+    module_id = setup_data["module"].id
+    body = (
+        "student_id,module_id,score\n"
+        f"{student_id},{module_id},0.65\n"
+        f"{student_id},x,0.1\n"
+    )
+
+    response = client.post(
+        "/grades/bulk/csv", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 1
+    assert data["rejected"] == 1
+    assert data["results"][1]["error"].startswith("module_id")
+
+    response = client.get(f"/grades/module/{module_id}")
+    assert [g["score"] for g in response.json()] == [0.65]
+
+    response = client.post(
+        "/grades/bulk/csv",
+        content="student_id,score\n",
+        headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 400
+    assert "module_id" in response.json()["detail"]
+
+
+def test_export_grades_ndjson(client, setup_data, db):
+    module_id = setup_data["module"].id
+    db.add(Grade(student_id="123456S", module_id=module_id, score=0.75))
+    db.commit()
+
+    response = client.get("/grades/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"student_id": "123456S", "module_id": module_id, "score": 0.75}
+    ]
+
+    response = client.get("/grades/export", params={"expand": True})
+    assert json.loads(response.text) == {
+        "student_id": "123456S",
+        "module_id": module_id,
+        "score": 0.75,
+        "student_first_name": "Jane",
+        "student_last_name": "Smith",
+        "module_title": "Test Module",
+    }
+
+def test_export_grades_csv(client, setup_data, db):
+    module_id = setup_data["module"].id
+    db.add(Grade(student_id="123456S", module_id=module_id, score=0.75))
+    db.commit()
+
+    response = client.get("/grades/export", params={"format": "csv", "expand": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="grades.csv"' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows == [
+        [
+            "student_id", "module_id", "score",
+            "student_first_name", "student_last_name", "module_title"
+        ],
+        ["123456S", str(module_id), "0.75", "Jane", "Smith", "Test Module"],
+    ]
+
+    assert client.get("/grades/export", params={"format": "xml"}).status_code == 422
+
+def test_export_streams_in_batches(setup_data, db):
+    module_id = setup_data["module"].id
+    for i in range(5):
+        student_id = f"{500000 + i}E"
+        db.add(Student(
+            student_id=student_id,
+            first_name="Export",
+            last_name=str(i),
+            dob=date(2000, 1, 1),
+            personal_tutor_id=setup_data["tutor"].id
+        ))
+        db.add(Grade(student_id=student_id, module_id=module_id, score=0.5))
+    db.commit()
+
+    chunks = list(stream_grades(db, ExportFormat.ndjson, batch_size=2))
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
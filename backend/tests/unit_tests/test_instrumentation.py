@@ -0,0 +1,113 @@
+import json
+import logging
+import re
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from tests.test_client import get_test_client
+from tests.test_db import engine, get_test_db, init_test_db
+from config import settings
+from instrumentation import RequestStats, current_request_stats
+from models import Grade, Module, Student, Tutor
+
+TIMING = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<count>\d+) statements?"'
+    r"(, db-slowest;dur=(?P<slowest>[\d.]+))?, app;dur=(?P<app>[\d.]+)"
+)
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+def add_students(db, count, start=0):
+    db.add_all([
+        Student(
+            student_id=f"{800000 + i}T",
+            first_name="Timed",
+            last_name=str(i),
+            dob=date(2000, 1, 1),
+            personal_tutor_id=1
+        )
+        for i in range(start, start + count)
+    ])
+    db.commit()
+    db.add_all([
+        Grade(student_id=f"{800000 + i}T", module_id=1, score=0.5)
+        for i in range(start, start + count)
+    ])
+    db.commit()
+
+def server_timing(response):
+    match = TIMING.fullmatch(response.headers["Server-Timing"])
+    assert match, response.headers["Server-Timing"]
+    return match
+
+def test_server_timing_counts_statements(client):
+    response = client.post("/tutors/", json={
+        "first_name": "Jane", "last_name": "Smith", "email": "jane@example.com"
+    })
+    timing = server_timing(response)
+    assert int(timing["count"]) >= 1
+    assert float(timing["slowest"]) <= float(timing["db"]) <= float(timing["app"])
+
+def test_server_timing_without_statements(client):
+    timing = server_timing(client.get("/cache/stats"))
+    assert timing["count"] == "0" and timing["slowest"] is None
+
+def test_student_reads_do_not_grow_with_rows(client, db):
+    db.add(Tutor(id=1, first_name="Jane", last_name="Smith", email="j@example.com"))
+    db.add(Module(id=1, title="Mathematics", module_tutor_id=1))
+    db.commit()
+    add_students(db, 2)
+    few = server_timing(client.get("/students/"))["count"]
+    add_students(db, 30, start=2)
+    # A lazy load per student would show up as one statement per row
+    assert server_timing(client.get("/students/?limit=50"))["count"] == few
+
+def test_slow_queries_are_logged(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_ms", 5)
+    with engine.connect() as conn:
+        conn.connection.driver_connection.create_function(
+            "sleep_ms", 1, lambda ms: time.sleep(ms / 1000)
+        )
+        with caplog.at_level(logging.WARNING, logger="sql.slow"):
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT sleep_ms(20)"))
+
+    records = [json.loads(r.getMessage()) for r in caplog.records]
+    assert len(records) == 1
+    assert records[0]["event"] == "slow_query"
+    assert records[0]["statement"] == "SELECT sleep_ms(20)"
+    assert records[0]["duration_ms"] >= 20
+    assert records[0]["path"] is None
+
+def test_slow_query_log_can_be_disabled(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    with caplog.at_level(logging.WARNING, logger="sql.slow"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert caplog.records == []
+
+def test_request_stats_keep_the_slowest_statement():
+    stats = RequestStats()
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.005)
+    stats.record("SELECT 3", 0.001)
+    assert stats.statements == 3
+    assert stats.db_time == pytest.approx(0.008)
+    assert stats.slowest_statement == "SELECT 2"
+    assert current_request_stats() is None
@@ -0,0 +1,100 @@
+import re
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from tests.test_client import get_test_client
+from tests.test_db import init_test_db
+from metrics import (
+    CONTENT_TYPE, Histogram, instrument_pool, pool_checked_out, pool_wait,
+    registry, request_duration, request_statements, requests_in_progress,
+    requests_total,
+)
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+def sample(text, name, **labels):
+    """Value of the series ``name`` with exactly ``labels`` in a scrape."""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    series = f"{name}{{{label_text}}}" if labels else name
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    assert match, series
+    return float(match.group(1))
+
+def test_requests_are_labelled_by_route_template(client):
+    labels = ("GET", "/students/{student_id}", "404")
+    before = requests_total.value(labels)
+    observed = request_duration.count(labels[:2])
+    client.get("/students/000001A")
+    client.get("/students/000002A")
+    assert requests_total.value(labels) == before + 2
+    assert request_duration.count(labels[:2]) == observed + 2
+    assert requests_total.value(("GET", "/students/000001A", "404")) == 0
+
+def test_unmatched_paths_share_one_series(client):
+    before = requests_total.value(("GET", "unmatched", "404"))
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+    assert requests_total.value(("GET", "unmatched", "404")) == before + 2
+
+def test_statements_per_request_are_observed(client):
+    count = request_statements.count(("GET", "/students/"))
+    client.get("/students/")
+    assert request_statements.count(("GET", "/students/")) == count + 1
+
+def test_metrics_endpoint_serves_exposition_format(client):
+    client.get("/students/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    text = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert "# TYPE http_requests_total counter" in text
+    # The scrape itself is in flight while the body is rendered
+    assert sample(text, "http_requests_in_progress", method="GET") >= 1
+    assert sample(
+        text, "http_request_duration_seconds_count", method="GET", route="/students/"
+    ) >= 1
+    assert sample(text, "db_pool_size", engine="sync") >= 0
+    assert requests_in_progress.value(("GET",)) == 0
+
+def test_cache_metrics_follow_cache_stats(client):
+    client.get("/modules/")
+    client.get("/modules/")
+    text = client.get("/metrics").text
+    stats = client.get("/cache/stats").json()
+    assert sample(text, "response_cache_hits_total") == stats["hits"]
+    assert sample(text, "response_cache_misses_total") == stats["misses"]
+    assert sample(text, "response_cache_hit_ratio") == pytest.approx(
+        stats["hit_ratio"]
+    )
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", (0.1, 1.0), ("route",))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, ("/a",))
+    assert histogram.render() == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+def test_pool_checkouts_are_timed():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    instrument_pool(engine, "test")
+    instrument_pool(engine, "test")
+    with engine.connect():
+        registry.render()
+        assert pool_checked_out.value(("test",)) == 1
+    with engine.connect():
+        pass
+    assert pool_wait.count(("test",)) == 2
+    engine.dispose()
@@ -0,0 +1,141 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from changes import VERSIONED_TABLES
+from database import Base, create_db_engine
+from migrations import (
+    LATEST_VERSION, MIGRATIONS, SchemaOutdated, _record, current_version,
+    ensure_current, schema_version, upgrade,
+)
+from models import Student
+from rankings import top_students
+from stats import find_stats_drift
+from utils import build_student_response, query_students_with_stats
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+def version(engine):
+    with engine.connect() as connection:
+        return current_version(connection)
+
+def test_new_database_applies_every_migration(file_engine):
+    assert version(file_engine) is None
+    assert upgrade(file_engine) == list(range(1, LATEST_VERSION + 1))
+    assert version(file_engine) == LATEST_VERSION
+    assert "students" in inspect(file_engine).get_table_names()
+    assert upgrade(file_engine) == []
+
+def schema(engine):
+    inspector = inspect(engine)
+    return {
+        name: (
+            [(c["name"], str(c["type"]), c["nullable"])
+             for c in inspector.get_columns(name)],
+            sorted(
+                (i["name"], tuple(i["column_names"]), bool(i["unique"]))
+                for i in inspector.get_indexes(name)
+            ),
+        )
+        for name in inspector.get_table_names()
+        if name != "schema_version"
+    }
+
+def test_migrations_build_the_schema_of_the_models(file_engine, tmp_path):
+    upgrade(file_engine)
+    models_engine = create_db_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    Base.metadata.create_all(bind=models_engine)
+    assert schema(file_engine) == schema(models_engine)
+    models_engine.dispose()
+
+def test_version_1_schema_is_frozen(file_engine):
+    with file_engine.begin() as connection:
+        MIGRATIONS[0].apply(connection)
+    inspector = inspect(file_engine)
+    assert "change_sequence" not in inspector.get_table_names()
+    for table in VERSIONED_TABLES:
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert "version" not in columns
+
+# The schema create_all made before migrations and grade statistics existed
+BASELINE_SCHEMA = (
+    "CREATE TABLE tutors (id INTEGER NOT NULL, title VARCHAR(10), "
+    "first_name VARCHAR(50) NOT NULL, last_name VARCHAR(50) NOT NULL, "
+    "email VARCHAR(100), PRIMARY KEY (id), UNIQUE (email))",
+    "CREATE TABLE modules (id INTEGER NOT NULL, title VARCHAR, "
+    "module_tutor_id INTEGER, PRIMARY KEY (id), "
+    "FOREIGN KEY(module_tutor_id) REFERENCES tutors (id))",
+    "CREATE INDEX ix_modules_id ON modules (id)",
+    "CREATE TABLE students (student_id VARCHAR NOT NULL, first_name VARCHAR, "
+    "last_name VARCHAR, dob DATE, personal_tutor_id INTEGER, "
+    "PRIMARY KEY (student_id), "
+    "FOREIGN KEY(personal_tutor_id) REFERENCES tutors (id))",
+    "CREATE INDEX ix_students_student_id ON students (student_id)",
+    "CREATE TABLE grades (student_id VARCHAR NOT NULL, module_id INTEGER NOT NULL, "
+    "score FLOAT, PRIMARY KEY (student_id, module_id), "
+    "CONSTRAINT check_score_range CHECK (score BETWEEN 0 AND 1), "
+    "FOREIGN KEY(student_id) REFERENCES students (student_id), "
+    "FOREIGN KEY(module_id) REFERENCES modules (id))",
+    "INSERT INTO tutors VALUES (1, 'Dr.', 'Jane', 'Smith', 'jane@example.com')",
+    "INSERT INTO modules VALUES (1, 'Mathematics', 1), (2, 'Physics', 1)",
+    "INSERT INTO students VALUES "
+    "('100000A', 'Ann', 'Lee', '2000-01-01', 1), "
+    "('100000B', 'Bob', 'Ray', '2000-01-01', 1), "
+    "('100000C', 'Cat', 'Fox', '2000-01-01', 1)",
+    "INSERT INTO grades VALUES "
+    "('100000A', 1, 0.8), ('100000A', 2, 0.6), ('100000B', 1, 0.3)",
+)
+
+def test_pre_migration_database_is_upgraded(file_engine):
+    with file_engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+    assert version(file_engine) == 0
+
+    assert upgrade(file_engine) == list(range(1, LATEST_VERSION + 1))
+    assert version(file_engine) == LATEST_VERSION
+    names = [i["name"] for i in inspect(file_engine).get_indexes("grades")]
+    assert "ix_grades_module_id_student_id" in names
+
+    # Student reads, filters and rankings all come from the statistics
+    with Session(file_engine) as db:
+        assert find_stats_drift(db.connection()) == []
+        students = [
+            build_student_response(*row)
+            for row in query_students_with_stats(db).order_by(Student.student_id)
+        ]
+        ranked = top_students(db, 10)
+    assert [(s.average_grade, s.classification) for s in students] == [
+        (0.7, "Distinction"), (0.3, "Fail"), (0.0, "Fail")
+    ]
+    assert [r["student_id"] for r in ranked] == ["100000A", "100000B"]
+
+def test_startup_check(file_engine):
+    with pytest.raises(SchemaOutdated, match="migrations.py upgrade"):
+        ensure_current(file_engine)
+    ensure_current(file_engine, auto_migrate=True)
+    assert version(file_engine) == LATEST_VERSION
+    ensure_current(file_engine)
+
+def test_change_versions_are_added_and_backfilled(file_engine):
+    with file_engine.begin() as connection:
+        MIGRATIONS[0].apply(connection)
+        schema_version.create(bind=connection)
+        _record(connection, MIGRATIONS[0])
+        connection.exec_driver_sql(
+            "INSERT INTO tutors (id, first_name, last_name) VALUES (1, 'A', 'B')"
+        )
+    assert version(file_engine) == 1
+
+    assert upgrade(file_engine) == [2]
+    with file_engine.begin() as connection:
+        assert connection.exec_driver_sql("SELECT version FROM tutors").scalar() == 1
+        connection.exec_driver_sql(
+            "INSERT INTO tutors (id, first_name, last_name) VALUES (2, 'C', 'D')"
+        )
+        assert connection.exec_driver_sql(
+            "SELECT version FROM tutors WHERE id = 2"
+        ).scalar() == 2
@@ -74,4 +74,44 @@ def test_get_all_modules(client, db, sample_tutor):
     assert len(data) >= 2
     module_titles = [m["title"] for m in data]
     assert "Module 1" in module_titles
-    assert "Module 2" in module_titles 
\ No newline at end of file
+    assert "Module 2" in module_titles
+
+def test_get_all_modules_pagination_and_tutor_filter(client, db, sample_tutor):
+    other_tutor = Tutor(
+        first_name="Jane",
+        last_name="Smith",
+        email="jane.smith@example.com"
+    )
+    db.add(other_tutor)
+    db.commit()
+    for i in range(3):
+        db.add(Module(title=f"Module {i}", module_tutor_id=sample_tutor.id))
+    db.add(Module(title="Other Module", module_tutor_id=other_tutor.id))
+    db.commit()
+
+    response = client.get("/modules/", params={"limit": 2})
+    assert response.status_code == 200
+    assert [m["title"] for m in response.json()] == ["Module 0", "Module 1"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/modules/", params={"limit": 2, "cursor": cursor})
+    assert [m["title"] for m in response.json()] == ["Module 2", "Other Module"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/modules/", params={"module_tutor_id": other_tutor.id})
+    assert [m["title"] for m in response.json()] == ["Other Module"]
+
+
+def test_get_modules_batch(client, db, sample_tutor):
+    modules = [
+        Module(title=f"Module {i}", module_tutor_id=sample_tutor.id) for i in range(2)
+    ]
+    db.add_all(modules)
+    db.commit()
+
+    ids = [modules[1].id, 999, modules[0].id]
+    response = client.post("/modules/batch", json={"ids": ids})
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["title"] for m in data["items"]] == ["Module 1", "Module 0"]
+    assert data["missing"] == [999]
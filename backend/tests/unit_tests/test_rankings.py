@@ -0,0 +1,96 @@
+from datetime import date
+
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import get_test_db, init_test_db
+from models import Grade, Module, Student, Tutor
+
+# student -> {module: score}
+SCORES = {
+    "100001R": {1: 0.9, 2: 0.7},
+    "100002R": {1: 0.6},
+    "100003R": {1: 0.9, 2: 0.5},
+    "100004R": {1: 0.3},
+}
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def cohort(db):
+    db.add(Tutor(id=1, first_name="Jane", last_name="Smith", email="jane@example.com"))
+    db.add_all([
+        Module(id=1, title="Mathematics", module_tutor_id=1),
+        Module(id=2, title="Physics", module_tutor_id=1),
+    ])
+    db.add_all([
+        Student(
+            student_id=student_id,
+            first_name="Rank",
+            last_name=student_id,
+            dob=date(2000, 1, 1),
+            personal_tutor_id=1
+        )
+        for student_id in list(SCORES) + ["100005R"]
+    ])
+    db.commit()
+    db.add_all([
+        Grade(student_id=student_id, module_id=module_id, score=score)
+        for student_id, scores in SCORES.items()
+        for module_id, score in scores.items()
+    ])
+    db.commit()
+
+def test_top_students(client, cohort):
+    response = client.get("/rankings/students", params={"limit": 3})
+    assert response.status_code == 200
+    data = response.json()
+    # Averages: 100001R 0.8, 100003R 0.7, 100002R 0.6, 100004R 0.3;
+    # 100005R has no grades and is not ranked
+    assert [(s["student_id"], s["rank"]) for s in data] == [
+        ("100001R", 1), ("100003R", 2), ("100002R", 3)
+    ]
+    assert [s["percentile"] for s in data] == [100.0, 66.67, 33.33]
+    assert data[0]["classification"] == "Distinction"
+
+def test_top_module_students_shares_rank_on_ties(client, cohort):
+    data = client.get("/rankings/modules/1").json()
+    assert [(s["student_id"], s["rank"]) for s in data] == [
+        ("100001R", 1), ("100003R", 1), ("100002R", 3), ("100004R", 4)
+    ]
+    assert data[0]["percentile"] == data[1]["percentile"] == 66.67
+    assert client.get("/rankings/modules/999").status_code == 404
+
+def test_student_rank(client, cohort):
+    data = client.get("/students/100003R/rank").json()
+    assert data["rank"] == 2
+    assert data["students"] == 4
+    assert data["percentile"] == 66.67
+    assert [(m["title"], m["rank"], m["students"]) for m in data["modules"]] == [
+        ("Mathematics", 1, 4), ("Physics", 2, 2)
+    ]
+
+    unranked = client.get("/students/100005R/rank").json()
+    assert unranked["rank"] is None and unranked["modules"] == []
+    assert client.get("/students/000000X/rank").status_code == 404
+
+def test_rankings_refresh_after_grade_write(client, cohort):
+    assert client.get("/rankings/students").json()[0]["student_id"] == "100001R"
+    client.put("/grades/100003R/2", json={
+        "student_id": "100003R", "module_id": 2, "score": 1.0
+    })
+    top = client.get("/rankings/students").json()[0]
+    assert (top["student_id"], top["average_grade"]) == ("100003R", 0.95)
@@ -0,0 +1,141 @@
+import pytest
+from sqlalchemy import event, insert
+from tests.test_client import get_test_client
+from tests.test_db import engine, get_test_db, init_test_db
+from config import settings
+from models import Module, Tutor
+from pagination import encode_cursor
+from reference_data import reference_cache
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def seeded(db):
+    db.add_all([
+        Tutor(id=1, first_name="Jane", last_name="Smith", email="jane@example.com"),
+        Tutor(id=2, first_name="John", last_name="Doe", email="john@example.com"),
+    ])
+    db.add_all([
+        Module(id=i, title=f"Module {i}", module_tutor_id=i % 2 + 1)
+        for i in range(1, 6)
+    ])
+    db.commit()
+
+def insert_from_another_worker(table, row):
+    with engine.begin() as conn:
+        conn.execute(insert(table), [row])
+
+def test_reads_are_served_from_memory(client, seeded, statements):
+    assert client.get("/modules/2").json()["title"] == "Module 2"
+    statements.clear()
+    assert client.get("/modules/3").json()["module_tutor_id"] == 2
+    assert client.get("/tutors/2").json()["email"] == "john@example.com"
+    assert len(client.get("/modules/", params={"module_tutor_id": 1}).json()) == 2
+    assert len(client.get("/tutors/").json()) == 2
+    assert statements == []
+
+def test_pages_match_keyset_pagination(client, seeded):
+    seen = []
+    params = {"limit": 2, "order": "desc"}
+    while True:
+        response = client.get("/modules/", params=params)
+        seen.extend(module["id"] for module in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert seen == [5, 4, 3, 2, 1]
+
+    response = client.get("/tutors/", params={"limit": 1})
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/tutors/", params={"limit": 1, "cursor": cursor})
+    assert [t["id"] for t in response.json()] == [2]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/tutors/", params={"cursor": "WyJ4Il0"})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("path", ["/tutors/", "/modules/"])
+@pytest.mark.parametrize("cursor", [
+    encode_cursor([True]), encode_cursor([1.5]), encode_cursor([None])
+])
+def test_cursors_of_the_wrong_type_are_rejected(client, seeded, path, cursor):
+    response = client.get(path, params={"cursor": cursor})
+    assert response.status_code == 400
+
+def test_writes_reload_the_snapshot(client, db, seeded):
+    version = reference_cache.snapshot(db).version
+    response = client.post("/tutors/", json={
+        "first_name": "Sam", "last_name": "Hill", "email": "sam@example.com"
+    })
+    assert client.get(f"/tutors/{response.json()['id']}").status_code == 200
+    assert reference_cache.snapshot(db).version > version
+
+    db.add(Module(id=6, title="Chemistry", module_tutor_id=1))
+    db.commit()
+    assert [m["id"] for m in client.get("/modules/").json()][-1] == 6
+
+def test_rolled_back_writes_keep_the_snapshot(db, seeded):
+    snapshot = reference_cache.snapshot(db)
+    db.add(Module(id=6, title="Chemistry", module_tutor_id=1))
+    db.flush()
+    db.rollback()
+    assert reference_cache.snapshot(db) is snapshot
+
+def test_rows_from_other_workers_are_found(client, seeded):
+    client.get("/modules/")
+    insert_from_another_worker(Module, {"id": 9, "title": "New", "module_tutor_id": 1})
+    assert client.get("/modules/9").json()["title"] == "New"
+    assert client.get("/modules/10").status_code == 404
+
+def test_consistency_check_reloads_changed_tables(client, db, seeded, monkeypatch):
+    monkeypatch.setattr(settings, "reference_cache_check_seconds", 5)
+    snapshot = reference_cache.snapshot(db)
+    insert_from_another_worker(
+        Tutor, {"id": 3, "first_name": "Ann", "last_name": "Lee", "email": "a@x.com"}
+    )
+    # Within the check interval the snapshot is trusted
+    assert reference_cache.snapshot(db) is snapshot
+    monkeypatch.setattr(reference_cache, "_checked_at", 0.0)
+    assert reference_cache.snapshot(db).tutor_ids == [1, 2, 3]
+    assert len(client.get("/tutors/").json()) == 3
+
+def test_bulk_import_checks_modules_in_memory(client, db, seeded):
+    client.post("/students/", json={
+        "student_id": "123456R", "first_name": "Ann", "last_name": "Lee",
+        "dob": "2000-01-01", "personal_tutor_id": 1,
+    })
+    insert_from_another_worker(Module, {"id": 9, "title": "New", "module_tutor_id": 1})
+    response = client.post("/grades/bulk", json=[
+        {"student_id": "123456R", "module_id": 1, "score": 0.6},
+        {"student_id": "123456R", "module_id": 9, "score": 0.6},
+        {"student_id": "123456R", "module_id": 10, "score": 0.6},
+    ])
+    assert [row["status"] for row in response.json()["results"]] == [
+        "accepted", "accepted", "rejected"
+    ]
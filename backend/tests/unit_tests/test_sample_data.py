@@ -0,0 +1,115 @@
+import random
+
+import pytest
+from sqlalchemy import func, select
+from tests.test_db import engine, get_test_db, init_test_db
+from models import Grade, Module, Student, StudentGradeStats, Tutor
+from sample_data import (
+    STUDENT_ID_SPACE,
+    create_sample_data,
+    generate_student_id,
+    student_id_at,
+    unique_student_ids,
+)
+from search import search
+from stats import find_stats_drift
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+def table_counts():
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.execute(
+                select(func.count()).select_from(model)
+            ).scalar()
+            for model in (Tutor, Module, Student, Grade, StudentGradeStats)
+        }
+
+def test_student_id_format_covers_the_whole_space():
+    assert student_id_at(0) == "100000A"
+    assert student_id_at(27) == "100001B"
+    assert student_id_at(STUDENT_ID_SPACE - 1) == "999999Z"
+
+def test_generate_student_id_skips_taken_ids():
+    rng = random.Random(1)
+    first = generate_student_id(set(), random.Random(1))
+    taken = {first}
+    second = generate_student_id(taken, rng)
+    assert second != first
+    assert taken == {first, second}
+
+def test_unique_student_ids_never_repeat_or_reuse_taken():
+    taken = set(unique_student_ids(random.Random(2), 500))
+    ids = unique_student_ids(random.Random(2), 5000, taken)
+    assert len(ids) == len(set(ids)) == 5000
+    assert not taken & set(ids)
+
+def test_generates_requested_sizes():
+    counts = create_sample_data(
+        engine, reset=True, tutors=4, modules=5, students=300, seed=7
+    )
+    assert counts == {"tutors": 4, "modules": 5, "students": 300, "grades": 1500}
+    assert table_counts() == {
+        "tutors": 4, "modules": 5, "students": 300,
+        "grades": 1500, "student_grade_stats": 300,
+    }
+    with engine.connect() as conn:
+        assert find_stats_drift(conn) == []
+
+def test_seed_makes_data_repeatable():
+    def snapshot():
+        with engine.connect() as conn:
+            return conn.execute(
+                select(Grade.student_id, Grade.module_id, Grade.score)
+                .order_by(Grade.student_id, Grade.module_id)
+            ).all()
+
+    create_sample_data(engine, reset=True, students=50, seed=3)
+    first = snapshot()
+    create_sample_data(engine, reset=True, students=50, seed=3)
+    assert snapshot() == first
+    create_sample_data(engine, reset=True, students=50, seed=4)
+    assert snapshot() != first
+
+def test_grade_density():
+    counts = create_sample_data(
+        engine, reset=True, modules=10, students=400, grade_density=0.25, seed=5
+    )
+    assert 700 < counts["grades"] < 1300
+    assert create_sample_data(
+        engine, reset=True, students=20, grade_density=0, seed=5
+    )["grades"] == 0
+    with pytest.raises(ValueError):
+        create_sample_data(engine, reset=True, grade_density=1.5)
+
+def test_appends_without_reset():
+    create_sample_data(engine, reset=True, students=100, seed=1)
+    # Same seed, so the generator's first choices collide with existing rows
+    create_sample_data(engine, students=100, seed=1)
+    assert table_counts() == {
+        "tutors": 6, "modules": 6, "students": 200,
+        "grades": 600, "student_grade_stats": 200,
+    }
+    with engine.connect() as conn:
+        assert find_stats_drift(conn) == []
+
+def test_reset_load_rebuilds_indexes(db):
+    create_sample_data(engine, reset=True, students=30, seed=9)
+    student = db.scalars(select(Student).limit(1)).one()
+    results, _ = search(db, f"{student.first_name} {student.last_name}")
+    assert student.student_id in {r["id"] for r in results}
+    with engine.connect() as conn:
+        names = set(conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')"
+        ).scalars())
+    assert {"ix_grades_module_id_student_id", "students_fts_ai"} <= names
@@ -0,0 +1,151 @@
+from datetime import date
+
+import pytest
+from tests.test_client import get_test_client
+from tests.test_db import get_test_db, init_test_db
+from fastapi import HTTPException
+from models import Module, Student, Tutor
+from pagination import encode_cursor
+from search import fts_query, search, search_terms
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def directory(db):
+    db.add_all([
+        Tutor(id=1, first_name="Jane", last_name="Smith", email="jane@example.com"),
+        Tutor(id=2, first_name="Samuel", last_name="Jones", email="sam@example.com"),
+    ])
+    db.add_all([
+        Module(id=1, title="Mathematics", module_tutor_id=1),
+        Module(id=2, title="Applied Mathematics", module_tutor_id=2),
+        Module(id=3, title="Physics", module_tutor_id=2),
+    ])
+    db.add_all([
+        Student(
+            student_id=student_id,
+            first_name=first_name,
+            last_name=last_name,
+            dob=date(2000, 1, 1),
+            personal_tutor_id=1
+        )
+        for student_id, first_name, last_name in [
+            ("700001S", "Samantha", "Smith"),
+            ("700002S", "Sam", "Brown"),
+            ("700003S", "José", "Martínez"),
+        ]
+    ])
+    db.commit()
+
+def test_search_terms_are_quoted_prefixes():
+    terms = search_terms('Jo"hn  O\'Neil')
+    assert terms == ["jo", "hn", "o", "neil"]
+    assert fts_query(["jo", "neil"]) == '"jo"* "neil"*'
+
+def test_search_matches_prefixes_across_types(client, directory):
+    response = client.get("/search", params={"q": "sam"})
+    assert response.status_code == 200
+    found = {(r["type"], r["id"]) for r in response.json()}
+    assert found == {("student", "700001S"), ("student", "700002S"), ("tutor", "2")}
+
+def test_search_requires_every_term(client, directory):
+    data = client.get("/search", params={"q": "sam smi"}).json()
+    assert [(r["type"], r["id"], r["label"]) for r in data] == [
+        ("student", "700001S", "Samantha Smith")
+    ]
+
+def test_search_ignores_case_and_accents(client, directory):
+    data = client.get("/search", params={"q": "JOSE martinez"}).json()
+    assert [r["id"] for r in data] == ["700003S"]
+
+def test_search_ranks_better_matches_first(client, directory):
+    data = client.get("/search", params={"q": "math", "type": "module"}).json()
+    # bm25 favours the shorter title
+    assert [r["label"] for r in data] == ["Mathematics", "Applied Mathematics"]
+    assert data[0]["score"] >= data[1]["score"]
+
+def test_search_type_filter(client, directory):
+    data = client.get(
+        "/search", params=[("q", "sam"), ("type", "tutor"), ("type", "module")]
+    ).json()
+    assert [(r["type"], r["id"]) for r in data] == [("tutor", "2")]
+
+def test_search_matches_student_ids_and_emails(client, directory):
+    assert [r["id"] for r in client.get(
+        "/search", params={"q": "700002"}
+    ).json()] == ["700002S"]
+    assert [r["id"] for r in client.get(
+        "/search", params={"q": "jane example"}
+    ).json()] == ["1"]
+
+def test_search_pages_with_cursor(client, directory):
+    everything = client.get("/search", params={"q": "sa"}).json()
+    assert len(everything) > 2
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "sa", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/search", params=params)
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == everything
+
+def test_search_follows_writes(client, directory, db):
+    assert client.get("/search", params={"q": "chemistry"}).json() == []
+    client.post("/modules/", json={"title": "Chemistry", "module_tutor_id": 1})
+    data = client.get("/search", params={"q": "chem"}).json()
+    assert [r["label"] for r in data] == ["Chemistry"]
+
+    student = db.get(Student, "700002S")
+    student.last_name = "Green"
+    db.commit()
+    assert search(db, "brown")[0] == []
+    assert [r["id"] for r in search(db, "green")[0]] == ["700002S"]
+
+    db.delete(db.get(Module, 3))
+    db.commit()
+    assert search(db, "physics")[0] == []
+
+def test_search_rejects_bad_input(client, directory):
+    assert client.get("/search", params={"q": "s"}).status_code == 422
+    assert client.get("/search", params={"q": "sam", "cursor": "x"}).status_code == 400
+    assert client.get("/search", params={"q": "!!"}).json() == []
+    # Well-formed cursors holding values of the wrong type
+    for values in ([{}, 1, 1], [0.5, True, 1], [0.5, 1, "x"]):
+        params = {"q": "sam", "cursor": encode_cursor(values)}
+        assert client.get("/search", params=params).status_code == 400, values
+
+def test_like_fallback_pages_across_types(db, directory):
+    db.connection().info["fts_search"] = False
+    try:
+        results, cursor = search(db, "sam", limit=2)
+        assert [(r["type"], r["id"]) for r in results] == [
+            ("student", "700001S"), ("student", "700002S")
+        ]
+        results, cursor = search(db, "sam", cursor=cursor, limit=2)
+        assert [(r["type"], r["id"]) for r in results] == [("tutor", "2")]
+        assert cursor is None
+        # The key must match the type it resumes from
+        for values in ([0, 5], [1, "x"], [7, 1]):
+            with pytest.raises(HTTPException):
+                search(db, "sam", cursor=encode_cursor(values))
+    finally:
+        db.connection().info.pop("fts_search")
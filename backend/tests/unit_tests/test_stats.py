@@ -0,0 +1,152 @@
+import pytest
+from datetime import date
+from sqlalchemy import update
+from tests.test_client import get_test_client
+from tests.test_db import engine, get_test_db, init_test_db
+from cache import response_cache
+from models import Grade, Student, Module, Tutor, StudentGradeStats
+from stats import find_stats_drift, rebuild_student_stats
+from utils import calculate_average_grade, get_classification
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def setup_data(db):
+    tutor = Tutor(first_name="John", last_name="Doe", email="john.doe@example.com")
+    db.add(tutor)
+    db.commit()
+
+    modules = [
+        Module(title="Module 1", module_tutor_id=tutor.id),
+        Module(title="Module 2", module_tutor_id=tutor.id)
+    ]
+    students = [
+        Student(student_id="111111A", first_name="Ann", last_name="Lee",
+                dob=date(2000, 1, 1), personal_tutor_id=tutor.id),
+        Student(student_id="222222B", first_name="Ben", last_name="Ray",
+                dob=date(2000, 1, 1), personal_tutor_id=tutor.id)
+    ]
+    db.add_all(modules + students)
+    db.commit()
+    return {"modules": modules, "students": students}
+
+def get_stats(db, student_id):
+    db.expire_all()
+    return db.get(StudentGradeStats, student_id)
+
+def test_create_student_creates_empty_stats(db, setup_data):
+    stats = get_stats(db, "111111A")
+    assert stats.grade_count == 0
+    assert stats.average_grade == 0
+    assert stats.classification == "Fail"
+
+def test_grade_writes_maintain_stats(client, db, setup_data):
+    module_1, module_2 = setup_data["modules"]
+    client.post("/grades/", json={
+        "student_id": "111111A", "module_id": module_1.id, "score": 0.5
+    })
+    client.post("/grades/", json={
+        "student_id": "111111A", "module_id": module_2.id, "score": 0.9
+    })
+
+    stats = get_stats(db, "111111A")
+    assert stats.grade_count == 2
+    assert stats.grade_sum == pytest.approx(1.4)
+    assert stats.average_grade == 0.7
+    assert stats.classification == "Distinction"
+
+    response = client.put(f"/grades/111111A/{module_2.id}", json={
+        "student_id": "111111A", "module_id": module_2.id, "score": 0.3
+    })
+    assert response.status_code == 200
+
+    stats = get_stats(db, "111111A")
+    assert stats.grade_count == 2
+    assert stats.average_grade == 0.4
+    assert stats.classification == "Pass"
+
+    # Moving a grade to another student updates both summaries
+    response = client.put(f"/grades/111111A/{module_2.id}", json={
+        "student_id": "222222B", "module_id": module_2.id, "score": 0.65
+    })
+    assert response.status_code == 200
+
+    assert get_stats(db, "111111A").grade_count == 1
+    assert get_stats(db, "111111A").average_grade == 0.5
+    assert get_stats(db, "222222B").grade_count == 1
+    assert get_stats(db, "222222B").classification == "Merit"
+
+    response = client.get("/students/222222B")
+    assert response.json()["average_grade"] == 0.65
+    assert response.json()["classification"] == "Merit"
+
+    with engine.connect() as conn:
+        assert find_stats_drift(conn) == []
+
+def test_rebuild_repairs_drift(client, db, setup_data):
+    module_1 = setup_data["modules"][0]
+    client.post("/grades/", json={
+        "student_id": "111111A", "module_id": module_1.id, "score": 0.8
+    })
+
+    with engine.begin() as conn:
+        conn.execute(
+            update(StudentGradeStats)
+            .where(StudentGradeStats.student_id == "111111A")
+            .values(grade_count=5, average_grade=0.1, classification="Fail")
+        )
+        drift = find_stats_drift(conn)
+    assert [item["student_id"] for item in drift] == ["111111A"]
+    assert drift[0]["expected"]["grade_count"] == 1
+
+    with engine.begin() as conn:
+        rebuild_student_stats(conn)
+        assert find_stats_drift(conn) == []
+
+    response = client.get("/students/111111A")
+    assert response.json()["average_grade"] == 0.8
+    assert response.json()["classification"] == "Distinction"
+
+def test_averages_round_like_python_at_classification_boundaries(
+    client, db, setup_data
+):
+    module_1, module_2 = setup_data["modules"]
+    # 1.39 / 2 is stored as just under 0.695: Python rounds it to 0.69,
+    # SQL round() to 0.7, which would make a Merit a Distinction
+    for module, score in ((module_1, 0.69), (module_2, 0.70)):
+        client.post("/grades/", json={
+            "student_id": "111111A", "module_id": module.id, "score": score
+        })
+    client.post("/grades/bulk", json=[
+        {"student_id": "222222B", "module_id": module_1.id, "score": 0.69},
+        {"student_id": "222222B", "module_id": module_2.id, "score": 0.70},
+    ])
+    expected = calculate_average_grade([Grade(score=0.69), Grade(score=0.70)])
+    assert (expected, get_classification(expected)) == (0.69, "Merit")
+
+    def stored():
+        return [
+            (s["average_grade"], s["classification"])
+            for s in client.get("/students/").json()
+        ]
+
+    assert stored() == [(0.69, "Merit"), (0.69, "Merit")]
+    with engine.begin() as conn:
+        assert find_stats_drift(conn) == []
+        rebuild_student_stats(conn)
+    response_cache.clear()
+    assert stored() == [(0.69, "Merit"), (0.69, "Merit")]
@@ -1,8 +1,10 @@
 import pytest
 from datetime import date
+from sqlalchemy import event
 from tests.test_client import get_test_client
-from tests.test_db import get_test_db, init_test_db
+from tests.test_db import engine, get_test_db, init_test_db
 from models import Student, Module, Tutor, Grade
+from pagination import encode_cursor
 
 @pytest.fixture(autouse=True)
 def init_db():
@@ -144,4 +146,171 @@ def test_student_classification(client, db, sample_tutor, sample_module):
     response = client.get(f"/students/{student.student_id}")
     assert response.status_code == 200
     data = response.json()
-    assert data["classification"] == "Distinction"  # Average grade is 0.875 
\ No newline at end of file
+    assert data["classification"] == "Distinction"  # Average grade is 0.875
+
+def test_get_all_students_query_count_is_constant(
+    client, db, sample_tutor, sample_module
+):
+    # Create students, each with a grade, so a lazy load would fire per student
+    for i in range(5):
+        student_id = f"{100000 + i}F"
+        db.add(Student(
+            student_id=student_id,
+            first_name="Student",
+            last_name=str(i),
+            dob=date(2000, 1, 1),
+            personal_tutor_id=sample_tutor.id
+        ))
+        db.add(Grade(student_id=student_id, module_id=sample_module.id, score=0.65))
+    db.add(Student(
+        student_id="999999Z",
+        first_name="No",
+        last_name="Grades",
+        dob=date(2000, 1, 1),
+        personal_tutor_id=sample_tutor.id
+    ))
+    db.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        response = client.get("/students/")
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    assert response.status_code == 200
+    data = {s["student_id"]: s for s in response.json()}
+    assert len(data) == 6
+    assert data["100000F"]["average_grade"] == 0.65
+    assert data["100000F"]["classification"] == "Merit"
+    assert data["999999Z"]["average_grade"] == 0
+    assert data["999999Z"]["classification"] == "Fail"
+    assert len(statements) == 1
+
+def test_get_all_students_keyset_pagination(client, db, sample_tutor):
+    for i in range(5):
+        db.add(Student(
+            student_id=f"{200000 + i}P",
+            first_name="Page",
+            last_name=str(i),
+            dob=date(2000, 1, 1),
+            personal_tutor_id=sample_tutor.id
+        ))
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/students/", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        seen.extend(s["student_id"] for s in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [f"{200000 + i}P" for i in range(5)]
+
+    response = client.get("/students/", params={"limit": 2, "order": "desc"})
+    assert [s["student_id"] for s in response.json()] == ["200004P", "200003P"]
+
+    response = client.get("/students/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    # Well-formed cursors whose values do not match the sort key
+    for values in ([{}], [[1]], [True], [1]):
+        cursor = encode_cursor(values)
+        response = client.get("/students/", params={"cursor": cursor})
+        assert response.status_code == 400, values
+
+def test_get_all_students_filters(client, db, sample_tutor, sample_module):
+    other_tutor = Tutor(
+        first_name="Other",
+        last_name="Tutor",
+        email="other.tutor@example.com"
+    )
+    db.add(other_tutor)
+    db.commit()
+
+    db.add_all([
+        Student(student_id="300001D", first_name="A", last_name="A",
+                dob=date(2000, 1, 1), personal_tutor_id=sample_tutor.id),
+        Student(student_id="300002M", first_name="B", last_name="B",
+                dob=date(2000, 1, 1), personal_tutor_id=sample_tutor.id),
+        Student(student_id="300003F", first_name="C", last_name="C",
+                dob=date(2000, 1, 1), personal_tutor_id=other_tutor.id),
+    ])
+    db.add_all([
+        Grade(student_id="300001D", module_id=sample_module.id, score=0.8),
+        Grade(student_id="300002M", module_id=sample_module.id, score=0.65),
+    ])
+    db.commit()
+
+    response = client.get("/students/", params={"personal_tutor_id": other_tutor.id})
+    assert [s["student_id"] for s in response.json()] == ["300003F"]
+
+    response = client.get("/students/", params={"classification": "Distinction"})
+    assert [s["student_id"] for s in response.json()] == ["300001D"]
+
+    response = client.get("/students/", params={"classification": "Fail"})
+    assert [s["student_id"] for s in response.json()] == ["300003F"]
+
+    response = client.get(
+        "/students/",
+        params={"classification": "Merit", "personal_tutor_id": sample_tutor.id}
+    )
+    assert [s["student_id"] for s in response.json()] == ["300002M"]
+
+
+def test_get_students_batch(client, db, sample_tutor):
+    for student_id in ("700000A", "700001A"):
+        db.add(Student(
+            student_id=student_id,
+            first_name="Batch",
+            last_name="Student",
+            dob=date(2000, 1, 1),
+            personal_tutor_id=sample_tutor.id
+        ))
+    db.commit()
+
+    response = client.post("/students/batch", json={
+        "ids": ["700001A", "999999Z", "700000A", "700001A"]
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["student_id"] for s in data["items"]] == ["700001A", "700000A"]
+    assert data["items"][0]["classification"] == "Fail"
+    assert data["missing"] == ["999999Z"]
+
+    response = client.post("/students/batch", json={"ids": ["700000A"] * 1001})
+    assert response.status_code == 422
+
+def test_get_student_detail(client, db, sample_tutor, sample_module):
+    db.add(Student(
+        student_id="800000D",
+        first_name="Dee",
+        last_name="Tail",
+        dob=date(2000, 1, 1),
+        personal_tutor_id=sample_tutor.id
+    ))
+    db.add(Grade(student_id="800000D", module_id=sample_module.id, score=0.65))
+    db.commit()
+
+    response = client.get("/students/800000D/detail")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["student"]["student_id"] == "800000D"
+    assert data["student"]["classification"] == "Merit"
+    assert data["grades"] == [{
+        "module_id": sample_module.id,
+        "module_title": "Test Module",
+        "score": 0.65
+    }]
+
+    assert client.get("/students/000000X/detail").status_code == 404
@@ -79,4 +79,40 @@ def test_get_all_tutors(client, db):
     assert len(data) >= 2
     tutor_emails = [t["email"] for t in data]
     assert "john.doe@example.com" in tutor_emails
-    assert "jane.smith@example.com" in tutor_emails 
\ No newline at end of file
+    assert "jane.smith@example.com" in tutor_emails
+
+def test_get_all_tutors_pagination(client, db):
+    for i in range(3):
+        db.add(Tutor(
+            first_name=f"Tutor{i}",
+            last_name="Page",
+            email=f"tutor{i}@example.com"
+        ))
+    db.commit()
+
+    response = client.get("/tutors/", params={"limit": 2, "order": "desc"})
+    assert response.status_code == 200
+    assert [t["first_name"] for t in response.json()] == ["Tutor2", "Tutor1"]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        "/tutors/", params={"limit": 2, "order": "desc", "cursor": cursor}
+    )
+    assert [t["first_name"] for t in response.json()] == ["Tutor0"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_tutors_batch(client, db):
+    tutor = Tutor(first_name="Batch", last_name="Tutor", email="batch@example.com")
+    db.add(tutor)
+    db.commit()
+
+    response = client.post("/tutors/batch", json={"ids": [tutor.id, 999]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["email"] for t in data["items"]] == ["batch@example.com"]
+    assert data["missing"] == [999]
+
+    assert client.post("/tutors/batch", json={"ids": []}).json() == {
+        "items": [], "missing": []
+    }
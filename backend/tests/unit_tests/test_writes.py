@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from tests.test_client import get_test_client
+from tests.test_db import engine, get_test_db, init_test_db
+from models import Module, StudentGradeStats, Tutor
+import writes
+from writes import insert_grade, insert_row, insert_student
+
+@pytest.fixture(autouse=True)
+def init_db():
+    init_test_db()
+
+@pytest.fixture
+def client():
+    return get_test_client()
+
+@pytest.fixture
+def db():
+    db = next(get_test_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def student(db):
+    db.add(Tutor(id=1, first_name="Jane", last_name="Smith", email="j@example.com"))
+    db.add(Module(id=1, title="Mathematics", module_tutor_id=1))
+    db.commit()
+    insert_student(db, {
+        "student_id": "123456W", "first_name": "Sam", "last_name": "Lee",
+        "dob": date(2000, 1, 1), "personal_tutor_id": 1,
+    })
+    db.commit()
+    return "123456W"
+
+@pytest.fixture
+def without_returning(monkeypatch):
+    monkeypatch.setattr(engine.dialect, "insert_returning", False)
+    monkeypatch.setattr(writes, "_UPSERT_INSERTS", {})
+
+def grade_stats(db, student_id):
+    db.expire_all()
+    return db.get(StudentGradeStats, student_id)
+
+def test_create_grade_is_one_insert(client, student, statements):
+    response = client.post("/grades/", json={
+        "student_id": student, "module_id": 1, "score": 0.8
+    })
+    assert response.status_code == 200
+    # The INSERT, the stats UPDATE returning the new totals and the UPDATE
+    # of the average they give, with no SELECT before or after
+    assert statements == ["INSERT", "UPDATE", "UPDATE"]
+
+    statements.clear()
+    response = client.post("/grades/", json={
+        "student_id": student, "module_id": 1, "score": 0.4
+    })
+    assert response.status_code == 400
+    assert statements == ["INSERT"]
+
+def test_create_student_does_not_reload(client, student, statements):
+    response = client.post("/students/", json={
+        "student_id": "654321W", "first_name": "Ada", "last_name": "Byron",
+        "dob": "2001-02-03", "personal_tutor_id": 1,
+    })
+    assert response.status_code == 200
+    assert response.json()["classification"] == "Fail"
+    assert statements == ["INSERT", "INSERT"]
+
+def test_insert_grade_skips_duplicates(db, student):
+    grade = insert_grade(db, {"student_id": student, "module_id": 1, "score": 0.8})
+    db.commit()
+    assert (grade.student_id, grade.module_id, grade.score) == (student, 1, 0.8)
+
+    duplicate = {"student_id": student, "module_id": 1, "score": 0.2}
+    assert insert_grade(db, duplicate) is None
+    db.commit()
+    stats = grade_stats(db, student)
+    assert (stats.grade_count, stats.average_grade) == (1, 0.8)
+
+def test_insert_row_assigns_generated_keys(db):
+    first = insert_row(db, Tutor, {"first_name": "A", "last_name": "B"})
+    second = insert_row(db, Tutor, {"first_name": "C", "last_name": "D"})
+    db.commit()
+    assert second.id == first.id + 1
+    assert db.get(Tutor, second.id).first_name == "C"
+
+def test_fallback_without_returning(db, student, without_returning):
+    tutor = insert_row(db, Tutor, {"first_name": "A", "last_name": "B"})
+    assert tutor.id == 2
+
+    grade = insert_grade(db, {"student_id": student, "module_id": 1, "score": 0.6})
+    db.commit()
+    assert grade.score == 0.6
+    duplicate = {"student_id": student, "module_id": 1, "score": 0.2}
+    assert insert_grade(db, duplicate) is None
+    assert grade_stats(db, student).grade_count == 1
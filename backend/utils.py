@@ -1,8 +1,12 @@
-from typing import List, Type, TypeVar
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from models import Grade, Student, Module, Tutor
-from schemas import StudentResponse, ModuleResponse, TutorResponse, GradeResponse
+from sqlalchemy.orm import Query, Session
+from models import Grade, Student, StudentGradeStats, Module, Tutor
+from schemas import (
+    StudentResponse, ModuleResponse, TutorResponse, GradeResponse,
+    StudentDetailResponse, StudentModuleGrade
+)
 
 T = TypeVar('T')
 
@@ -18,6 +22,15 @@ def check_exists(db: Session, model: Type[T], **filters) -> bool:
     """Check if a record exists with the given filters."""
     return db.query(model).filter_by(**filters).first() is not None
 
+# Inclusive lower / exclusive upper bounds on the rounded average grade,
+# kept in line with get_classification
+CLASSIFICATION_RANGES = {
+    "Distinction": (0.7, None),
+    "Merit": (0.6, 0.7),
+    "Pass": (0.4, 0.6),
+    "Fail": (None, 0.4),
+}
+
 def get_classification(avg: float) -> str:
     if avg >= 0.7:
         return "Distinction"
@@ -29,14 +42,39 @@ def get_classification(avg: float) -> str:
         return "Fail"
 
 def calculate_average_grade(grades: List[Grade]) -> float:
-    if not grades:
+    return average_from_total(sum(grade.score for grade in grades), len(grades))
+
+def average_from_total(total: float, count: int) -> float:
+    """The rounded average of ``count`` scores summing to ``total``."""
+    if not count:
         return 0
-    return round(sum(grade.score for grade in grades) / len(grades), 2)
+    return round(total / count, 2)
+
+def query_students_with_stats(
+    db: Session, classification: Optional[str] = None
+) -> Query:
+    """Query (Student, StudentGradeStats) rows with a primary-key join.
+
+    Every student gets a stats row when it is inserted (see stats.py), so
+    ``classification`` is an indexed equality filter on that row.
+    """
+    query = db.query(Student, StudentGradeStats).outerjoin(
+        StudentGradeStats, StudentGradeStats.student_id == Student.student_id
+    )
+    if classification is not None:
+        query = query.filter(StudentGradeStats.classification == classification)
+    return query
 
-def build_student_response(student: Student) -> StudentResponse:
-    """Build a consistent StudentResponse from a Student model."""
-    avg = calculate_average_grade(student.grades)
-    classification = get_classification(avg)
+def build_student_response(
+    student: Student, stats: Optional[StudentGradeStats] = None
+) -> StudentResponse:
+    """Build a consistent StudentResponse from a Student and its grade stats."""
+    if stats is None:
+        avg = 0
+        classification = get_classification(avg)
+    else:
+        avg = stats.average_grade
+        classification = stats.classification
     
     return StudentResponse(
         student_id=student.student_id,
@@ -48,6 +86,35 @@ def build_student_response(student: Student) -> StudentResponse:
         classification=classification
     )
 
+def get_student_with_stats_or_404(db: Session, student_id: str) -> tuple:
+    """Get a (Student, StudentGradeStats) row or raise 404 if not found."""
+    row = (
+        query_students_with_stats(db)
+        .filter(Student.student_id == student_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return row
+
+def build_student_detail_response(
+    db: Session, student: Student, stats: Optional[StudentGradeStats] = None
+) -> StudentDetailResponse:
+    """Build a StudentDetailResponse with the student's grades and module titles."""
+    grades = (
+        db.query(Grade.module_id, Module.title, Grade.score)
+        .join(Module, Module.id == Grade.module_id)
+        .filter(Grade.student_id == student.student_id)
+        .order_by(Grade.module_id)
+    )
+    return StudentDetailResponse(
+        student=build_student_response(student, stats),
+        grades=[
+            StudentModuleGrade(module_id=module_id, module_title=title, score=score)
+            for module_id, title, score in grades
+        ]
+    )
+
 def build_module_response(module: Module) -> ModuleResponse:
     """Build a consistent ModuleResponse from a Module model."""
     return ModuleResponse(
@@ -74,6 +141,39 @@ def build_grade_response(grade: Grade) -> GradeResponse:
         score=grade.score
     )
 
+# Keeps every IN (...) list well inside SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+def chunked(items: Iterable[Any], size: int = LOOKUP_CHUNK_SIZE):
+    """Split ``items`` into lists of at most ``size`` elements, consuming
+    iterators lazily."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def fetch_by_ids(
+    query: Query, column, ids: Iterable[Any], key_of: Callable[[Any], Any]
+) -> Dict[Any, Any]:
+    """Load the rows of ``query`` whose ``column`` is in ``ids``, keyed by id.
+
+    Runs one IN (...) query per LOOKUP_CHUNK_SIZE ids.
+    """
+    found = {}
+    for chunk in chunked(list(set(ids))):
+        for row in query.filter(column.in_(chunk)):
+            found[key_of(row)] = row
+    return found
+
+def build_batch_response(
+    ids: Iterable[Any], found: Dict[Any, Any], build: Callable[[Any], Any]
+) -> dict:
+    """Items in request order (duplicates removed) plus the ids not found."""
+    unique = list(dict.fromkeys(ids))
+    return {
+        "items": [build(found[i]) for i in unique if i in found],
+        "missing": [i for i in unique if i not in found],
+    }
+
 def get_grade_or_404(db: Session, student_id: str, module_id: int) -> Grade:
     """Get a grade by student_id and module_id or raise 404 if not found."""
     return get_or_404(db, Grade, student_id=student_id, module_id=module_id)
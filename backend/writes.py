@@ -0,0 +1,84 @@
+"""Single-statement inserts for the create endpoints.
+
+The ORM path for a create runs the INSERT at flush, then a SELECT to
+reload the row after commit (``db.refresh``), and for grades a SELECT
+beforehand to reject duplicates. ``insert_row`` instead sends one
+``INSERT ... RETURNING`` and builds the model from the returned columns.
+Duplicates are detected by the primary key itself with
+``ON CONFLICT DO NOTHING``, so no existence check is needed.
+
+Rows inserted here bypass the session's flush hooks, so the grade
+statistics are maintained explicitly with the same helpers stats.py uses.
+"""
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Grade, Student
+from stats import apply_grade_deltas, insert_student_stats
+from utils import check_exists
+
+T = TypeVar("T")
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def insert_row(
+    db: Session, model: Type[T], values: Dict[str, Any], skip_conflicts: bool = False
+) -> Optional[T]:
+    """Insert one row and return it as a new, unattached ``model`` instance.
+
+    With ``skip_conflicts`` an existing row with the same primary key is
+    left alone and None is returned. Dialects without RETURNING or
+    ON CONFLICT fall back to the inserted primary key and, on a constraint
+    error, roll back the session and look the key up.
+    """
+    table = model.__table__
+    dialect = db.get_bind().dialect
+    upsert_insert = _UPSERT_INSERTS.get(dialect.name)
+    if skip_conflicts and upsert_insert is not None:
+        statement = upsert_insert(table).on_conflict_do_nothing(
+            index_elements=[column.name for column in table.primary_key]
+        )
+    else:
+        statement = insert(table)
+    statement = statement.values(**values)
+
+    if dialect.insert_returning:
+        row = db.execute(statement.returning(*table.columns)).first()
+        return model(**row._mapping) if row is not None else None
+
+    try:
+        result = db.execute(statement)
+    except IntegrityError:
+        if not skip_conflicts:
+            raise
+        db.rollback()
+        keys = {column.name: values[column.name] for column in table.primary_key}
+        if check_exists(db, model, **keys):
+            return None
+        raise
+    keys = dict(zip(
+        [column.name for column in table.primary_key], result.inserted_primary_key
+    ))
+    return model(**{**values, **keys})
+
+def insert_student(db: Session, values: Dict[str, Any]) -> Student:
+    """Insert a student together with its empty grade statistics row."""
+    student = insert_row(db, Student, values)
+    insert_student_stats(db.connection(), [student.student_id])
+    return student
+
+def insert_grade(db: Session, values: Dict[str, Any]) -> Optional[Grade]:
+    """Insert a grade and fold it into the student's statistics.
+
+    Returns None, leaving the statistics untouched, when the student
+    already has a grade for the module.
+    """
+    grade = insert_row(db, Grade, values, skip_conflicts=True)
+    if grade is not None:
+        apply_grade_deltas(db.connection(), {grade.student_id: (1, grade.score)})
+    return grade
@@ -1,53 +1,60 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { Student, getAllStudents } from '../services/api';
+import {
+  CohortAnalytics,
+  StudentRanking,
+  getCohortAnalytics,
+  getTopStudents
+} from '../services/api';
+
+// Only the best students get a clickable bar; the distribution chart is
+// drawn from the histogram counts, so nothing scales with the cohort
+const TOP_STUDENTS = 20;
 
 const Dashboard = () => {
   const navigate = useNavigate();
-  const [students, setStudents] = useState<Student[]>([]);
+  const [topStudents, setTopStudents] = useState<StudentRanking[]>([]);
+  const [analytics, setAnalytics] = useState<CohortAnalytics | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    const fetchStudents = async () => {
+    const fetchDashboard = async () => {
       try {
         setLoading(true);
-        const data = await getAllStudents();
-        setStudents(data);
+        const [cohort, ranked] = await Promise.all([
+          getCohortAnalytics(),
+          getTopStudents(TOP_STUDENTS)
+        ]);
+        setAnalytics(cohort);
+        setTopStudents(ranked);
         setError(null);
       } catch (err) {
-        setError('Failed to fetch students data');
+        setError('Failed to fetch dashboard data');
         console.error(err);
       } finally {
         setLoading(false);
       }
     };
 
-    fetchStudents();
+    fetchDashboard();
   }, []);
 
   const calculateStats = () => {
-    if (students.length === 0) return null;
-
-    const totalStudents = students.length;
-    const distinctionCount = students.filter(s => s.classification === 'Distinction').length;
-    const meritCount = students.filter(s => s.classification === 'Merit').length;
-    const passCount = students.filter(s => s.classification === 'Pass').length;
-    const failCount = students.filter(s => s.classification === 'Fail').length;
-
-    const totalAverage = students.reduce((sum, student) => sum + student.average_grade, 0) / totalStudents;
-    const highestAverage = Math.max(...students.map(s => s.average_grade));
-    const lowestAverage = Math.min(...students.map(s => s.average_grade));
+    if (!analytics || analytics.students === 0) return null;
 
+    const classifications = analytics.student_classifications;
+    const average = analytics.student_average;
     return {
-      totalStudents,
-      distinctionCount,
-      meritCount,
-      passCount,
-      failCount,
-      totalAverage,
-      highestAverage,
-      lowestAverage
+      totalStudents: analytics.students,
+      distinctionCount: classifications.Distinction ?? 0,
+      meritCount: classifications.Merit ?? 0,
+      passCount: classifications.Pass ?? 0,
+      failCount: classifications.Fail ?? 0,
+      totalAverage: average.mean ?? 0,
+      highestAverage: average.max ?? 0,
+      lowestAverage: average.min ?? 0,
+      histogram: average.histogram
     };
   };
 
@@ -86,6 +93,7 @@ const Dashboard = () => {
       </div>
     );
   }
+  const maxBinCount = Math.max(1, ...stats.histogram);
 
   return (
     <div className="container mx-auto px-4 py-8">
@@ -184,13 +192,48 @@ const Dashboard = () => {
         </div>
       </div>
       
-      <div className="bg-white shadow overflow-hidden sm:rounded-lg">
+      <div className="bg-white shadow overflow-hidden sm:rounded-lg mb-8">
         <div className="px-4 py-5 sm:px-6">
           <h3 className="text-lg leading-6 font-medium text-gray-900">
             Grade Distribution
           </h3>
           <p className="mt-1 max-w-2xl text-sm text-gray-500">
-            Visual representation of student grades.
+            Number of students in each band of average grade.
+          </p>
+        </div>
+        <div className="border-t border-gray-200 px-4 py-5 sm:px-6">
+          <div className="relative h-64 flex items-end space-x-1">
+            {stats.histogram.map((count, bin) => {
+              const band = `${bin * 10}-${(bin + 1) * 10}%`;
+              return (
+                <div
+                  key={band}
+                  className="flex-1 bg-blue-500"
+                  style={{
+                    height: `${(count / maxBinCount) * 100}%`,
+                    minHeight: '2px'
+                  }}
+                  title={`${band}: ${count} students`}
+                  data-testid="histogram-bin"
+                ></div>
+              );
+            })}
+          </div>
+          <div className="mt-2 flex space-x-1 text-xs text-gray-500">
+            {stats.histogram.map((_, bin) => (
+              <span key={bin} className="flex-1 text-center">{bin * 10}%</span>
+            ))}
+          </div>
+        </div>
+      </div>
+
+      <div className="bg-white shadow overflow-hidden sm:rounded-lg">
+        <div className="px-4 py-5 sm:px-6">
+          <h3 className="text-lg leading-6 font-medium text-gray-900">
+            Top Students
+          </h3>
+          <p className="mt-1 max-w-2xl text-sm text-gray-500">
+            The {TOP_STUDENTS} highest averages; select a bar for details.
           </p>
         </div>
         <div className="border-t border-gray-200 px-4 py-5 sm:px-6">
@@ -214,7 +257,7 @@ const Dashboard = () => {
                 <div className="absolute w-full border-t border-gray-200" style={{ bottom: '0%' }}></div>
                 {/* Bars */}
                 <div className="relative h-full flex items-end space-x-1">
-                  {students.map((student) => (
+                  {topStudents.map((student) => (
                     <div 
                       key={student.student_id} 
                       className="flex-1 bg-blue-500 hover:bg-blue-600 transition-colors cursor-pointer"
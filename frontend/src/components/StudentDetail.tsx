@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { Student, getStudent, getAllModules, Module, getStudentGrades, Grade } from '../services';
+import { Student, getStudentDetail, getAllModules, Module, StudentModuleGrade } from '../services';
 
 interface StudentDetailProps {
   studentId: string;
@@ -10,7 +10,7 @@ const StudentDetail = ({ studentId }: StudentDetailProps) => {
   const navigate = useNavigate();
   const [student, setStudent] = useState<Student | null>(null);
   const [modules, setModules] = useState<Module[]>([]);
-  const [grades, setGrades] = useState<Grade[]>([]);
+  const [grades, setGrades] = useState<StudentModuleGrade[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -26,14 +26,14 @@ const StudentDetail = ({ studentId }: StudentDetailProps) => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [studentData, modulesData, gradesData] = await Promise.all([
-          getStudent(studentId),
-          getAllModules(),
-          getStudentGrades(studentId)
+        // The module list is revalidated with its ETag, so it is usually a 304
+        const [detail, modulesData] = await Promise.all([
+          getStudentDetail(studentId),
+          getAllModules()
         ]);
-        setStudent(studentData);
+        setStudent(detail.student);
         setModules(modulesData);
-        setGrades(gradesData);
+        setGrades(detail.grades);
         setError(null);
       } catch (err) {
         setError('Failed to fetch student data');
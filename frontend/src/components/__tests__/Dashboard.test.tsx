@@ -2,7 +2,11 @@ import { describe, it, expect } from 'vitest';
 import { screen } from '@testing-library/react';
 import Dashboard from '../Dashboard';
 import { renderWithRouter } from '../../test/utils';
-import { mockStudents } from '../../test/mocks/handlers';
+import {
+  mockAnalytics,
+  mockRankings,
+  mockStudents
+} from '../../test/mocks/handlers';
 import { server } from '../../test/mocks/server';
 import { http, HttpResponse } from 'msw';
 
@@ -26,9 +30,63 @@ describe('Dashboard Component', () => {
     expect(screen.getByText('Distinction')).toBeInTheDocument();
     expect(screen.getByText('Merit')).toBeInTheDocument();
     
-    // Check grade distribution
+    // Check grade distribution and the top students
+    expect(screen.getAllByTestId('histogram-bin')).toHaveLength(10);
     const bars = screen.getAllByRole('button');
-    expect(bars).toHaveLength(mockStudents.length);
+    expect(bars).toHaveLength(mockRankings.length);
+  });
+
+  it('never downloads the student list', async () => {
+    let studentRequests = 0;
+    server.use(
+      http.get('http://127.0.0.1:8000/students/', () => {
+        studentRequests += 1;
+        return HttpResponse.json(mockStudents);
+      })
+    );
+
+    renderWithRouter(<Dashboard />);
+    await screen.findByText('Student Performance Dashboard');
+
+    expect(studentRequests).toBe(0);
+  });
+
+  it('draws the distribution from the analytics histogram', async () => {
+    const histogram = [0, 0, 0, 0, 5, 10, 20, 0, 0, 0];
+    server.use(
+      http.get('http://127.0.0.1:8000/analytics/cohort', () => {
+        return HttpResponse.json({
+          ...mockAnalytics,
+          student_average: { ...mockAnalytics.student_average, histogram }
+        });
+      })
+    );
+
+    renderWithRouter(<Dashboard />);
+    await screen.findByText('Student Performance Dashboard');
+
+    const bins = screen.getAllByTestId('histogram-bin');
+    expect(bins[6]).toHaveStyle({ height: '100%' });
+    expect(bins[5]).toHaveStyle({ height: '50%' });
+    expect(bins[6]).toHaveAttribute('title', '60-70%: 20 students');
+  });
+
+  it('shows the statistics from the cohort analytics endpoint', async () => {
+    server.use(
+      http.get('http://127.0.0.1:8000/analytics/cohort', () => {
+        return HttpResponse.json({
+          ...mockAnalytics,
+          students: 40,
+          student_average: { ...mockAnalytics.student_average, mean: 0.625 }
+        });
+      })
+    );
+
+    renderWithRouter(<Dashboard />);
+    await screen.findByText('Student Performance Dashboard');
+
+    expect(screen.getByText('40')).toBeInTheDocument();
+    expect(screen.getByText('62.5%')).toBeInTheDocument();
   });
 
   it('navigates to student detail when histogram bar is clicked', async () => {
@@ -37,18 +95,18 @@ describe('Dashboard Component', () => {
     // Wait for data to load
     await screen.findByText('Student Performance Dashboard');
     
-    // Find and click the first student's bar
+    // Find and click the top student's bar
     const bars = screen.getAllByRole('button');
     await user.click(bars[0]);
     
     // Check if URL changed to student detail
-    expect(window.location.pathname).toBe(`/students/${mockStudents[0].student_id}`);
+    expect(window.location.pathname).toBe(`/students/${mockRankings[0].student_id}`);
   });
 
   it('handles error state', async () => {
     // Override the default handler to simulate an error
     server.use(
-      http.get('http://127.0.0.1:8000/students/', () => {
+      http.get('http://127.0.0.1:8000/rankings/students', () => {
         return HttpResponse.json({ message: 'Internal Server Error' }, { status: 500 });
       })
     );
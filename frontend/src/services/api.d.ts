@@ -29,11 +29,64 @@ declare module 'services/api' {
     title?: string;
   }
 
+  export interface StudentModuleGrade {
+    module_id: number;
+    module_title: string;
+    score: number;
+  }
+
+  export interface StudentDetail {
+    student: Student;
+    grades: StudentModuleGrade[];
+  }
+
+  export interface BatchResult<T, K> {
+    items: T[];
+    missing: K[];
+  }
+
+  export interface ScoreSummary {
+    count: number;
+    mean: number | null;
+    median: number | null;
+    std: number | null;
+    min: number | null;
+    max: number | null;
+    percentiles: Record<string, number | null>;
+    histogram: number[];
+    classifications: Record<string, number>;
+  }
+
+  export interface CohortAnalytics {
+    students: number;
+    student_classifications: Record<string, number>;
+    student_average: ScoreSummary;
+    grades: ScoreSummary;
+    modules: (ScoreSummary & { module_id: number; title: string })[];
+    tutors: (ScoreSummary & { tutor_id: number })[];
+  }
+
+  export interface StudentRanking {
+    rank: number;
+    percentile: number;
+    student_id: string;
+    first_name: string;
+    last_name: string;
+    average_grade: number;
+    classification: string;
+  }
+
   export function getStudent(studentId: string): Promise<Student>;
   export function getAllStudents(): Promise<Student[]>;
+  export function getStudentDetail(studentId: string): Promise<StudentDetail>;
+  export function getStudentsBatch(ids: string[]): Promise<BatchResult<Student, string>>;
   export function getModule(moduleId: number): Promise<Module>;
   export function getAllModules(): Promise<Module[]>;
+  export function getModulesBatch(ids: number[]): Promise<BatchResult<Module, number>>;
   export function getTutor(tutorId: number): Promise<Tutor>;
   export function getAllTutors(): Promise<Tutor[]>;
+  export function getTutorsBatch(ids: number[]): Promise<BatchResult<Tutor, number>>;
   export function getStudentGrades(studentId: string): Promise<Grade[]>;
+  export function getCohortAnalytics(): Promise<CohortAnalytics>;
+  export function getTopStudents(limit: number): Promise<StudentRanking[]>;
 } 
\ No newline at end of file
@@ -1,6 +1,7 @@
 import axios from 'axios';
 
 const API_URL = 'http://127.0.0.1:8000';
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
 
 export interface Student {
   student_id: string;
@@ -32,6 +33,67 @@ export interface Tutor {
   title?: string;
 }
 
+export interface StudentModuleGrade {
+  module_id: number;
+  module_title: string;
+  score: number;
+}
+
+export interface StudentDetail {
+  student: Student;
+  grades: StudentModuleGrade[];
+}
+
+export interface BatchResult<T, K> {
+  items: T[];
+  missing: K[];
+}
+
+export interface ScoreSummary {
+  count: number;
+  mean: number | null;
+  median: number | null;
+  std: number | null;
+  min: number | null;
+  max: number | null;
+  percentiles: Record<string, number | null>;
+  histogram: number[];
+  classifications: Record<string, number>;
+}
+
+export interface CohortAnalytics {
+  students: number;
+  student_classifications: Record<string, number>;
+  student_average: ScoreSummary;
+  grades: ScoreSummary;
+  modules: (ScoreSummary & { module_id: number; title: string })[];
+  tutors: (ScoreSummary & { tutor_id: number })[];
+}
+
+export interface StudentRanking {
+  rank: number;
+  percentile: number;
+  student_id: string;
+  first_name: string;
+  last_name: string;
+  average_grade: number;
+  classification: string;
+}
+
+// Collection endpoints are paginated; follow the cursor header to the end
+const getAllPages = async <T>(path: string): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await axios.get(`${API_URL}${path}`, {
+      params: cursor ? { cursor } : undefined,
+    });
+    items.push(...response.data);
+    cursor = response.headers?.[NEXT_CURSOR_HEADER];
+  } while (cursor);
+  return items;
+};
+
 // Student API calls
 export const getStudent = async (studentId: string): Promise<Student> => {
   const response = await axios.get(`${API_URL}/students/${studentId}/`);
@@ -39,7 +101,19 @@ export const getStudent = async (studentId: string): Promise<Student> => {
 };
 
 export const getAllStudents = async (): Promise<Student[]> => {
-  const response = await axios.get(`${API_URL}/students/`);
+  return getAllPages<Student>('/students/');
+};
+
+// Student, grades and module titles in one request
+export const getStudentDetail = async (studentId: string): Promise<StudentDetail> => {
+  const response = await axios.get(`${API_URL}/students/${studentId}/detail`);
+  return response.data;
+};
+
+export const getStudentsBatch = async (
+  ids: string[]
+): Promise<BatchResult<Student, string>> => {
+  const response = await axios.post(`${API_URL}/students/batch`, { ids });
   return response.data;
 };
 
@@ -50,7 +124,13 @@ export const getModule = async (moduleId: number): Promise<Module> => {
 };
 
 export const getAllModules = async (): Promise<Module[]> => {
-  const response = await axios.get(`${API_URL}/modules/`);
+  return getAllPages<Module>('/modules/');
+};
+
+export const getModulesBatch = async (
+  ids: number[]
+): Promise<BatchResult<Module, number>> => {
+  const response = await axios.post(`${API_URL}/modules/batch`, { ids });
   return response.data;
 };
 
@@ -61,7 +141,13 @@ export const getTutor = async (tutorId: number): Promise<Tutor> => {
 };
 
 export const getAllTutors = async (): Promise<Tutor[]> => {
-  const response = await axios.get(`${API_URL}/tutors/`);
+  return getAllPages<Tutor>('/tutors/');
+};
+
+export const getTutorsBatch = async (
+  ids: number[]
+): Promise<BatchResult<Tutor, number>> => {
+  const response = await axios.post(`${API_URL}/tutors/batch`, { ids });
   return response.data;
 };
 
@@ -69,4 +155,18 @@ export const getAllTutors = async (): Promise<Tutor[]> => {
 export const getStudentGrades = async (studentId: string): Promise<Grade[]> => {
   const response = await axios.get(`${API_URL}/students/${studentId}/grades/`);
   return response.data;
-}; 
\ No newline at end of file
+};
+
+// Analytics API calls
+export const getCohortAnalytics = async (): Promise<CohortAnalytics> => {
+  const response = await axios.get(`${API_URL}/analytics/cohort`);
+  return response.data;
+};
+
+// Ranking API calls
+export const getTopStudents = async (limit: number): Promise<StudentRanking[]> => {
+  const response = await axios.get(`${API_URL}/rankings/students`, {
+    params: { limit },
+  });
+  return response.data;
+};
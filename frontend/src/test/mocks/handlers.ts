@@ -1,5 +1,13 @@
 import { http, HttpResponse } from 'msw';
-import { Student, Module, Grade, Tutor } from '../../services/api';
+import {
+  CohortAnalytics,
+  Grade,
+  Module,
+  ScoreSummary,
+  Student,
+  StudentRanking,
+  Tutor
+} from '../../services/api';
 
 const API_URL = 'http://127.0.0.1:8000';
 
@@ -61,6 +69,47 @@ export const mockTutors: Tutor[] = [
   }
 ];
 
+const summary = (scores: number[]): ScoreSummary => {
+  const sorted = [...scores].sort((a, b) => a - b);
+  const mean = sorted.reduce((sum, score) => sum + score, 0) / sorted.length;
+  const histogram = new Array(10).fill(0);
+  sorted.forEach(score => {
+    histogram[Math.min(Math.floor(score * 10), 9)] += 1;
+  });
+  return {
+    count: sorted.length,
+    mean,
+    median: mean,
+    std: null,
+    min: sorted[0],
+    max: sorted[sorted.length - 1],
+    percentiles: {},
+    histogram,
+    classifications: {}
+  };
+};
+
+export const mockAnalytics: CohortAnalytics = {
+  students: mockStudents.length,
+  student_classifications: { Fail: 0, Pass: 0, Merit: 1, Distinction: 1 },
+  student_average: summary(mockStudents.map(s => s.average_grade)),
+  grades: summary(mockGrades.map(g => g.score)),
+  modules: [],
+  tutors: []
+};
+
+export const mockRankings: StudentRanking[] = [...mockStudents]
+  .sort((a, b) => b.average_grade - a.average_grade)
+  .map((student, index) => ({
+    rank: index + 1,
+    percentile: 100 - (index * 100) / mockStudents.length,
+    student_id: student.student_id,
+    first_name: student.first_name,
+    last_name: student.last_name,
+    average_grade: student.average_grade,
+    classification: student.classification
+  }));
+
 // API Handlers
 export const handlers = [
   // Get all students
@@ -96,12 +145,41 @@ export const handlers = [
     return HttpResponse.json(module);
   }),
 
+  // Get student detail
+  http.get(`${API_URL}/students/:studentId/detail`, ({ params }) => {
+    const student = mockStudents.find(s => s.student_id === params.studentId);
+
+    if (!student) {
+      return HttpResponse.json({ message: 'Student not found' }, { status: 404 });
+    }
+
+    const grades = mockGrades
+      .filter(g => g.student_id === params.studentId)
+      .map(g => ({
+        module_id: g.module_id,
+        module_title: mockModules.find(m => m.id === g.module_id)?.title ?? '',
+        score: g.score
+      }));
+    return HttpResponse.json({ student, grades });
+  }),
+
   // Get student grades
   http.get(`${API_URL}/students/:studentId/grades`, ({ params }) => {
     const grades = mockGrades.filter(g => g.student_id === params.studentId);
     return HttpResponse.json(grades);
   }),
 
+  // Cohort analytics
+  http.get(`${API_URL}/analytics/cohort`, () => {
+    return HttpResponse.json(mockAnalytics);
+  }),
+
+  // Top students
+  http.get(`${API_URL}/rankings/students`, ({ request }) => {
+    const limit = Number(new URL(request.url).searchParams.get('limit') ?? 10);
+    return HttpResponse.json(mockRankings.slice(0, limit));
+  }),
+
   // Get all tutors
   http.get(`${API_URL}/tutors/`, () => {
     return HttpResponse.json(mockTutors);
@@ -3,7 +3,8 @@
 # Start the backend server
 echo "Starting backend server..."
 cd backend
-python sample_data.py
+python migrations.py upgrade
+python sample_data.py --if-empty
 uvicorn main:app --reload &
 BACKEND_PID=$!
 